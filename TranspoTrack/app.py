@@ -1,8 +1,31 @@
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session
-from database import execute_query, execute_procedure, test_connection, initialize_pool, authenticate_user
-from config import APP_CONFIG
+from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+import database
+from database import Error, transaction, error_result, execute_query, execute_page, execute_procedure, stream_query, test_connection, initialize_pool, pool_stats
+from config import APP_CONFIG, PAGINATION_CONFIG, SEAT_CONFIG, TIMETABLE_CONFIG, PASS_CONFIG, SEARCH_CONFIG, METRICS_CONFIG, REPLICA_CONFIG
+import stats as dashboard_stats
+from cache import reference_cache
+from seats import seat_inventory, is_seat_conflict
+from codes import next_code
+from bookings import book_batch, record_single_booking
+from auth import authenticate_user, revoke
+from passes import pass_index
+from search import passenger_search
+from changes import change_log, changes, Feed
+from live import broadcaster
+from audit import audit_log
+import maintenance
+import metrics
+from intake import complaint_intake, validate as validate_complaint
+import transit
+import timetable
+import csv
+import io
 import json
-from datetime import datetime, date
+import os
+import time
+from datetime import datetime, date, timedelta
+from decimal import Decimal
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = APP_CONFIG['SECRET_KEY']
@@ -15,10 +38,179 @@ class DateEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, (date, datetime)):
             return obj.isoformat()
+        if isinstance(obj, (Decimal, timedelta)):
+            return str(obj)
         return super().default(obj)
 
 app.json_encoder = DateEncoder
 
+# ======================== INSTRUMENTATION ========================
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that reports serialization time to the metrics"""
+    def response(self, *args, **kwargs):
+        started = time.perf_counter()
+        response = super().response(*args, **kwargs)
+        metrics.observe_serialization(time.perf_counter() - started)
+        return response
+
+if METRICS_CONFIG['ENABLED']:
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_request_timer():
+        metrics.begin_request()
+
+    @app.after_request
+    def record_request_metrics(response):
+        # Route templates rather than paths keep the label count bounded
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.end_request(endpoint, request.method, response.status_code)
+        return response
+
+# ======================== READ/WRITE ROUTING ========================
+if REPLICA_CONFIG['REPLICAS']:
+    @app.before_request
+    def route_reads():
+        # A session that wrote recently reads its own writes from the primary
+        database.begin_request(session.get('wrote_until', 0.0))
+
+    @app.after_request
+    def remember_write(response):
+        if database.request_wrote():
+            session['wrote_until'] = time.time() + REPLICA_CONFIG['STICKY_SECONDS']
+        return response
+
+# ======================== PAGINATION HELPERS ========================
+def get_page_args():
+    """Read the limit/after keyset pagination arguments from the query string"""
+    limit = request.args.get('limit', PAGINATION_CONFIG['DEFAULT_LIMIT'], type=int)
+    limit = max(1, min(limit, PAGINATION_CONFIG['MAX_LIMIT']))
+    after = request.args.get('after', type=int)
+    return limit, after
+
+def list_conditions(filters):
+    """Build SQL conditions from query-string filters
+
+    `filters` maps a query-string argument to a condition with one %s
+    placeholder. Arguments missing from the request are skipped.
+    """
+    conditions = []
+    params = []
+    for arg, condition in filters.items():
+        value = request.args.get(arg)
+        if value not in (None, ''):
+            conditions.append(condition)
+            params.append(value)
+    return conditions, params
+
+def paginate(select, filters, key_column, key, group_by=''):
+    """Run a list query one page at a time, newest rows first"""
+    limit, after = get_page_args()
+    conditions, params = list_conditions(filters)
+    if after is not None:
+        conditions.append(f"{key_column} < %s")
+        params.append(after)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    query = f"{select} {where} {group_by} ORDER BY {key_column} DESC LIMIT %s"
+    return execute_page(query, params, key, limit)
+
+# ======================== REFERENCE DATA CACHE ========================
+def cached_json(tables, loader):
+    """Serve a read-mostly result through the reference cache
+
+    Responses carry ETag/Last-Modified so browsers revalidate and get a
+    304 instead of downloading the same JSON again.
+    """
+    key = (request.path, tuple(sorted(request.args.items(multi=True))))
+    entry = reference_cache.get(tables, key, loader)
+    if not entry.result.get('success'):
+        return jsonify(entry.result)
+    
+    if entry.etag in request.if_none_match:
+        response = Response()
+    else:
+        response = jsonify(entry.result)
+    response.set_etag(entry.etag)
+    response.last_modified = reference_cache.last_modified(tables)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+# ======================== FARE HELPERS ========================
+def apply_server_fare(data, from_key, to_key):
+    """Replace the fare sent by the client with the server's quote"""
+    quote = transit.quote_fare(int(data[from_key]), int(data[to_key]),
+                               int(data['scheduleId']), data.get('classType', 'Economy'))
+    if quote is None:
+        return False
+    data['fare'] = quote['Fare']
+    return True
+
+NO_ROUTE_ERROR = {'success': False, 'error': 'No route connects these stations'}
+
+# ======================== AUDIT HELPERS ========================
+def changed_by():
+    """Who the current request acts as, for AUDIT_LOG.ChangedBy"""
+    return session.get('user', {}).get('username') or 'anonymous'
+
+def audit(table, record_id, action, old=None, new=None):
+    """Queue an audit event for a row written by this request"""
+    audit_log.record(table, record_id, action, old, new, changed_by())
+
+def write_row(table, key_column, record_id, query, params):
+    """Run an UPDATE or DELETE of one row and audit its values before and after
+
+    The row is read FOR UPDATE in the same transaction, so the old values
+    are exactly the ones the statement replaced.
+    """
+    action = 'DELETE' if query.lstrip().upper().startswith('DELETE') else 'UPDATE'
+    select = f"SELECT * FROM {table} WHERE {key_column} = %s"
+    try:
+        with transaction() as tx:
+            old = tx.fetch_one(f"{select} FOR UPDATE", (record_id,))
+            affected = tx.execute(query, params).rowcount
+            new = tx.fetch_one(select, (record_id,)) if action == 'UPDATE' else None
+    except Error as e:
+        return error_result(e)
+    if affected:
+        audit(table, record_id, action, old, new)
+    return {'success': True, 'affected_rows': affected}
+
+# ======================== STREAMING EXPORT HELPERS ========================
+def ndjson_rows(rows):
+    """Encode rows as newline-delimited JSON"""
+    for row in rows:
+        yield json.dumps(row, cls=DateEncoder) + '\n'
+
+def csv_rows(rows):
+    """Encode rows as CSV with a header taken from the first row"""
+    buffer = io.StringIO()
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()))
+            writer.writeheader()
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+def export_response(select, filters, key_column, name):
+    """Stream a filtered table dump as NDJSON (default) or CSV"""
+    conditions, params = list_conditions(filters)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    query = f"{select} {where} ORDER BY {key_column}"
+    rows = stream_query(query, params)
+    
+    if request.args.get('format') == 'csv':
+        body, mimetype, extension = csv_rows(rows), 'text/csv', 'csv'
+    else:
+        body, mimetype, extension = ndjson_rows(rows), 'application/x-ndjson', 'ndjson'
+    
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={name}.{extension}'
+    return response
+
 # ======================== HOME & DASHBOARD ========================
 @app.route('/')
 def index():
@@ -57,6 +249,15 @@ def login():
             'error': result.get('error', 'Invalid credentials')
         }), 401
 
+@app.route('/api/auth/revoke', methods=['POST'])
+def revoke_credentials():
+    """Drop a user's cached login so the next one is checked against MySQL"""
+    if session.get('user', {}).get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Admin access required'}), 403
+    data = request.json
+    revoke(data['username'])
+    return jsonify({'success': True})
+
 @app.route('/admin-dashboard')
 def admin_dashboard():
     """Admin dashboard"""
@@ -71,8 +272,7 @@ def user_dashboard():
 def user_schedules():
     """Get schedules for passengers (limited access)"""
     query = "SELECT * FROM SCHEDULE ORDER BY ScheduleID DESC LIMIT 20"
-    result = execute_query(query)
-    return jsonify(result)
+    return cached_json(('SCHEDULE',), lambda: execute_query(query))
 
 @app.route('/api/user/tickets')
 def user_tickets():
@@ -83,23 +283,50 @@ def user_tickets():
 
 @app.route('/api/user/book-ticket', methods=['POST'])
 def user_book_ticket():
-    """Book ticket for passenger (limited access)"""
+    """Book ticket for passenger (limited access)
+
+    The seat is assigned server-side from the seat inventory unless the
+    passenger asked for a specific one.
+    """
     data = request.json
-    import random
-    ticket_code = f"TKT{random.randint(100000000, 999999999)}"
-    seat_number = f"A{random.randint(1, 99):02d}"
+    if not apply_server_fare(data, 'fromStation', 'toStation'):
+        return jsonify(NO_ROUTE_ERROR)
+    journey_date = data.get('journeyDate', data.get('startDate', '2024-01-29'))
+    requested_seat = data.get('seatNumber')
     
     query = """
         INSERT INTO TICKET (TicketCode, SeatNumber, JourneyDate, Fare, PassengerID, 
                            ScheduleID, SourceStationID, DestStationID, TicketStatus)
         VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'Booked')
     """
-    params = (
-        ticket_code, seat_number, data.get('journeyDate', data.get('startDate', '2024-01-29')),
-        data['fare'], data['passengerId'], data['scheduleId'], 
-        data['fromStation'], data['toStation']
-    )
-    result = execute_query(query, params, fetch=False)
+    for _ in range(SEAT_CONFIG['BOOKING_ATTEMPTS']):
+        seat_number = seat_inventory.reserve(data['scheduleId'], journey_date, requested_seat)
+        if seat_number is None:
+            return jsonify({'success': False, 'error': 'Seat not available'})
+        
+        ticket_code = next_code('TICKET')
+        if ticket_code is None:
+            seat_inventory.release(data['scheduleId'], journey_date, seat_number)
+            return jsonify({'success': False, 'error': 'Could not allocate a ticket code'})
+        params = (
+            ticket_code, seat_number, journey_date,
+            data['fare'], data['passengerId'], data['scheduleId'], 
+            data['fromStation'], data['toStation']
+        )
+        result = execute_query(query, params, fetch=False, prepared=True)
+        if result['success']:
+            result['seatNumber'] = seat_number
+            dashboard_stats.adjust(total_tickets=1)
+            change_log.record('TICKET', [result['lastrowid']])
+            audit('TICKET', result['lastrowid'], 'INSERT',
+                  new={**data, 'ticketCode': ticket_code, 'seatNumber': seat_number})
+            break
+        # A seat booked by another worker stays marked; try the next free one
+        if is_seat_conflict(result) and requested_seat is None:
+            continue
+        if not is_seat_conflict(result):
+            seat_inventory.release(data['scheduleId'], journey_date, seat_number)
+        break
     return jsonify(result)
 
 # Passenger-specific pages
@@ -130,8 +357,13 @@ def user_passes():
 def user_get_pass():
     """Apply for pass (passenger)"""
     data = request.json
-    import random
-    pass_code = f"PASS{random.randint(100000000, 999999999)}"
+    try:
+        start_date = date.fromisoformat(data['startDate'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'startDate must be a date (YYYY-MM-DD)'}), 400
+    pass_code = next_code('PASS')
+    if pass_code is None:
+        return jsonify({'success': False, 'error': 'Could not allocate a pass code'})
     
     # Calculate end date based on pass type
     if data['passType'] == 'Daily':
@@ -152,10 +384,21 @@ def user_get_pass():
         VALUES (%s, %s, %s, DATE_ADD(%s, INTERVAL %s DAY), %s, %s, 'Active')
     """
     params = (
-        pass_code, data['passType'], data['startDate'], data['startDate'], 
+        pass_code, data['passType'], start_date, start_date,
         interval_days, data['price'], data['passengerId']
     )
     result = execute_query(query, params, fetch=False)
+    if result['success']:
+        change_log.record('PASS', [result['lastrowid']])
+        audit('PASS', result['lastrowid'], 'INSERT', new={**data, 'passCode': pass_code})
+        # trg_validate_and_update_pass marks passes ending in the past as Expired
+        end_date = start_date + timedelta(days=interval_days)
+        if end_date >= date.today():
+            dashboard_stats.adjust(active_passes=1)
+            pass_index.add({
+                'PassID': result['lastrowid'], 'PassCode': pass_code, 'PassType': data['passType'],
+                'PassengerID': data['passengerId'], 'StartDate': start_date, 'EndDate': end_date
+            })
     return jsonify(result)
 
 @app.route('/api/user/complaints')
@@ -167,81 +410,77 @@ def user_complaints():
 
 @app.route('/api/user/file-complaint', methods=['POST'])
 def user_file_complaint():
-    """File complaint (passenger)"""
-    data = request.json
-    import random
-    complaint_code = f"COMP{random.randint(100000000, 999999999)}"
-    
-    query = """
-        INSERT INTO COMPLAINT (ComplaintCode, Title, Description, PassengerID, 
-                              Category, Priority, Status)
-        VALUES (%s, %s, %s, %s, %s, 'Medium', 'Pending')
+    """File complaint (passenger)
+
+    The complaint is queued and written by the intake's background writer
+    in batches; the response acknowledges it with its code right away.
     """
-    params = (
-        complaint_code,
-        data.get('subject', 'General Complaint'),
-        data['description'],
-        data['passengerId'],
-        data.get('category', 'Other')
-    )
-    result = execute_query(query, params, fetch=False)
-    return jsonify(result)
+    row, error = validate_complaint(request.json or {})
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    row['code'] = next_code('COMPLAINT')
+    row['changedBy'] = changed_by()
+    if row['code'] is None:
+        return jsonify({'success': False, 'error': 'Could not allocate a complaint code'})
+    if not complaint_intake.submit(row):
+        return jsonify({'success': False, 'error': 'Too many complaints queued, please retry shortly'}), 503
+    return jsonify({'success': True, 'complaintCode': row['code'], 'queued': True}), 202
 
 @app.route('/dashboard')
 def dashboard():
     """Main dashboard with statistics"""
-    stats = {}
-    
-    # Get total passengers
-    result = execute_query("SELECT COUNT(*) as count FROM PASSENGER WHERE Status='Active'")
-    stats['total_passengers'] = result['data'][0]['count'] if result['success'] else 0
-    
-    # Get total tickets
-    result = execute_query("SELECT COUNT(*) as count FROM TICKET WHERE TicketStatus='Booked'")
-    stats['total_tickets'] = result['data'][0]['count'] if result['success'] else 0
-    
-    # Get active passes
-    result = execute_query("SELECT COUNT(*) as count FROM PASS WHERE PassStatus='Active'")
-    stats['active_passes'] = result['data'][0]['count'] if result['success'] else 0
-    
-    # Get total revenue
-    result = execute_query("SELECT COALESCE(SUM(Amount), 0) as revenue FROM PAYMENT WHERE Status='Completed'")
-    stats['total_revenue'] = float(result['data'][0]['revenue']) if result['success'] else 0
-    
-    # Get pending complaints
-    result = execute_query("SELECT COUNT(*) as count FROM COMPLAINT WHERE Status='Pending'")
-    stats['pending_complaints'] = result['data'][0]['count'] if result['success'] else 0
-    
-    # Get active vehicles
-    result = execute_query("SELECT COUNT(*) as count FROM VEHICLE WHERE Status='Active'")
-    stats['active_vehicles'] = result['data'][0]['count'] if result['success'] else 0
-    
+    stats = dashboard_stats.get_stats()
     return render_template('dashboard.html', stats=stats)
 
+@app.route('/api/live', methods=['GET'])
+def live_updates():
+    """Dashboard counters and schedule status changes as Server-Sent Events"""
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    stream = broadcaster.subscribe(last_event_id)
+    if stream is None:
+        return jsonify({'success': False, 'error': 'Too many live connections, please retry shortly'}), 503
+    response = Response(stream_with_context(stream), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop proxies such as nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 # ======================== PASSENGER CRUD ========================
 @app.route('/passengers')
 def passengers():
     """View all passengers"""
     return render_template('passengers.html')
 
+PASSENGER_SELECT = """
+    SELECT p.*, GROUP_CONCAT(pp.PhoneNumber SEPARATOR ', ') as PhoneNumbers
+    FROM PASSENGER p
+    LEFT JOIN PASSENGER_PHONE pp ON p.PassengerID = pp.PassengerID
+"""
+
 @app.route('/api/passengers', methods=['GET'])
 def get_passengers():
-    """Get all passengers"""
-    query = """
-        SELECT p.*, GROUP_CONCAT(pp.PhoneNumber SEPARATOR ', ') as PhoneNumbers
-        FROM PASSENGER p
-        LEFT JOIN PASSENGER_PHONE pp ON p.PassengerID = pp.PassengerID
-        GROUP BY p.PassengerID
-        ORDER BY p.PassengerID DESC
-    """
-    result = execute_query(query)
-    return jsonify(result)
+    """Get passengers, one page at a time"""
+    filters = {
+        'status': "p.Status = %s",
+        'city': "p.City = %s",
+        'from': "p.RegistrationDate >= %s",
+        'to': "p.RegistrationDate <= %s"
+    }
+    return cached_json(('PASSENGER', 'PASSENGER_PHONE'), lambda: paginate(
+        PASSENGER_SELECT, filters, 'p.PassengerID', 'PassengerID', group_by='GROUP BY p.PassengerID'))
+
+@app.route('/api/passengers/search', methods=['GET'])
+def search_passengers():
+    """Passengers whose name, email or phone match what was typed so far"""
+    limit = request.args.get('limit', SEARCH_CONFIG['DEFAULT_LIMIT'], type=int)
+    limit = max(1, min(limit, SEARCH_CONFIG['MAX_LIMIT']))
+    return jsonify({'success': True, 'data': passenger_search.search(request.args.get('q', ''), limit)})
 
 @app.route('/api/passengers/<int:id>', methods=['GET'])
 def get_passenger(id):
     """Get single passenger"""
     query = "SELECT * FROM PASSENGER WHERE PassengerID = %s"
-    result = execute_query(query, (id,))
+    result = execute_query(query, (id,), prepared=True)
     return jsonify(result)
 
 @app.route('/api/passengers', methods=['POST'])
@@ -257,16 +496,27 @@ def create_passenger():
         data['dateOfBirth'], data.get('address', ''), 
         data.get('city', ''), data.get('status', 'Active')
     )
-    result = execute_query(query, params, fetch=False)
-    
-    if result['success'] and 'phone' in data and data['phone']:
-        passenger_id = result['lastrowid']
-        phone_query = """
-            INSERT INTO PASSENGER_PHONE (PassengerID, PhoneNumber, PhoneType, IsPrimary)
-            VALUES (%s, %s, 'Mobile', TRUE)
-        """
-        execute_query(phone_query, (passenger_id, data['phone']), fetch=False)
+    phone_query = """
+        INSERT INTO PASSENGER_PHONE (PassengerID, PhoneNumber, PhoneType, IsPrimary)
+        VALUES (%s, %s, 'Mobile', TRUE)
+    """
+    try:
+        # Passenger and phone commit together or not at all
+        with transaction() as tx:
+            passenger_id = tx.execute(query, params).lastrowid
+            if data.get('phone'):
+                tx.execute(phone_query, (passenger_id, data['phone']))
+        result = {'success': True, 'affected_rows': 1, 'lastrowid': passenger_id}
+    except Error as e:
+        result = error_result(e)
     
+    if result['success']:
+        reference_cache.invalidate('PASSENGER')
+        passenger_search.put(passenger_id, data, [data['phone']] if data.get('phone') else [])
+        change_log.record('PASSENGER', [passenger_id])
+        audit('PASSENGER', passenger_id, 'INSERT', new=data)
+        if data.get('status', 'Active') == 'Active':
+            dashboard_stats.adjust(total_passengers=1)
     return jsonify(result)
 
 @app.route('/api/passengers/<int:id>', methods=['PUT'])
@@ -284,14 +534,28 @@ def update_passenger(id):
         data['dateOfBirth'], data.get('address', ''),
         data.get('city', ''), data.get('status', 'Active'), id
     )
-    result = execute_query(query, params, fetch=False)
+    result = write_row('PASSENGER', 'PassengerID', id, query, params)
+    if result['success']:
+        dashboard_stats.invalidate()
+        reference_cache.invalidate('PASSENGER')
+        if result['affected_rows']:
+            passenger_search.put(id, data)
+            change_log.record('PASSENGER', [id])
+            change_log.reset_joined('PASSENGER')
     return jsonify(result)
 
 @app.route('/api/passengers/<int:id>', methods=['DELETE'])
 def delete_passenger(id):
     """Delete passenger"""
     query = "DELETE FROM PASSENGER WHERE PassengerID = %s"
-    result = execute_query(query, (id,), fetch=False)
+    result = write_row('PASSENGER', 'PassengerID', id, query, (id,))
+    if result['success']:
+        dashboard_stats.invalidate()
+        reference_cache.invalidate('PASSENGER')
+        passenger_search.remove(id)
+        if result['affected_rows']:
+            change_log.record('PASSENGER', [id], deleted=True)
+            change_log.reset_joined('PASSENGER')
     return jsonify(result)
 
 # ======================== STATION CRUD ========================
@@ -302,10 +566,14 @@ def stations():
 
 @app.route('/api/stations', methods=['GET'])
 def get_stations():
-    """Get all stations"""
-    query = "SELECT * FROM STATION ORDER BY StationID DESC"
-    result = execute_query(query)
-    return jsonify(result)
+    """Get stations, one page at a time"""
+    filters = {
+        'status': "Status = %s",
+        'type': "Type = %s",
+        'zone': "Zone = %s"
+    }
+    return cached_json(('STATION',), lambda: paginate(
+        "SELECT * FROM STATION", filters, 'StationID', 'StationID'))
 
 @app.route('/api/stations', methods=['POST'])
 def create_station():
@@ -321,6 +589,12 @@ def create_station():
         data.get('zone', ''), data.get('status', 'Operational')
     )
     result = execute_query(query, params, fetch=False)
+    if result['success']:
+        reference_cache.invalidate('STATION')
+        transit.invalidate()
+        timetable.invalidate()
+        change_log.record('STATION', [result['lastrowid']])
+        audit('STATION', result['lastrowid'], 'INSERT', new=data)
     return jsonify(result)
 
 @app.route('/api/stations/<int:id>', methods=['PUT'])
@@ -338,41 +612,182 @@ def update_station(id):
         data['type'], data.get('capacity', 0),
         data.get('zone', ''), data.get('status', 'Operational'), id
     )
-    result = execute_query(query, params, fetch=False)
+    result = write_row('STATION', 'StationID', id, query, params)
+    if result['success']:
+        reference_cache.invalidate('STATION')
+        transit.invalidate()
+        timetable.invalidate()
+        if result['affected_rows']:
+            change_log.record('STATION', [id])
+            change_log.reset_joined('STATION')
     return jsonify(result)
 
 @app.route('/api/stations/<int:id>', methods=['DELETE'])
 def delete_station(id):
     """Delete station"""
     query = "DELETE FROM STATION WHERE StationID = %s"
-    result = execute_query(query, (id,), fetch=False)
+    result = write_row('STATION', 'StationID', id, query, (id,))
+    if result['success']:
+        reference_cache.invalidate('STATION')
+        transit.invalidate()
+        timetable.invalidate()
+        if result['affected_rows']:
+            change_log.record('STATION', [id], deleted=True)
+            change_log.reset_joined('STATION')
     return jsonify(result)
 
+@app.route('/api/stations/<int:id>/departures', methods=['GET'])
+def station_departures(id):
+    """Next departures from a station (for platform displays)"""
+    when = request.args.get('after')
+    try:
+        when = datetime.fromisoformat(when) if when else datetime.now()
+    except ValueError:
+        return jsonify({'success': False, 'error': 'after must be an ISO date/time'}), 400
+    limit = request.args.get('limit', TIMETABLE_CONFIG['DEFAULT_LIMIT'], type=int)
+    limit = max(1, min(limit, TIMETABLE_CONFIG['MAX_LIMIT']))
+    departures = timetable.next_departures(id, when, limit)
+    if departures is None:
+        return jsonify({'success': False, 'error': 'Timetable unavailable'}), 503
+    return jsonify({'success': True, 'data': departures})
+
 # ======================== TICKET CRUD ========================
 @app.route('/tickets')
 def tickets():
     """View all tickets"""
     return render_template('tickets.html')
 
+TICKET_SELECT = """
+    SELECT t.*, 
+           CONCAT(p.FirstName, ' ', p.LastName) as PassengerName,
+           s.ScheduleCode,
+           src.Name as SourceStation,
+           dest.Name as DestinationStation
+    FROM TICKET t
+    JOIN PASSENGER p ON t.PassengerID = p.PassengerID
+    JOIN SCHEDULE s ON t.ScheduleID = s.ScheduleID
+    JOIN STATION src ON t.SourceStationID = src.StationID
+    JOIN STATION dest ON t.DestStationID = dest.StationID
+"""
+
 @app.route('/api/tickets', methods=['GET'])
 def get_tickets():
-    """Get all tickets"""
-    query = """
-        SELECT t.*, 
-               CONCAT(p.FirstName, ' ', p.LastName) as PassengerName,
-               s.ScheduleCode,
-               src.Name as SourceStation,
-               dest.Name as DestinationStation
-        FROM TICKET t
-        JOIN PASSENGER p ON t.PassengerID = p.PassengerID
-        JOIN SCHEDULE s ON t.ScheduleID = s.ScheduleID
-        JOIN STATION src ON t.SourceStationID = src.StationID
-        JOIN STATION dest ON t.DestStationID = dest.StationID
-        ORDER BY t.TicketNumber DESC
+    """Get tickets, one page at a time"""
+    filters = {
+        'status': "t.TicketStatus = %s",
+        'passengerId': "t.PassengerID = %s",
+        'scheduleId': "t.ScheduleID = %s",
+        'from': "t.JourneyDate >= %s",
+        'to': "t.JourneyDate <= %s"
+    }
+    result = paginate(TICKET_SELECT, filters, 't.TicketNumber', 'TicketNumber')
+    return jsonify(result)
+
+@app.route('/api/tickets/export', methods=['GET'])
+def export_tickets():
+    """Stream all matching tickets as NDJSON or CSV"""
+    filters = {
+        'status': "TicketStatus = %s",
+        'passengerId': "PassengerID = %s",
+        'from': "JourneyDate >= %s",
+        'to': "JourneyDate <= %s"
+    }
+    return export_response("SELECT * FROM TICKET", filters, 'TicketNumber', 'tickets')
+
+@app.route('/api/tickets/<int:id>/cancel', methods=['PUT'])
+def cancel_ticket(id):
+    """Cancel a booked ticket
+
+    The seat stays taken: the cancelled row still holds unique_seat_schedule.
     """
-    result = execute_query(query)
+    data = request.json or {}
+    try:
+        with transaction() as tx:
+            ticket = tx.fetch_one("""
+                SELECT ScheduleID, JourneyDate, SeatNumber, TicketStatus, CancellationReason FROM TICKET
+                WHERE TicketNumber = %s AND TicketStatus = 'Booked'
+                FOR UPDATE
+            """, (id,))
+            if ticket is None:
+                return jsonify({'success': False, 'error': 'Ticket not found or not booked'})
+            affected = tx.execute("""
+                UPDATE TICKET SET TicketStatus='Cancelled', CancellationReason=%s
+                WHERE TicketNumber=%s
+            """, (data.get('reason', ''), id)).rowcount
+        result = {'success': True, 'affected_rows': affected}
+    except Error as e:
+        result = error_result(e)
+    if result['success'] and result['affected_rows']:
+        dashboard_stats.adjust(total_tickets=-1)
+        change_log.record('TICKET', [id])
+        audit('TICKET', id, 'UPDATE',
+              old={'TicketStatus': ticket['TicketStatus'], 'CancellationReason': ticket['CancellationReason']},
+              new={'TicketStatus': 'Cancelled', 'CancellationReason': data.get('reason', '')})
     return jsonify(result)
 
+# ======================== FARES & JOURNEYS ========================
+@app.route('/api/fare', methods=['GET'])
+def fare_quote():
+    """Fare for a trip, computed from route distances"""
+    from_station = request.args.get('from', type=int)
+    to_station = request.args.get('to', type=int)
+    if from_station is None or to_station is None:
+        return jsonify({'success': False, 'error': 'from and to station IDs are required'}), 400
+    quote = transit.quote_fare(from_station, to_station, request.args.get('scheduleId', type=int),
+                               request.args.get('classType', 'Economy'))
+    if quote is None:
+        return jsonify(NO_ROUTE_ERROR)
+    return jsonify({'success': True, 'data': quote})
+
+@app.route('/api/journeys', methods=['GET'])
+def journey_planner():
+    """Plan a journey across routes (mode=shortest or mode=transfers)"""
+    from_station = request.args.get('from', type=int)
+    to_station = request.args.get('to', type=int)
+    if from_station is None or to_station is None:
+        return jsonify({'success': False, 'error': 'from and to station IDs are required'}), 400
+    fewest_transfers = request.args.get('mode') == 'transfers'
+    legs = transit.plan_journey(from_station, to_station, fewest_transfers)
+    if legs is None:
+        return jsonify(NO_ROUTE_ERROR)
+    return jsonify({
+        'success': True,
+        'data': {
+            'legs': legs,
+            'transfers': max(len(legs) - 1, 0),
+            'totalDistance': round(sum(leg['Distance'] for leg in legs), 2),
+            'totalMinutes': sum(leg['TravelMinutes'] for leg in legs),
+            'totalFare': round(sum(leg['Fare'] for leg in legs), 2)
+        }
+    })
+
+# ======================== SEATS ========================
+@app.route('/api/schedules/<int:id>/seats', methods=['GET'])
+def schedule_seats(id):
+    """Seat map of a schedule for one journey date"""
+    try:
+        journey_date = date.fromisoformat(request.args.get('date', ''))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'A valid date=YYYY-MM-DD is required'}), 400
+    
+    seat_map = seat_inventory.seat_map(id, journey_date)
+    if seat_map is None:
+        return jsonify({'success': False, 'error': 'Could not load seat map'})
+    return jsonify({'success': True, 'data': seat_map})
+
+# ======================== PAYMENTS ========================
+@app.route('/api/payments/export', methods=['GET'])
+def export_payments():
+    """Stream all matching payments as NDJSON or CSV"""
+    filters = {
+        'status': "Status = %s",
+        'method': "PaymentMethod = %s",
+        'passengerId': "PassengerID = %s",
+        'from': "Timestamp >= %s",
+        'to': "Timestamp < DATE_ADD(%s, INTERVAL 1 DAY)"
+    }
+    return export_response("SELECT * FROM PAYMENT", filters, 'TransactionID', 'payments')
+
 # ======================== VEHICLE CRUD ========================
 @app.route('/vehicles')
 def vehicles():
@@ -381,10 +796,13 @@ def vehicles():
 
 @app.route('/api/vehicles', methods=['GET'])
 def get_vehicles():
-    """Get all vehicles"""
-    query = "SELECT * FROM VEHICLE ORDER BY VehicleID DESC"
-    result = execute_query(query)
-    return jsonify(result)
+    """Get vehicles, one page at a time"""
+    filters = {
+        'status': "Status = %s",
+        'type': "Type = %s"
+    }
+    return cached_json(('VEHICLE',), lambda: paginate(
+        "SELECT * FROM VEHICLE", filters, 'VehicleID', 'VehicleID'))
 
 @app.route('/api/vehicles', methods=['POST'])
 def create_vehicle():
@@ -401,6 +819,12 @@ def create_vehicle():
         data.get('fuelType', 'Diesel'), data.get('status', 'Active')
     )
     result = execute_query(query, params, fetch=False)
+    if result['success']:
+        reference_cache.invalidate('VEHICLE')
+        change_log.record('VEHICLE', [result['lastrowid']])
+        audit('VEHICLE', result['lastrowid'], 'INSERT', new=data)
+        if data.get('status', 'Active') == 'Active':
+            dashboard_stats.adjust(active_vehicles=1)
     return jsonify(result)
 
 @app.route('/api/vehicles/<int:id>', methods=['PUT'])
@@ -418,14 +842,24 @@ def update_vehicle(id):
         data['capacity'], data['registrationNumber'],
         data.get('fuelType', 'Diesel'), data.get('status', 'Active'), id
     )
-    result = execute_query(query, params, fetch=False)
+    result = write_row('VEHICLE', 'VehicleID', id, query, params)
+    if result['success']:
+        dashboard_stats.invalidate()
+        reference_cache.invalidate('VEHICLE')
+        if result['affected_rows']:
+            change_log.record('VEHICLE', [id])
     return jsonify(result)
 
 @app.route('/api/vehicles/<int:id>', methods=['DELETE'])
 def delete_vehicle(id):
     """Delete vehicle"""
     query = "DELETE FROM VEHICLE WHERE VehicleID = %s"
-    result = execute_query(query, (id,), fetch=False)
+    result = write_row('VEHICLE', 'VehicleID', id, query, (id,))
+    if result['success']:
+        dashboard_stats.invalidate()
+        reference_cache.invalidate('VEHICLE')
+        if result['affected_rows']:
+            change_log.record('VEHICLE', [id], deleted=True)
     return jsonify(result)
 
 # ======================== PASS CRUD ========================
@@ -434,34 +868,87 @@ def passes():
     """View all passes"""
     return render_template('passes.html')
 
+PASS_SELECT = """
+    SELECT p.*, CONCAT(ps.FirstName, ' ', ps.LastName) as PassengerName
+    FROM PASS p
+    JOIN PASSENGER ps ON p.PassengerID = ps.PassengerID
+"""
+
 @app.route('/api/passes', methods=['GET'])
 def get_passes():
-    """Get all passes"""
-    query = """
-        SELECT p.*, CONCAT(ps.FirstName, ' ', ps.LastName) as PassengerName
-        FROM PASS p
-        JOIN PASSENGER ps ON p.PassengerID = ps.PassengerID
-        ORDER BY p.PassID DESC
-    """
-    result = execute_query(query)
+    """Get passes, one page at a time"""
+    filters = {
+        'status': "p.PassStatus = %s",
+        'passengerId': "p.PassengerID = %s",
+        'type': "p.PassType = %s",
+        'from': "p.StartDate >= %s",
+        'to': "p.StartDate <= %s"
+    }
+    result = paginate(PASS_SELECT, filters, 'p.PassID', 'PassID')
+    return jsonify(result)
+
+@app.route('/api/passes/<int:id>/status', methods=['PUT'])
+def update_pass_status(id):
+    """Activate, suspend or cancel a pass"""
+    data = request.json
+    try:
+        with transaction() as tx:
+            old = tx.fetch_one("SELECT PassStatus FROM PASS WHERE PassID = %s FOR UPDATE", (id,))
+            affected = tx.execute("UPDATE PASS SET PassStatus=%s WHERE PassID=%s", (data['status'], id)).rowcount
+            row = tx.fetch_one("SELECT * FROM PASS WHERE PassID = %s", (id,)) if data['status'] == 'Active' else None
+        result = {'success': True, 'affected_rows': affected}
+    except Error as e:
+        return jsonify(error_result(e))
+    
+    dashboard_stats.invalidate()
+    pass_index.set_status(id, data['status'], row)
+    if affected:
+        change_log.record('PASS', [id])
+        audit('PASS', id, 'UPDATE', old=old, new={'PassStatus': data['status']})
     return jsonify(result)
 
+@app.route('/api/passes/validate', methods=['POST'])
+def validate_passes():
+    """Gate check: validate one tap, or a batch of taps given as a "taps" list"""
+    data = request.json or {}
+    single = 'taps' not in data
+    taps = [data] if single else data['taps']
+    if not isinstance(taps, list) or len(taps) > PASS_CONFIG['MAX_BATCH_TAPS']:
+        return jsonify({
+            'success': False,
+            'error': f"taps must be a list of at most {PASS_CONFIG['MAX_BATCH_TAPS']} entries"
+        }), 400
+    
+    results = pass_index.validate(taps)
+    if results is None:
+        # Not "invalid": nothing is known about any pass yet
+        return jsonify({'success': False, 'error': 'Pass validation is unavailable, please retry'}), 503
+    return jsonify({'success': True, 'data': results[0] if single else results})
+
 # ======================== COMPLAINT CRUD ========================
 @app.route('/complaints')
 def complaints():
     """View all complaints"""
     return render_template('complaints.html')
 
+COMPLAINT_SELECT = """
+    SELECT c.*, CONCAT(p.FirstName, ' ', p.LastName) as PassengerName
+    FROM COMPLAINT c
+    JOIN PASSENGER p ON c.PassengerID = p.PassengerID
+"""
+
 @app.route('/api/complaints', methods=['GET'])
 def get_complaints():
-    """Get all complaints"""
-    query = """
-        SELECT c.*, CONCAT(p.FirstName, ' ', p.LastName) as PassengerName
-        FROM COMPLAINT c
-        JOIN PASSENGER p ON c.PassengerID = p.PassengerID
-        ORDER BY c.ComplaintID DESC
-    """
-    result = execute_query(query)
+    """Get complaints, one page at a time"""
+    filters = {
+        'status': "c.Status = %s",
+        'passengerId': "c.PassengerID = %s",
+        'category': "c.Category = %s",
+        'priority': "c.Priority = %s",
+        'from': "c.Timestamp >= %s",
+        'to': "c.Timestamp < DATE_ADD(%s, INTERVAL 1 DAY)"
+    }
+    result = paginate(COMPLAINT_SELECT, filters, 'c.ComplaintID', 'ComplaintID')
     return jsonify(result)
 
 @app.route('/api/complaints/<int:id>/status', methods=['PUT'])
@@ -474,7 +961,11 @@ def update_complaint_status(id):
         WHERE ComplaintID=%s
     """
     params = (data['status'], data.get('resolution', ''), id)
-    result = execute_query(query, params, fetch=False)
+    result = write_row('COMPLAINT', 'ComplaintID', id, query, params)
+    if result['success']:
+        dashboard_stats.invalidate()
+        if result['affected_rows']:
+            change_log.record('COMPLAINT', [id])
     return jsonify(result)
 
 # ======================== TRIGGERS & PROCEDURES ========================
@@ -490,19 +981,67 @@ def procedures():
 
 @app.route('/api/book-ticket', methods=['POST'])
 def book_ticket():
-    """Book ticket using stored procedure"""
+    """Book ticket using stored procedure
+
+    The seat reserved in the seat inventory is the one booked, so a request
+    without a seat number gets the first free seat.
+    """
     data = request.json
+    reserved = None
     try:
+        if not apply_server_fare(data, 'sourceStationId', 'destStationId'):
+            return jsonify(NO_ROUTE_ERROR)
+        seat_number = seat_inventory.reserve(data['scheduleId'], data['journeyDate'], data.get('seatNumber'))
+        if seat_number is None:
+            return jsonify({'success': False, 'error': 'Seat not available'})
+        reserved = seat_number
+        
+        started = time.perf_counter()
         result = execute_procedure('sp_book_ticket_with_payment', [
             data['passengerId'],
             data['scheduleId'],
             data['sourceStationId'],
             data['destStationId'],
-            data['seatNumber'],
+            seat_number,
             data['journeyDate'],
             data['fare'],
-            data['paymentMethod']
+            data['paymentMethod'],
+            next_code('TICKET'),
+            next_code('TRANSACTION')
         ])
+        if result['success']:
+            reserved = None
+            result['seatNumber'] = seat_number
+            record_single_booking(time.perf_counter() - started)
+            dashboard_stats.adjust(total_tickets=1, total_revenue=float(data['fare']))
+            ticket_numbers = [row['TicketNumber'] for rows in result['data'] for row in rows
+                              if row.get('TicketNumber')]
+            change_log.record('TICKET', ticket_numbers)
+            for ticket_number in ticket_numbers:
+                audit('TICKET', ticket_number, 'INSERT', new={**data, 'seatNumber': seat_number})
+        elif not is_seat_conflict(result):
+            seat_inventory.release(data['scheduleId'], data['journeyDate'], seat_number)
+        return jsonify(result)
+    except Exception as e:
+        if reserved is not None:
+            seat_inventory.release(data['scheduleId'], data['journeyDate'], reserved)
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/bookings/batch', methods=['POST'])
+def batch_booking():
+    """Book a group of seats in one transaction"""
+    data = request.json
+    try:
+        if not apply_server_fare(data, 'sourceStationId', 'destStationId'):
+            return jsonify(NO_ROUTE_ERROR)
+        result = book_batch(data)
+        if result['success'] and result['booked']:
+            booked = result['booked']
+            dashboard_stats.adjust(total_tickets=booked, total_revenue=float(data['fare']) * booked)
+            tickets = [row for row in result['data'] if row['success']]
+            change_log.record('TICKET', [row['ticketNumber'] for row in tickets])
+            for row in tickets:
+                audit('TICKET', row['ticketNumber'], 'INSERT', new={**data, **row})
         return jsonify(result)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -530,20 +1069,22 @@ def functions():
 def get_passenger_age(passenger_id):
     """Get passenger age using function"""
     query = "SELECT fn_calculate_passenger_age(%s) as age"
-    result = execute_query(query, (passenger_id,))
+    result = execute_query(query, (passenger_id,), prepared=True)
     return jsonify(result)
 
 @app.route('/api/check-seat', methods=['POST'])
 def check_seat_availability():
-    """Check seat availability using function"""
+    """Check seat availability from the seat inventory
+
+    Same answer as fn_check_seat_availability without a database call once
+    the schedule's seat map is loaded.
+    """
     data = request.json
-    query = "SELECT fn_check_seat_availability(%s, %s, %s) as status"
-    result = execute_query(query, (
-        data['scheduleId'],
-        data['journeyDate'],
-        data['seatNumber']
-    ))
-    return jsonify(result)
+    available = seat_inventory.is_available(data['scheduleId'], data['journeyDate'], data['seatNumber'])
+    if available is None:
+        return jsonify({'success': False, 'error': 'Could not load seat availability'})
+    status = 'AVAILABLE' if available else 'NOT_AVAILABLE'
+    return jsonify({'success': True, 'data': [{'status': status}]})
 
 # ======================== ADVANCED QUERIES ========================
 @app.route('/queries')
@@ -587,8 +1128,7 @@ def join_query():
         GROUP BY r.RouteID, r.RouteCode, r.Name, r.TotalDistance
         ORDER BY r.RouteID
     """
-    result = execute_query(query)
-    return jsonify(result)
+    return cached_json(('ROUTE', 'ROUTE_STATION', 'STATION'), lambda: execute_query(query))
 
 @app.route('/api/query/aggregate', methods=['GET'])
 def aggregate_query():
@@ -608,6 +1148,63 @@ def aggregate_query():
     result = execute_query(query)
     return jsonify(result)
 
+# ======================== CHANGE FEED ========================
+CHANGE_FEEDS = {
+    'passengers': Feed('PASSENGER', PASSENGER_SELECT, 'p.PassengerID', 'PassengerID', 'GROUP BY p.PassengerID'),
+    'stations': Feed('STATION', "SELECT * FROM STATION", 'StationID', 'StationID'),
+    'vehicles': Feed('VEHICLE', "SELECT * FROM VEHICLE", 'VehicleID', 'VehicleID'),
+    'tickets': Feed('TICKET', TICKET_SELECT, 't.TicketNumber', 'TicketNumber'),
+    'passes': Feed('PASS', PASS_SELECT, 'p.PassID', 'PassID'),
+    'complaints': Feed('COMPLAINT', COMPLAINT_SELECT, 'c.ComplaintID', 'ComplaintID')
+}
+
+@app.route('/api/<name>/changes', methods=['GET'])
+def get_changes(name):
+    """Rows changed since a version, for patching a cached list page"""
+    feed = CHANGE_FEEDS.get(name)
+    if feed is None:
+        return jsonify({'success': False, 'error': f"No change feed for {name}"}), 404
+    return jsonify(changes(feed, request.args.get('since', type=int)))
+
+# ======================== MONITORING ========================
+@app.route('/api/pool-stats', methods=['GET'])
+def get_pool_stats():
+    """Live connection pool statistics"""
+    return jsonify({'success': True, 'data': pool_stats()})
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, SQL and pool timings in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/live/stats', methods=['GET'])
+def get_live_stats():
+    """Connected live update clients and producer backlog"""
+    return jsonify({'success': True, 'data': broadcaster.stats()})
+
+@app.route('/api/audit/stats', methods=['GET'])
+def get_audit_stats():
+    """Audit events buffered, written and dropped"""
+    return jsonify({'success': True, 'data': audit_log.stats()})
+
+@app.route('/api/complaints/intake-stats', methods=['GET'])
+def get_intake_stats():
+    """Complaint intake queue depth and flush statistics"""
+    return jsonify({'success': True, 'data': complaint_intake.stats()})
+
+@app.route('/api/maintenance', methods=['GET'])
+def get_maintenance_runs():
+    """Stats of recent expiry sweeper runs"""
+    return jsonify({'success': True, 'data': list(maintenance.run_log)})
+
+@app.route('/api/maintenance/run', methods=['POST'])
+def run_maintenance():
+    """Run the expiry sweeps now (admin only; pass dryRun to only count)"""
+    if session.get('user', {}).get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Admin access required'}), 403
+    data = request.json or {}
+    return jsonify({'success': True, 'data': maintenance.run_once(data.get('dryRun'))})
+
 # ======================== REPORTS ========================
 @app.route('/reports')
 def reports():
@@ -654,6 +1251,12 @@ if __name__ == '__main__':
     # Test database connection
     if test_connection():
         print("✅ Database connection successful")
+        # With the debug reloader only the serving child process sweeps
+        if not APP_CONFIG['DEBUG'] or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            maintenance.start_scheduler()
+            complaint_intake.start()
+            passenger_search.warm()
+            pass_index.warm()
         print(f"🌐 Server starting at http://localhost:{APP_CONFIG['PORT']}")
         print("="*60 + "\n")
         app.run(
@@ -0,0 +1,185 @@
+import json
+import time
+import logging
+from datetime import date, datetime
+from database import Error, transaction, execute_query, use_primary
+from config import AUDIT_CONFIG
+import metrics
+from batches import BatchWriter
+
+logger = logging.getLogger(__name__)
+
+AUDIT_INSERT = """
+    INSERT INTO AUDIT_LOG (TableName, RecordID, Action, OldValues, NewValues, ChangedBy, ChangedAt)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Errors caused by an event's data rather than the database being unavailable
+ROW_ERRORS = {1265, 1366, 1406, 3140}
+
+flush_seconds = metrics.register(metrics.Histogram('transpotrack_audit_flush_seconds',
+                                  'Time to insert and commit one audit batch', (), metrics.SECONDS_BUCKETS))
+flush_rows = metrics.register(metrics.Histogram('transpotrack_audit_flush_rows',
+                               'Audit events per committed batch', (), metrics.ROWS_BUCKETS))
+
+def encode(values):
+    return json.dumps(values, default=str) if values is not None else None
+
+class AuditLog(BatchWriter):
+    """Ring buffer of audit events that a background flusher writes to
+    AUDIT_LOG in batches, one commit per batch
+
+    Recording an event only appends it to memory, so requests never wait on
+    the audit insert. The buffer is bounded: when the flusher can't keep up
+    (or the database is down for long) the oldest events are overwritten and
+    counted as dropped, rather than holding up the writes being audited.
+    """
+    def __init__(self, capacity, batch_size, flush_interval):
+        super().__init__('audit-flusher', batch_size, flush_interval, AUDIT_CONFIG['RETRY_SECONDS'], capacity)
+        self._stats.update({'recorded': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0})
+
+    def record(self, table, record_id, action, old=None, new=None, changed_by='SYSTEM'):
+        """Queue one INSERT, UPDATE or DELETE of a row for the audit log"""
+        if record_id is None:
+            return
+        self.start()
+        event = (table, int(record_id), action,
+                 dict(old) if old is not None else None, dict(new) if new is not None else None,
+                 changed_by, datetime.now().replace(microsecond=0))
+        with self._condition:
+            if len(self._queue) == self._queue.maxlen:
+                self._stats['dropped'] += 1
+            self._put(event)
+            self._stats['recorded'] += 1
+
+    def _insert(self, events):
+        with transaction() as tx:
+            tx.executemany(AUDIT_INSERT, [
+                (table, record_id, action, encode(old), encode(new), changed_by, changed_at)
+                for table, record_id, action, old, new, changed_by, changed_at in events
+            ])
+
+    def _write(self, batch):
+        """Insert a batch; returns the events that should be retried later"""
+        started = time.monotonic()
+        try:
+            self._insert(batch)
+            written, failed = batch, []
+        except Error as e:
+            if e.errno not in ROW_ERRORS:
+                logger.warning(f"Audit batch of {len(batch)} failed, will retry: {e}")
+                return batch
+            # One bad event fails the whole batch; find it event by event
+            written, failed = [], []
+            for event in batch:
+                try:
+                    self._insert([event])
+                    written.append(event)
+                except Error as event_error:
+                    if event_error.errno not in ROW_ERRORS:
+                        # The database went away mid-way: retry what is left
+                        return batch[len(written) + len(failed):]
+                    logger.error(f"Dropping audit event for {event[0]} {event[1]}: {event_error}")
+                    failed.append(event)
+
+        elapsed = time.monotonic() - started
+        flush_seconds.observe((), elapsed)
+        flush_rows.observe((), len(written))
+        with self._condition:
+            self._stats['written'] += len(written)
+            self._stats['failed'] += len(failed)
+            self._stats['batches'] += 1
+        return []
+
+    def stats(self):
+        stats = super().stats()
+        stats['buffered'] = stats.pop('queue_depth')
+        return stats
+
+def add_months(day, months):
+    """First day of the month `months` after the month of `day`"""
+    month = day.year * 12 + day.month - 1 + months
+    return date(month // 12, month % 12 + 1, 1)
+
+@use_primary()
+def partitions():
+    """AUDIT_LOG's partitions as (name, upper bound), the MAXVALUE one with None
+
+    Returns None when the table isn't partitioned.
+    """
+    result = execute_query("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'AUDIT_LOG' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)
+    if not result['success']:
+        raise Error(msg=result['error'])
+    if not result['data']:
+        return None
+    found = []
+    for row in result['data']:
+        bound = row['PARTITION_DESCRIPTION'].strip("'")
+        found.append((row['PARTITION_NAME'], None if bound == 'MAXVALUE' else date.fromisoformat(bound[:10])))
+    return found
+
+def maintain_partitions(dry_run=False, today=None):
+    """Add monthly partitions ahead of time and drop those past retention
+
+    Rows are removed by dropping whole months, never by DELETE. Returns
+    the partitions added and dropped (or that would be, on a dry run).
+    """
+    today = today or date.today()
+    stats = {'added': [], 'dropped': []}
+    try:
+        existing = partitions()
+    except Error as e:
+        return {**stats, 'error': str(e)}
+    if existing is None:
+        return {**stats, 'error': 'AUDIT_LOG is not partitioned'}
+
+    bounds = [bound for _, bound in existing if bound is not None]
+    overflow = next((name for name, bound in existing if bound is None), None)
+
+    # Each new partition holds one month: pYYYYMM, values before the next
+    # month. They continue from the highest existing bound, so months that
+    # have gone by since (or since the table was partitioned) get their own
+    # partition instead of being folded into the current one
+    target = add_months(today, AUDIT_CONFIG['PARTITIONS_AHEAD'] + 1)
+    new = []
+    if bounds:
+        bound = add_months(max(bounds), 1)
+    else:
+        new.append(('p_history', add_months(today, 0)))
+        bound = add_months(today, 1)
+    while bound <= target:
+        new.append((f"p{add_months(bound, -1):%Y%m}", bound))
+        bound = add_months(bound, 1)
+    if new and overflow is not None:
+        stats['added'] = [name for name, _ in new]
+        if not dry_run:
+            definitions = ', '.join(f"PARTITION {name} VALUES LESS THAN ('{bound}')" for name, bound in new)
+            result = execute_query(f"""
+                ALTER TABLE AUDIT_LOG REORGANIZE PARTITION {overflow} INTO (
+                    {definitions}, PARTITION {overflow} VALUES LESS THAN (MAXVALUE)
+                )
+            """, fetch=False)
+            if not result['success']:
+                return {**stats, 'error': result['error']}
+
+    cutoff = add_months(today, -AUDIT_CONFIG['RETENTION_MONTHS'])
+    if stats['added']:
+        existing = existing[:-1] + new + existing[-1:]
+    expired = [name for name, bound in existing if bound is not None and bound <= cutoff]
+    if expired:
+        stats['dropped'] = expired
+        if not dry_run:
+            result = execute_query(f"ALTER TABLE AUDIT_LOG DROP PARTITION {', '.join(expired)}", fetch=False)
+            if not result['success']:
+                return {**stats, 'error': result['error']}
+    return stats
+
+audit_log = AuditLog(AUDIT_CONFIG['BUFFER_SIZE'], AUDIT_CONFIG['BATCH_SIZE'], AUDIT_CONFIG['FLUSH_SECONDS'])
+
+metrics.register(metrics.Gauge('transpotrack_audit_buffered', 'Audit events waiting to be written',
+                               lambda: audit_log.stats()['buffered']))
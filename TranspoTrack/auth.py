@@ -0,0 +1,187 @@
+import hashlib
+import hmac
+import os
+import queue
+import threading
+import time
+import logging
+import mysql.connector
+from mysql.connector import Error, errorcode
+from config import DB_CONFIG, AUTH_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Per-process salt: credential hashes are never comparable across restarts
+_salt = os.urandom(16)
+
+_lock = threading.Lock()
+_credentials = {}   # credential hash -> (username, expires_at)
+_user_keys = {}     # username -> set of credential hashes
+_grants = {}        # username -> (parsed grants, expires_at)
+_in_flight = {}     # credential hash -> [Event, result]
+
+# Connections used only to verify credentials with COM_CHANGE_USER
+_auth_connections = queue.Queue()
+_auth_slots = threading.Semaphore(AUTH_CONFIG['POOL_SIZE'])
+
+# ER_DBACCESS_DENIED_ERROR, ER_ACCESS_DENIED_ERROR: the credentials are wrong.
+# Any other error is the connection's fault, not the user's
+ACCESS_DENIED = {errorcode.ER_DBACCESS_DENIED_ERROR, errorcode.ER_ACCESS_DENIED_ERROR}
+
+def credential_key(username, password):
+    """Salted hash identifying a username/password pair"""
+    return hmac.new(_salt, f"{username}\0{password}".encode(), hashlib.sha256).hexdigest()
+
+def parse_grants(rows):
+    """Reduce SHOW GRANTS output to what role checks need"""
+    grants = [str(row[0]) for row in rows]
+    return {
+        'all_privileges': any('ALL PRIVILEGES' in grant for grant in grants),
+        'grants': grants
+    }
+
+def service_connection():
+    """Open a connection as the application's service user"""
+    return mysql.connector.connect(
+        host=DB_CONFIG['host'],
+        port=DB_CONFIG['port'],
+        user=DB_CONFIG['user'],
+        password=DB_CONFIG['password'],
+        database=DB_CONFIG['database']
+    )
+
+def discard(connection):
+    try:
+        connection.close()
+    except Error:
+        pass
+
+def verify_credentials(username, password):
+    """Check credentials against MySQL and return the user's parsed grants
+
+    Borrows a pooled connection and switches it to the user with
+    COM_CHANGE_USER instead of opening a new TCP connection per login.
+    Returns None when the credentials are rejected; other database errors
+    are raised.
+    """
+    if not _auth_slots.acquire(timeout=AUTH_CONFIG['CHECKOUT_TIMEOUT']):
+        raise Error(msg='Authentication is busy, please retry')
+    connection = None
+    try:
+        for attempt in range(2):
+            if connection is None:
+                try:
+                    connection = _auth_connections.get_nowait()
+                except queue.Empty:
+                    connection = service_connection()
+            
+            try:
+                connection.cmd_change_user(username=username, password=password,
+                                           database=DB_CONFIG['database'])
+                break
+            except Error as e:
+                # The session is in an unknown state after a failed change; drop it
+                discard(connection)
+                connection = None
+                if e.errno in ACCESS_DENIED:
+                    return None
+                if attempt:
+                    raise
+                # A pooled connection may have been closed by the server
+                # (wait_timeout, restart); retry once on a fresh one
+                logger.warning(f"Auth connection failed, retrying on a new one: {e}")
+                connection = service_connection()
+        
+        cursor = connection.cursor()
+        cursor.execute("SHOW GRANTS FOR CURRENT_USER()")
+        grants = parse_grants(cursor.fetchall())
+        cursor.close()
+        
+        try:
+            connection.cmd_change_user(username=DB_CONFIG['user'], password=DB_CONFIG['password'],
+                                       database=DB_CONFIG['database'])
+        except Error as e:
+            # The user is already verified; only the connection is lost
+            logger.warning(f"Could not switch auth connection back to the service user: {e}")
+            discard(connection)
+            connection = None
+            return grants
+        _auth_connections.put(connection)
+        connection = None
+        return grants
+    finally:
+        if connection is not None:
+            discard(connection)
+        _auth_slots.release()
+
+def resolve(username, password):
+    """Verified grants for a credential pair, from cache or MySQL
+
+    Concurrent checks of the same credentials wait for the first one
+    instead of each hitting the database.
+    """
+    key = credential_key(username, password)
+    now = time.monotonic()
+    with _lock:
+        cached = _credentials.get(key)
+        grants = _grants.get(username)
+        if cached and cached[1] > now and grants and grants[1] > now:
+            return grants[0]
+        
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = [threading.Event(), None]
+            _in_flight[key] = flight
+    
+    if not leader:
+        flight[0].wait()
+        if isinstance(flight[1], Exception):
+            raise flight[1]
+        return flight[1]
+    
+    try:
+        grants = verify_credentials(username, password)
+        flight[1] = grants
+        if grants is not None:
+            now = time.monotonic()
+            with _lock:
+                _credentials[key] = (username, now + AUTH_CONFIG['CREDENTIAL_TTL_SECONDS'])
+                _user_keys.setdefault(username, set()).add(key)
+                _grants[username] = (grants, now + AUTH_CONFIG['GRANTS_TTL_SECONDS'])
+        return grants
+    except Exception as e:
+        flight[1] = e
+        raise
+    finally:
+        with _lock:
+            _in_flight.pop(key, None)
+        flight[0].set()
+
+def revoke(username):
+    """Forget every cached credential and grant for a user"""
+    with _lock:
+        for key in _user_keys.pop(username, ()):
+            _credentials.pop(key, None)
+        _grants.pop(username, None)
+
+def authenticate_user(username, password, role):
+    """Authenticate user with database credentials"""
+    try:
+        grants = resolve(username, password)
+    except Error as e:
+        logger.error(f"Authentication error: {e}")
+        return {'success': False, 'error': 'Authentication unavailable, please retry'}
+    
+    if grants is None:
+        return {'success': False, 'error': 'Invalid username or password'}
+    
+    if role == 'admin':
+        # Admin should have all privileges
+        if grants['all_privileges']:
+            return {'success': True, 'role': 'admin'}
+        return {'success': False, 'error': 'User does not have admin privileges'}
+    elif role == 'user':
+        # Passenger should have limited access
+        return {'success': True, 'role': 'user'}
+    return {'success': False, 'error': 'Invalid role'}
@@ -0,0 +1,121 @@
+import atexit
+import threading
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class BatchWriter:
+    """Queue that a background thread writes out in batches
+
+    The writer takes a batch once `batch_size` items are queued, or
+    `flush_interval` seconds after the first of them arrived, so a trickle
+    of items is never held back waiting for a full batch. Subclasses
+    implement `_write`, which returns the items to retry; the writer waits
+    `retry_seconds` and writes those again before taking the next batch.
+    With a `capacity`, the queue keeps only the newest items.
+    """
+    def __init__(self, name, batch_size, flush_interval, retry_seconds, capacity=None):
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_seconds = retry_seconds
+        self._queue = deque(maxlen=capacity)
+        self._in_flight = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stats = {'retries': 0, 'errors': 0}
+
+    def start(self):
+        """Start the writer, once"""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._starting()
+            self._thread.start()
+        atexit.register(self.drain)
+
+    def _starting(self):
+        """Called under the lock just before the writer starts"""
+
+    def _put(self, item):
+        """Queue an item; the caller holds the lock"""
+        self._queue.append(item)
+        # The first item starts the flush interval, a full batch ends it
+        if len(self._queue) == 1 or len(self._queue) >= self.batch_size:
+            self._condition.notify()
+
+    def _pending(self):
+        """Items queued or being written"""
+        return len(self._queue) + len(self._in_flight)
+
+    def _next_batch(self):
+        """Wait for a full batch or the flush interval, then take a batch"""
+        with self._condition:
+            while not self._queue:
+                self._condition.wait()
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._queue) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            self._in_flight = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            return self._in_flight
+
+    def _write(self, batch):
+        """Write a batch; returns the items that should be retried later"""
+        raise NotImplementedError
+
+    def _written(self):
+        """Called after a batch was written and nothing is left to retry"""
+
+    def _run(self):
+        batch = []
+        while True:
+            failed = False
+            try:
+                if not batch:
+                    batch = self._next_batch()
+                retry = self._write(batch)
+            except Exception:
+                # Anything unexpected (a spill file error, a bug) must not
+                # stop the writer while items keep being queued
+                logger.exception(f"{self.name} failed on a batch of {len(batch)}, will retry")
+                retry, failed = batch, True
+            with self._condition:
+                # Items to retry stay in flight, ahead of everything queued
+                self._in_flight = list(retry)
+                if failed:
+                    self._stats['errors'] += 1
+                if retry:
+                    self._stats['retries'] += 1
+            batch = retry
+            if retry or failed:
+                time.sleep(self.retry_seconds)
+                continue
+            try:
+                self._written()
+            except Exception:
+                logger.exception(f"{self.name} failed after writing a batch")
+
+    def drain(self, timeout=5.0):
+        """Give the writer a moment to write what is queued at shutdown"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._condition:
+                if not self._pending():
+                    return
+                self._condition.notify()
+            time.sleep(0.05)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'queue_depth': len(self._queue),
+                'in_flight': len(self._in_flight),
+                'writer_alive': self._thread is not None and self._thread.is_alive(),
+                **self._stats
+            }
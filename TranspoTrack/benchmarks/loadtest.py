@@ -0,0 +1,268 @@
+"""HTTP load test against a running TranspoTrack app
+
+Drives a weighted mix of requests from concurrent workers for a fixed
+duration and reports throughput, p50/p95/p99 latency and error rate per
+endpoint. Results can be saved as a baseline and later runs compared
+against it; the exit status is 1 when any endpoint regressed.
+
+    python benchmarks/seed.py
+    python app.py &
+    python benchmarks/loadtest.py --mix mixed --duration 60 --save baseline.json
+    python benchmarks/loadtest.py --mix mixed --duration 60 --baseline baseline.json
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import execute_query
+from seed import PREFIX, EMAIL_DOMAIN, PAYMENT_METHODS, SEAT_CAPACITY
+
+class Dataset:
+    """IDs from the seeded dataset that requests are built from"""
+    def __init__(self):
+        result = execute_query(f"SELECT PassengerID FROM PASSENGER WHERE Email LIKE '%%@{EMAIL_DOMAIN}'")
+        self.passenger_ids = [row['PassengerID'] for row in result['data']] if result['success'] else []
+        result = execute_query(f"""
+            SELECT s.ScheduleID, s.DayOfWeek, rs.StationID
+            FROM SCHEDULE s
+            JOIN ROUTE_STATION rs ON rs.RouteID = s.RouteID
+            WHERE s.ScheduleCode LIKE '{PREFIX}H%'
+            ORDER BY s.ScheduleID, rs.SequenceNumber
+        """)
+        self.schedules = {}
+        for row in result['data'] if result['success'] else []:
+            self.schedules.setdefault(row['ScheduleID'], (row['DayOfWeek'], []))[1].append(row['StationID'])
+        self.schedule_ids = list(self.schedules)
+        if not self.passenger_ids or not self.schedule_ids:
+            raise SystemExit("No seeded dataset found; run benchmarks/seed.py first")
+
+    def trip(self, rng):
+        """A random schedule, a journey date it runs on and two stops along it"""
+        schedule_id = rng.choice(self.schedule_ids)
+        day, stops = self.schedules[schedule_id]
+        # Future dates keep new bookings clear of the seeded ones
+        first = date.today() + timedelta(days=30)
+        weekday = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'].index(day)
+        journey = first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * rng.randrange(52))
+        source = rng.randrange(len(stops) - 1)
+        dest = rng.randrange(source + 1, len(stops))
+        return schedule_id, journey.isoformat(), stops[source], stops[dest]
+
+# Each scenario returns (name, method, path, JSON body or None)
+def dashboard(rng, data):
+    return 'dashboard', 'GET', '/dashboard', None
+
+def list_passengers(rng, data):
+    return 'list_passengers', 'GET', '/api/passengers?limit=100', None
+
+def list_tickets(rng, data):
+    return 'list_tickets', 'GET', f"/api/tickets?limit=100&passengerId={rng.choice(data.passenger_ids)}", None
+
+def list_stations(rng, data):
+    return 'list_stations', 'GET', '/api/stations?limit=100', None
+
+def user_schedules(rng, data):
+    return 'user_schedules', 'GET', '/api/user/schedules', None
+
+def book_procedure(rng, data):
+    schedule_id, journey, source, dest = data.trip(rng)
+    return 'book_procedure', 'POST', '/api/book-ticket', {
+        'passengerId': rng.choice(data.passenger_ids),
+        'scheduleId': schedule_id,
+        'sourceStationId': source,
+        'destStationId': dest,
+        'seatNumber': f"A{rng.randint(1, SEAT_CAPACITY):02d}",
+        'journeyDate': journey,
+        'fare': 0,
+        'paymentMethod': rng.choice(PAYMENT_METHODS)
+    }
+
+def book_user(rng, data):
+    schedule_id, journey, source, dest = data.trip(rng)
+    return 'book_user', 'POST', '/api/user/book-ticket', {
+        'passengerId': rng.choice(data.passenger_ids),
+        'scheduleId': schedule_id,
+        'fromStation': source,
+        'toStation': dest,
+        'journeyDate': journey,
+        'fare': 0
+    }
+
+def revenue_report(rng, data):
+    start = date(2024, 1, 1) + timedelta(days=rng.randrange(150))
+    return 'revenue_report', 'POST', '/api/revenue-report', {
+        'startDate': start.isoformat(), 'endDate': (start + timedelta(days=30)).isoformat()
+    }
+
+def daily_bookings(rng, data):
+    return 'daily_bookings', 'GET', '/api/reports/daily-bookings', None
+
+def popular_routes(rng, data):
+    return 'popular_routes', 'GET', '/api/reports/popular-routes', None
+
+# Weighted scenario mixes
+MIXES = {
+    'browse': [(30, list_passengers), (20, list_tickets), (20, list_stations),
+               (20, user_schedules), (10, dashboard)],
+    'booking': [(45, book_user), (45, book_procedure), (10, user_schedules)],
+    'reports': [(40, revenue_report), (30, daily_bookings), (30, popular_routes)],
+    'mixed': [(20, list_passengers), (15, list_tickets), (10, list_stations), (15, user_schedules),
+              (10, dashboard), (10, book_user), (10, book_procedure), (4, revenue_report),
+              (3, daily_bookings), (3, popular_routes)]
+}
+
+class Worker(threading.Thread):
+    """Sends requests over one keep-alive connection until the deadline"""
+    def __init__(self, base_url, mix, data, seed, deadline, record_after):
+        super().__init__(daemon=True)
+        self.url = urlsplit(base_url)
+        self.scenarios = [scenario for _, scenario in mix]
+        self.weights = [weight for weight, _ in mix]
+        self.data = data
+        self.rng = random.Random(seed)
+        self.deadline = deadline
+        self.record_after = record_after
+        self.samples = []       # (name, seconds, ok)
+        self.connection = None
+
+    def request(self, method, path, body):
+        payload = json.dumps(body) if body is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.url.hostname, self.url.port or 80, timeout=30)
+            try:
+                self.connection.request(method, path, payload, headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                if response.getheader('Connection', '').lower() == 'close' or response.version == 10:
+                    self.connection.close()
+                    self.connection = None
+                return response.status, response.getheader('Content-Type', ''), content
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+    def run(self):
+        while time.monotonic() < self.deadline:
+            scenario = self.rng.choices(self.scenarios, self.weights)[0]
+            name, method, path, body = scenario(self.rng, self.data)
+            started = time.monotonic()
+            try:
+                status, content_type, content = self.request(method, path, body)
+                ok = status < 400
+                if ok and content_type.startswith('application/json'):
+                    ok = json.loads(content).get('success', True) is not False
+            except (http.client.HTTPException, OSError, ValueError):
+                ok = False
+            finished = time.monotonic()
+            if started >= self.record_after:
+                self.samples.append((name, finished - started, ok))
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize(samples, seconds):
+    by_endpoint = {}
+    for name, latency, ok in samples:
+        entry = by_endpoint.setdefault(name, ([], [0]))
+        entry[0].append(latency)
+        if not ok:
+            entry[1][0] += 1
+    report = {}
+    for name, (latencies, errors) in sorted(by_endpoint.items()):
+        latencies.sort()
+        report[name] = {
+            'requests': len(latencies),
+            'throughput_rps': round(len(latencies) / seconds, 2),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'error_rate': round(errors[0] / len(latencies), 4)
+        }
+    return report
+
+def compare(report, baseline, tolerance):
+    """Endpoints that got slower, lost throughput or fail more than the baseline"""
+    regressions = []
+    for name, current in report.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {current['p95_ms']} ms")
+        if current['p99_ms'] > base['p99_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {base['p99_ms']} -> {current['p99_ms']} ms")
+        if current['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput_rps']} -> {current['throughput_rps']} req/s")
+        if current['error_rate'] > base['error_rate'] + 0.01:
+            regressions.append(f"{name}: error rate {base['error_rate']:.2%} -> {current['error_rate']:.2%}")
+    return regressions
+
+def print_report(report):
+    print(f"{'endpoint':<18}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for name, row in report.items():
+        print(f"{name:<18}{row['requests']:>10}{row['throughput_rps']:>10}{row['p50_ms']:>10}"
+              f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['error_rate']:>9.2%}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test a running TranspoTrack app")
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--mix', choices=sorted(MIXES), default='mixed')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30, help="measured seconds")
+    parser.add_argument('--warmup', type=float, default=5, help="unmeasured seconds before that")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--save', help="write the results as a baseline JSON file")
+    parser.add_argument('--baseline', help="compare against a saved baseline JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="allowed relative regression")
+    args = parser.parse_args()
+    
+    data = Dataset()
+    started = time.monotonic()
+    record_after = started + args.warmup
+    deadline = record_after + args.duration
+    workers = [Worker(args.url, MIXES[args.mix], data, args.seed * 1000 + i, deadline, record_after)
+               for i in range(args.concurrency)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    
+    report = summarize([sample for worker in workers for sample in worker.samples], args.duration)
+    print(f"Mix '{args.mix}', {args.concurrency} workers, {args.duration:.0f}s measured")
+    print_report(report)
+    
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'mix': args.mix, 'concurrency': args.concurrency, 'endpoints': report}, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('mix') != args.mix or baseline.get('concurrency') != args.concurrency:
+            print("⚠️  Baseline was recorded with a different mix or concurrency")
+        regressions = compare(report, baseline['endpoints'], args.tolerance)
+        if regressions:
+            print("❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("✅ No regressions against baseline")
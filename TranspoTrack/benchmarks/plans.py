@@ -0,0 +1,223 @@
+"""Query-plan regression suite
+
+Calls every GET API endpoint of the app (plus the read-only POSTs listed
+below) through Flask's test client against a large seeded dataset,
+captures each SQL statement the app issues along the way, and runs
+EXPLAIN FORMAT=JSON on it. A plan fails when it reads more than
+--max-rows rows through a full table or index scan, or sorts more than
+that many rows with a filesort.
+
+Plans can be saved as a baseline; against a baseline only new problems
+fail the run, so a known, accepted scan does not hide a new one.
+
+    python benchmarks/seed.py --scale 1000000
+    python benchmarks/plans.py --save plans.json
+    python benchmarks/plans.py --baseline plans.json
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import execute_query
+import metrics
+from app import app
+
+# Statements allowed to scan whole tables, with the reason
+ALLOWED = {
+    '/api/tickets/export': 'exports stream the whole table in key order',
+    '/api/payments/export': 'exports stream the whole table in key order',
+    '/metrics': 'no SQL'
+}
+
+# Read-only requests that are not plain GETs
+EXTRA_REQUESTS = [
+    ('POST', '/api/check-seat', lambda ids: {'scheduleId': ids['schedule'], 'seatNumber': 'A01',
+                                               'journeyDate': '2024-03-04'}),
+    ('POST', '/api/passes/validate', lambda ids: {'passengerId': ids['passenger']}),
+    ('GET', '/api/tickets?passengerId={passenger}', None),
+    ('GET', '/api/tickets?status=Booked&from=2024-02-01&to=2024-02-29', None),
+    ('GET', '/api/passes?passengerId={passenger}', None),
+    ('GET', '/api/passengers?city=Mysuru', None),
+    ('GET', '/api/complaints?status=Pending', None),
+    ('GET', '/api/fare?from={from_station}&to={to_station}', None),
+    ('GET', '/api/journeys?from={from_station}&to={to_station}', None),
+    ('GET', '/api/schedules/{schedule}/seats?date=2024-03-04', None)
+]
+
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')
+
+def sample_ids():
+    """IDs that path parameters and filters are filled in with"""
+    result = execute_query("""
+        SELECT (SELECT MIN(PassengerID) FROM PASSENGER) as passenger,
+               (SELECT MIN(StationID) FROM STATION) as station,
+               (SELECT MIN(ScheduleID) FROM SCHEDULE) as schedule,
+               (SELECT MIN(VehicleID) FROM VEHICLE) as vehicle,
+               (SELECT MIN(TicketNumber) FROM TICKET) as ticket
+    """)
+    ids = dict(result['data'][0])
+    result = execute_query("""
+        SELECT a.StationID as from_station, b.StationID as to_station
+        FROM ROUTE_STATION a
+        JOIN ROUTE_STATION b ON a.RouteID = b.RouteID AND b.SequenceNumber > a.SequenceNumber
+        LIMIT 1
+    """)
+    if result['success'] and result['data']:
+        ids.update(result['data'][0])
+    return ids
+
+# Path parameter name for each URL prefix
+PATH_IDS = {
+    '/api/passengers/': 'passenger',
+    '/api/stations/': 'station',
+    '/api/schedules/': 'schedule',
+    '/api/vehicles/': 'vehicle',
+    '/api/tickets/': 'ticket',
+    '/api/passenger-age/': 'passenger'
+}
+
+def requests_to_run(ids):
+    """(label, method, path, body) for every GET route and extra request"""
+    requests = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if 'GET' not in rule.methods or not rule.rule.startswith(('/api/', '/metrics')):
+            continue
+        path = rule.rule
+        for prefix, name in PATH_IDS.items():
+            if path.startswith(prefix):
+                path = path.replace('<int:id>', str(ids[name])).replace('<int:passenger_id>', str(ids[name]))
+        if '<' in path:
+            continue
+        requests.append((rule.rule, 'GET', path, None))
+    for method, path, body in EXTRA_REQUESTS:
+        requests.append((path.split('?')[0], method, path.format(**ids), body(ids) if body else None))
+    return requests
+
+class Capture:
+    """Records (statement, params) of every cursor.execute while active"""
+    def __init__(self):
+        self.statements = []
+        self._execute = metrics.TimedCursor.execute
+
+    def __enter__(self):
+        capture = self
+        original = self._execute
+        def execute(cursor, operation, params=(), *args, **kwargs):
+            capture.statements.append((operation, params))
+            return original(cursor, operation, params, *args, **kwargs)
+        metrics.TimedCursor.execute = execute
+        return self
+
+    def __exit__(self, *exc_info):
+        metrics.TimedCursor.execute = self._execute
+
+def plan_problems(node, max_rows, problems=None):
+    """Full scans and filesorts over max_rows anywhere in an EXPLAIN JSON plan"""
+    if problems is None:
+        problems = []
+    if isinstance(node, list):
+        for item in node:
+            plan_problems(item, max_rows, problems)
+        return problems
+    if not isinstance(node, dict):
+        return problems
+    
+    table = node.get('table')
+    if isinstance(table, dict):
+        rows = table.get('rows_examined_per_scan', 0)
+        if table.get('access_type') in ('ALL', 'index') and rows > max_rows:
+            kind = 'full table scan' if table['access_type'] == 'ALL' else 'full index scan'
+            problems.append(f"{kind} of {table.get('table_name')} (~{rows} rows)")
+    for key in ('ordering_operation', 'grouping_operation', 'duplicates_removal'):
+        operation = node.get(key)
+        if isinstance(operation, dict) and operation.get('using_filesort'):
+            rows = max_examined(operation)
+            if rows > max_rows:
+                problems.append(f"filesort for {key.split('_')[0]} over ~{rows} rows")
+    for value in node.values():
+        if isinstance(value, (dict, list)):
+            plan_problems(value, max_rows, problems)
+    return problems
+
+def max_examined(node):
+    """Largest per-table row estimate below a plan node"""
+    if isinstance(node, list):
+        return max((max_examined(item) for item in node), default=0)
+    if not isinstance(node, dict):
+        return 0
+    rows = node.get('table', {}).get('rows_examined_per_scan', 0) if isinstance(node.get('table'), dict) else 0
+    return max([rows] + [max_examined(value) for value in node.values() if isinstance(value, (dict, list))])
+
+def explain(statement, params):
+    result = execute_query(f"EXPLAIN FORMAT=JSON {statement}", params)
+    if not result['success']:
+        return None, result['error']
+    return json.loads(list(result['data'][0].values())[0]), None
+
+def run(max_rows):
+    """{statement: {'endpoints': [...], 'problems': [...]}} for every captured statement"""
+    ids = sample_ids()
+    client = app.test_client()
+    plans = {}
+    for label, method, path, body in requests_to_run(ids):
+        with Capture() as capture:
+            response = client.open(path, method=method, json=body)
+            response.get_data()
+        if response.status_code >= 500:
+            print(f"⚠️  {method} {path} returned {response.status_code}")
+        for statement, params in capture.statements:
+            key = metrics.normalize(statement)
+            entry = plans.setdefault(key, {'endpoints': [], 'problems': None})
+            if label not in entry['endpoints']:
+                entry['endpoints'].append(label)
+            if entry['problems'] is not None or not key.upper().startswith(EXPLAINABLE):
+                continue
+            plan, error = explain(statement, params)
+            entry['problems'] = [f"EXPLAIN failed: {error}"] if plan is None else plan_problems(plan, max_rows)
+    return plans
+
+def failures(plans, baseline):
+    """Problems not in the baseline and not on an allowed endpoint"""
+    failed = {}
+    for statement, entry in plans.items():
+        if not entry['problems'] or all(endpoint in ALLOWED for endpoint in entry['endpoints']):
+            continue
+        known = set(baseline.get(statement, {}).get('problems') or [])
+        new = [problem for problem in entry['problems'] if problem not in known]
+        if new:
+            failed[statement] = (entry['endpoints'], new)
+    return failed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="EXPLAIN every query the app issues and flag bad plans")
+    parser.add_argument('--max-rows', type=int, default=10000,
+                        help="rows a full scan or filesort may touch before it fails")
+    parser.add_argument('--save', help="write the plans as a baseline JSON file")
+    parser.add_argument('--baseline', help="only fail on problems missing from this baseline")
+    args = parser.parse_args()
+    
+    plans = run(args.max_rows)
+    explained = sum(1 for entry in plans.values() if entry['problems'] is not None)
+    print(f"Captured {len(plans)} distinct statements, explained {explained}")
+    
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(plans, f, indent=2, sort_keys=True)
+        print(f"Plans saved to {args.save}")
+    
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failed = failures(plans, baseline)
+    if failed:
+        print(f"❌ {len(failed)} statement(s) with plan regressions:")
+        for statement, (endpoints, problems) in sorted(failed.items()):
+            print(f"\n  {statement}\n    used by: {', '.join(endpoints)}")
+            for problem in problems:
+                print(f"    - {problem}")
+        sys.exit(1)
+    print("✅ No plan regressions")
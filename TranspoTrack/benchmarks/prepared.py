@@ -0,0 +1,121 @@
+"""Text protocol vs server-side prepared statements on the booking path
+
+Runs each statement of a single booking (validation, seat map load,
+passenger lookup, ticket insert) many times on one connection, first as
+plain text queries and then through a prepared cursor, and reports the
+per-execution latency of both. The inserts run in a transaction that is
+rolled back, so the database is left as it was.
+
+    python benchmarks/seed.py
+    python benchmarks/prepared.py --iterations 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import execute_query, get_connection
+from bookings import VALIDATION_QUERY, TICKET_INSERT
+from loadtest import percentile
+
+SEAT_CAPACITY_QUERY = """
+    SELECT v.Capacity
+    FROM ASSIGNED_TO a
+    JOIN VEHICLE v ON a.VehicleID = v.VehicleID
+    WHERE a.ScheduleID = %s AND a.AssignmentDate = %s
+      AND a.AssignmentStatus <> 'Cancelled'
+    ORDER BY v.Capacity DESC
+    LIMIT 1
+"""
+
+SEAT_MAP_QUERY = """
+    SELECT SeatNumber FROM TICKET
+    WHERE ScheduleID = %s AND JourneyDate = %s
+      AND TicketStatus IN ('Booked', 'Used')
+"""
+
+PASSENGER_QUERY = "SELECT * FROM PASSENGER WHERE PassengerID = %s"
+
+def sample_trip():
+    result = execute_query("""
+        SELECT t.PassengerID, t.ScheduleID, t.JourneyDate, t.SourceStationID, t.DestStationID
+        FROM TICKET t
+        ORDER BY t.TicketNumber
+        LIMIT 1
+    """)
+    if not result['success'] or not result['data']:
+        raise SystemExit("No tickets found; run benchmarks/seed.py first")
+    return result['data'][0]
+
+def statements(trip):
+    """(name, query, params for iteration i) on the booking path"""
+    return [
+        ('validation', VALIDATION_QUERY, lambda i: (
+            trip['PassengerID'], trip['ScheduleID'], trip['SourceStationID'], trip['DestStationID'])),
+        ('seat_capacity', SEAT_CAPACITY_QUERY, lambda i: (trip['ScheduleID'], trip['JourneyDate'])),
+        ('seat_map', SEAT_MAP_QUERY, lambda i: (trip['ScheduleID'], trip['JourneyDate'])),
+        ('passenger', PASSENGER_QUERY, lambda i: (trip['PassengerID'],)),
+        ('ticket_insert', TICKET_INSERT, lambda i: (
+            f"BNPREP{i:012d}", f"Z{i}", '2099-12-31', 10, trip['PassengerID'], trip['ScheduleID'],
+            trip['SourceStationID'], trip['DestStationID']))
+    ]
+
+def session_counters(cursor):
+    cursor.execute("SHOW SESSION STATUS WHERE Variable_name IN ('Com_stmt_prepare', 'Com_stmt_execute', 'Questions')")
+    return {row['Variable_name']: int(row['Value']) for row in cursor.fetchall()}
+
+def time_statement(cursor, query, params, iterations, offset):
+    """Per-execution seconds of one statement, results fully fetched"""
+    timings = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        cursor.execute(query, params(offset + i))
+        if cursor.description:
+            cursor.fetchall()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings
+
+def run(iterations):
+    trip = sample_trip()
+    connection = get_connection()
+    text_cursor = connection.cursor(dictionary=True)
+    report = []
+    try:
+        before = session_counters(text_cursor)
+        for index, (name, query, params) in enumerate(statements(trip)):
+            text = time_statement(text_cursor, query, params, iterations, index * iterations * 2)
+            prepared_cursor = connection.cursor(prepared=True, dictionary=True)
+            prepared = time_statement(prepared_cursor, query, params, iterations,
+                                      index * iterations * 2 + iterations)
+            prepared_cursor.close()
+            report.append((name, text, prepared))
+        after = session_counters(text_cursor)
+    finally:
+        # Nothing inserted here is kept
+        connection.rollback()
+        text_cursor.close()
+        connection.close()
+    return report, {name: after[name] - before[name] for name in after}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare text and prepared statements on the booking path")
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+    
+    report, counters = run(args.iterations)
+    print(f"{args.iterations} executions per statement and protocol (microseconds)")
+    print(f"{'statement':<15}{'text p50':>10}{'text p95':>10}{'prep p50':>10}{'prep p95':>10}{'saved':>9}")
+    text_total = prepared_total = 0.0
+    for name, text, prepared in report:
+        text_total += sum(text)
+        prepared_total += sum(prepared)
+        saved = 1 - percentile(prepared, 0.5) / percentile(text, 0.5)
+        print(f"{name:<15}{percentile(text, 0.5) * 1e6:>10.0f}{percentile(text, 0.95) * 1e6:>10.0f}"
+              f"{percentile(prepared, 0.5) * 1e6:>10.0f}{percentile(prepared, 0.95) * 1e6:>10.0f}{saved:>9.1%}")
+    print(f"Booking path total: text {text_total:.2f}s, prepared {prepared_total:.2f}s "
+          f"({1 - prepared_total / text_total:.1%} less)")
+    print(f"Server counters: {counters['Com_stmt_prepare']} prepares for "
+          f"{counters['Com_stmt_execute']} prepared executions")
@@ -0,0 +1,377 @@
+"""Seed the database with a synthetic dataset for benchmarking
+
+Every generated row carries the BN prefix in its code (or a bench e-mail),
+so a seeded dataset can be told apart from real data and removed with
+--reset. Point DB_CONFIG at a scratch schema loaded from the SQL dump.
+
+Demand is skewed the way a real network's is: a few hot routes and a few
+frequent riders take most bookings, and departures and bookings bunch up
+in the morning and evening rush. --scale sizes every table from a ticket
+count (10^5 to 10^8) and stretches the calendar so seats never run out.
+
+    python benchmarks/seed.py --passengers 10000 --tickets 100000
+    python benchmarks/seed.py --scale 10000000 --chunk-size 5000
+"""
+import argparse
+import bisect
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import execute_query, run_in_transaction
+
+PREFIX = 'BN'
+EMAIL_DOMAIN = 'bench.example.com'
+CHUNK_SIZE = 1000
+
+FIRST_NAMES = ['Aarav', 'Diya', 'Ishaan', 'Ananya', 'Vihaan', 'Saanvi', 'Arjun', 'Meera',
+               'Kabir', 'Riya', 'Rohan', 'Priya', 'Aditya', 'Kavya', 'Nikhil', 'Sneha']
+LAST_NAMES = ['Sharma', 'Rao', 'Iyer', 'Patel', 'Reddy', 'Nair', 'Gupta', 'Hegde',
+              'Kumar', 'Shetty', 'Menon', 'Joshi']
+CITIES = ['Bengaluru', 'Mysuru', 'Mangaluru', 'Hubballi', 'Belagavi']
+PAYMENT_METHODS = ['Credit Card', 'Debit Card', 'UPI', 'Net Banking', 'Wallet', 'Cash']
+PASS_TYPES = [('Daily', 1, 50), ('Weekly', 7, 300), ('Monthly', 30, 1000),
+              ('Quarterly', 90, 2700), ('Annual', 365, 10000), ('Student', 30, 500)]
+COMPLAINT_CATEGORIES = ['Service', 'Cleanliness', 'Safety', 'Ticketing', 'Staff Behavior',
+                        'Delay', 'Facility', 'Other']
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+SEAT_CAPACITY = 50
+# Share of seats the calendar is sized to fill, leaving room for hot slots
+TARGET_LOAD = 0.5
+
+# Relative demand per hour of the day, 05:00 to 22:00: morning and evening rush
+HOUR_WEIGHTS = {5: 2, 6: 5, 7: 10, 8: 12, 9: 9, 10: 5, 11: 4, 12: 4, 13: 4, 14: 4,
+                15: 5, 16: 7, 17: 11, 18: 12, 19: 8, 20: 5, 21: 3, 22: 2}
+
+def skewed_index(rng, count, skew):
+    """A power-law pick from range(count): low indices are the hot ones
+
+    skew 1 is uniform; at skew 2 the first 10% of indices get ~32% of picks.
+    """
+    return min(count - 1, int(count * rng.random() ** skew))
+
+def rush_minute(rng):
+    """A minute of the day, drawn with the rush-hour profile"""
+    hour = rng.choices(list(HOUR_WEIGHTS), list(HOUR_WEIGHTS.values()))[0]
+    return hour * 60 + rng.randrange(60)
+
+def insert_chunks(query, rows, label):
+    """executemany `rows` in CHUNK_SIZE pieces, one short transaction each"""
+    progress_every = CHUNK_SIZE * 100
+    started = time.monotonic()
+    total = 0
+    chunk = []
+    
+    def flush(chunk):
+        def work(cursor):
+            cursor.executemany(query, chunk)
+            return {'success': True}
+        result = run_in_transaction(work)
+        if not result['success']:
+            raise RuntimeError(f"Seeding {label} failed: {result['error']}")
+    
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            flush(chunk)
+            total += len(chunk)
+            chunk = []
+            if total % progress_every == 0:
+                print(f"  {label}: {total} rows so far ({time.monotonic() - started:.0f}s)")
+    if chunk:
+        flush(chunk)
+        total += len(chunk)
+    print(f"  {label}: {total} rows in {time.monotonic() - started:.1f}s")
+
+def fetch_ids(query):
+    result = execute_query(query)
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    return [list(row.values())[0] for row in result['data']]
+
+def fetch_id_range(table, key, condition):
+    """IDs of seeded rows as a range when they are contiguous (they usually
+    are, being bulk inserted), so 10^7 passengers need no list in memory"""
+    result = execute_query(f"SELECT MIN({key}) as low, MAX({key}) as high, COUNT(*) as total "
+                           f"FROM {table} WHERE {condition}")
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    row = result['data'][0]
+    if row['total'] and row['high'] - row['low'] + 1 == row['total']:
+        return range(row['low'], row['high'] + 1)
+    return fetch_ids(f"SELECT {key} FROM {table} WHERE {condition} ORDER BY {key}")
+
+def seed_network(rng, stations, routes, vehicles, departures):
+    insert_chunks("""
+        INSERT INTO STATION (StationCode, Name, Location, Type, Capacity, Zone, Status)
+        VALUES (%s, %s, %s, %s, %s, %s, 'Operational')
+    """, ((f"{PREFIX}S{i:05d}", f"Bench Station {i}", f"Bench Area {i % 40}",
+           rng.choice(['Bus-stop', 'Metro', 'Interchange']), rng.randint(200, 5000),
+           f"Zone {i % 5 + 1}") for i in range(stations)), 'STATION')
+    station_ids = fetch_ids(f"SELECT StationID FROM STATION WHERE StationCode LIKE '{PREFIX}S%' ORDER BY StationID")
+    
+    route_rows = []
+    route_stops = []
+    for i in range(routes):
+        stops = rng.sample(station_ids, min(len(station_ids), rng.randint(6, 15)))
+        distances = [0.0] + [round(rng.uniform(0.8, 4.5), 2) for _ in stops[1:]]
+        minutes = [0] + [max(2, round(d * rng.uniform(2.0, 3.5))) for d in distances[1:]]
+        route_stops.append((stops, distances, minutes))
+        route_rows.append((f"{PREFIX}R{i:04d}", f"Bench Route {i}", round(sum(distances), 2), sum(minutes),
+                           rng.choice(['City', 'Express', 'Suburban']), stops[0], stops[-1],
+                           round(rng.uniform(1.5, 3.5), 2)))
+    insert_chunks("""
+        INSERT INTO ROUTE (RouteCode, Name, TotalDistance, EstimatedDuration, RouteType, Status,
+                           StartStationID, EndStationID, OperatingHours, FarePerKM)
+        VALUES (%s, %s, %s, %s, %s, 'Active', %s, %s, '05:00-23:00', %s)
+    """, route_rows, 'ROUTE')
+    route_ids = fetch_ids(f"SELECT RouteID FROM ROUTE WHERE RouteCode LIKE '{PREFIX}R%' ORDER BY RouteID")
+    
+    def route_station_rows():
+        for route_id, (stops, distances, minutes) in zip(route_ids, route_stops):
+            cumulative_distance = 0.0
+            cumulative_time = 0
+            for sequence, (station_id, distance, travel) in enumerate(zip(stops, distances, minutes), 1):
+                cumulative_distance += distance
+                cumulative_time += travel
+                yield (route_id, station_id, sequence, distance, travel,
+                       round(cumulative_distance, 2), cumulative_time)
+    insert_chunks("""
+        INSERT INTO ROUTE_STATION (RouteID, StationID, SequenceNumber, DistanceFromPrevious,
+                                   TravelTimeFromPrevious, CumulativeDistance, CumulativeTime)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, route_station_rows(), 'ROUTE_STATION')
+    
+    insert_chunks("""
+        INSERT INTO VEHICLE (VehicleNumber, Type, Model, Capacity, RegistrationNumber, FuelType, Status)
+        VALUES (%s, %s, 'Bench', %s, %s, %s, 'Active')
+    """, ((f"{PREFIX}V{i:05d}", rng.choice(['Bus', 'Metro', 'BRT']), SEAT_CAPACITY,
+           f"{PREFIX}REG{i:06d}", rng.choice(['Diesel', 'Electric', 'CNG', 'Hybrid']))
+          for i in range(vehicles)), 'VEHICLE')
+    
+    def schedule_rows():
+        number = 0
+        for route_id, (_, _, minutes) in zip(route_ids, route_stops):
+            for day in DAYS:
+                chosen = set()
+                while len(chosen) < departures:
+                    chosen.add(rush_minute(rng))
+                for departure in sorted(chosen):
+                    arrival = (departure + sum(minutes)) % (24 * 60)
+                    yield (f"{PREFIX}H{number:08d}", route_id,
+                           f"{departure // 60:02d}:{departure % 60:02d}:00",
+                           f"{arrival // 60:02d}:{arrival % 60:02d}:00", day)
+                    number += 1
+    insert_chunks("""
+        INSERT INTO SCHEDULE (ScheduleCode, RouteID, DepartureTime, ArrivalTime, DayOfWeek,
+                              EffectiveFrom, Status)
+        VALUES (%s, %s, %s, %s, %s, '2024-01-01', 'Scheduled')
+    """, schedule_rows(), 'SCHEDULE')
+    
+    result = execute_query(f"""
+        SELECT s.ScheduleID, s.DayOfWeek, HOUR(s.DepartureTime) as Hour, s.RouteID, rs.StationID
+        FROM SCHEDULE s
+        JOIN ROUTE_STATION rs ON rs.RouteID = s.RouteID
+        WHERE s.ScheduleCode LIKE '{PREFIX}H%'
+        ORDER BY s.ScheduleID, rs.SequenceNumber
+    """)
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    schedules = {}
+    for row in result['data']:
+        schedules.setdefault(row['ScheduleID'], (row['DayOfWeek'], [], row['RouteID'], row['Hour']))[1].append(row['StationID'])
+    return schedules
+
+def seed_passengers(rng, passengers):
+    def rows():
+        for i in range(passengers):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            born = date(1950, 1, 1) + timedelta(days=rng.randint(0, 365 * 55))
+            yield (first, last, f"{first.lower()}.{last.lower()}.{i}@{EMAIL_DOMAIN}", born,
+                   f"{rng.randint(1, 999)} Bench Road", rng.choice(CITIES))
+    insert_chunks("""
+        INSERT INTO PASSENGER (FirstName, LastName, Email, DateOfBirth, Address, City, Status)
+        VALUES (%s, %s, %s, %s, %s, %s, 'Active')
+    """, rows(), 'PASSENGER')
+    return fetch_id_range('PASSENGER', 'PassengerID', f"Email LIKE '%%@{EMAIL_DOMAIN}'")
+
+def schedule_weights(schedules, skew):
+    """Cumulative booking weights: hot routes first, rush-hour departures heavier"""
+    route_rank = {route_id: rank for rank, route_id in enumerate(sorted({s[2] for s in schedules.values()}))}
+    weights = [HOUR_WEIGHTS.get(hour, 1) / (route_rank[route_id] + 1) ** (skew - 1)
+               for _, _, route_id, hour in schedules.values()]
+    return list(itertools.accumulate(weights))
+
+def seed_tickets(rng, tickets, passenger_ids, schedules, start, days, skew):
+    """Tickets on skewed schedules and dates, never reusing a seat"""
+    schedule_ids = list(schedules)
+    cumulative = schedule_weights(schedules, skew)
+    seats_taken = {}
+    
+    def rows():
+        for i in range(tickets):
+            while True:
+                schedule_id = schedule_ids[bisect.bisect(cumulative, rng.random() * cumulative[-1])]
+                day, stops, _, _ = schedules[schedule_id]
+                # Journeys fall on the schedule's day of the week
+                offset = rng.randrange(days // 7 + 1) * 7 + (DAYS.index(day) - start.weekday()) % 7
+                journey = start + timedelta(days=offset)
+                seat = seats_taken.get((schedule_id, journey), 0)
+                if seat < SEAT_CAPACITY:
+                    seats_taken[(schedule_id, journey)] = seat + 1
+                    break
+            source = rng.randrange(len(stops) - 1)
+            dest = rng.randrange(source + 1, len(stops))
+            booked = datetime.combine(journey - timedelta(days=rng.randint(0, 14)), datetime.min.time()) \
+                + timedelta(minutes=rush_minute(rng))
+            passenger_id = passenger_ids[skewed_index(rng, len(passenger_ids), skew)]
+            yield (f"{PREFIX}T{i:010d}", f"A{seat + 1:02d}", booked, journey,
+                   round(rng.uniform(10, 120), 2), passenger_id, schedule_id,
+                   stops[source], stops[dest],
+                   rng.choices(['Booked', 'Used', 'Cancelled'], [70, 25, 5])[0])
+    insert_chunks("""
+        INSERT INTO TICKET (TicketCode, SeatNumber, BookingDateTime, JourneyDate, Fare, PassengerID,
+                            ScheduleID, SourceStationID, DestStationID, TicketStatus)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, rows(), 'TICKET')
+
+def seed_passes(rng, passes, passenger_ids, start, days, skew):
+    def rows():
+        for i in range(passes):
+            pass_type, length, price = rng.choice(PASS_TYPES)
+            begins = start + timedelta(days=rng.randrange(days))
+            yield (f"{PREFIX}P{i:010d}", pass_type, begins, begins + timedelta(days=length),
+                   price, passenger_ids[skewed_index(rng, len(passenger_ids), skew)])
+    insert_chunks("""
+        INSERT INTO PASS (PassCode, PassType, StartDate, EndDate, Price, PassengerID)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, rows(), 'PASS')
+
+def seed_payments():
+    """One payment per seeded ticket and pass, generated in SQL by key range"""
+    for table, key, amount, when, link, code in (
+            ('TICKET', 'TicketNumber', 'Fare', 'BookingDateTime', 'TicketNumber', 'TicketCode'),
+            ('PASS', 'PassID', 'Price', 'StartDate', 'PassID', 'PassCode')):
+        started = time.monotonic()
+        result = execute_query(f"SELECT MIN({key}) as low, MAX({key}) as high FROM {table} WHERE {code} LIKE '{PREFIX}%'")
+        low, high = result['data'][0]['low'], result['data'][0]['high']
+        if low is None:
+            continue
+        for chunk_start in range(low, high + 1, CHUNK_SIZE):
+            result = execute_query(f"""
+                INSERT INTO PAYMENT (TransactionCode, Amount, PaymentMethod, Status, Timestamp,
+                                     PassengerID, {link})
+                SELECT CONCAT('{PREFIX}X', {code}), {amount},
+                       ELT(1 + {key} % 6, 'Credit Card', 'Debit Card', 'UPI', 'Net Banking', 'Wallet', 'Cash'),
+                       IF({key} % 20 = 0, 'Failed', 'Completed'), {when}, PassengerID, {key}
+                FROM {table}
+                WHERE {key} BETWEEN %s AND %s AND {code} LIKE '{PREFIX}%'
+            """, (chunk_start, chunk_start + CHUNK_SIZE - 1), fetch=False)
+            if not result['success']:
+                raise RuntimeError(f"Seeding PAYMENT failed: {result['error']}")
+        print(f"  PAYMENT for {table}: {time.monotonic() - started:.1f}s")
+
+def seed_complaints(rng, complaints, passenger_ids, schedule_ids, start, days, skew):
+    def rows():
+        for i in range(complaints):
+            category = rng.choice(COMPLAINT_CATEGORIES)
+            filed = datetime.combine(start + timedelta(days=rng.randrange(days)), datetime.min.time()) \
+                + timedelta(minutes=rush_minute(rng))
+            yield (f"{PREFIX}C{i:010d}", f"{category} issue", f"Benchmark complaint {i}", filed,
+                   passenger_ids[skewed_index(rng, len(passenger_ids), skew)],
+                   schedule_ids[skewed_index(rng, len(schedule_ids), skew)], category,
+                   rng.choice(['Low', 'Medium', 'High', 'Critical']),
+                   rng.choices(['Pending', 'In Progress', 'Resolved'], [40, 20, 40])[0])
+    insert_chunks("""
+        INSERT INTO COMPLAINT (ComplaintCode, Title, Description, Timestamp, PassengerID, ScheduleID,
+                               Category, Priority, Status)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, rows(), 'COMPLAINT')
+
+# Children first, so foreign keys never block the delete
+RESET_QUERIES = [
+    f"DELETE FROM PAYMENT WHERE TransactionCode LIKE '{PREFIX}%'",
+    f"DELETE FROM TICKET WHERE TicketCode LIKE '{PREFIX}%'",
+    f"DELETE FROM PASS WHERE PassCode LIKE '{PREFIX}%'",
+    f"DELETE FROM COMPLAINT WHERE ComplaintCode LIKE '{PREFIX}%'",
+    f"DELETE FROM PASSENGER WHERE Email LIKE '%%@{EMAIL_DOMAIN}'",
+    f"DELETE FROM SCHEDULE WHERE ScheduleCode LIKE '{PREFIX}H%'",
+    f"DELETE FROM ROUTE_STATION WHERE RouteID IN (SELECT RouteID FROM ROUTE WHERE RouteCode LIKE '{PREFIX}R%')",
+    f"DELETE FROM ROUTE WHERE RouteCode LIKE '{PREFIX}R%'",
+    f"DELETE FROM VEHICLE WHERE VehicleNumber LIKE '{PREFIX}V%'",
+    f"DELETE FROM STATION WHERE StationCode LIKE '{PREFIX}S%'"
+]
+
+def reset():
+    """Remove a previously seeded dataset"""
+    for query in RESET_QUERIES:
+        result = execute_query(query, fetch=False)
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        print(f"  {query.split(' WHERE')[0]}: {result['affected_rows']} rows")
+
+def apply_scale(args):
+    """Size every table from --scale tickets, keeping the ratios of the defaults"""
+    tickets = args.scale
+    args.tickets = tickets
+    args.passengers = max(1000, tickets // 10)
+    args.passes = tickets // 20
+    args.complaints = tickets // 50
+    args.routes = max(12, round(tickets ** 0.25))
+    args.departures = max(args.departures, min(40, round(tickets ** 0.2)))
+    args.stations = args.routes * 5
+    args.vehicles = args.routes * 4
+
+def calendar_days(args):
+    """Days of journeys needed to seat every ticket at TARGET_LOAD"""
+    seats_per_week = args.routes * 7 * args.departures * SEAT_CAPACITY
+    weeks = math.ceil(args.tickets / (seats_per_week * TARGET_LOAD))
+    return max(args.days, weeks * 7)
+
+def seed(args):
+    global CHUNK_SIZE
+    CHUNK_SIZE = args.chunk_size
+    if args.scale:
+        apply_scale(args)
+    days = calendar_days(args)
+    rng = random.Random(args.seed)
+    start = date.fromisoformat(args.start)
+    print(f"Seeding benchmark dataset (seed {args.seed}, skew {args.skew}, {days} days)")
+    schedules = seed_network(rng, args.stations, args.routes, args.vehicles, args.departures)
+    passenger_ids = seed_passengers(rng, args.passengers)
+    seed_tickets(rng, args.tickets, passenger_ids, schedules, start, days, args.skew)
+    seed_passes(rng, args.passes, passenger_ids, start, days, args.skew)
+    seed_payments()
+    seed_complaints(rng, args.complaints, passenger_ids, list(schedules), start, days, args.skew)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Seed a synthetic TranspoTrack dataset")
+    parser.add_argument('--seed', type=int, default=42, help="random seed (same seed, same data)")
+    parser.add_argument('--stations', type=int, default=60)
+    parser.add_argument('--routes', type=int, default=12)
+    parser.add_argument('--vehicles', type=int, default=40)
+    parser.add_argument('--departures', type=int, default=8, help="departures per route per day")
+    parser.add_argument('--passengers', type=int, default=10000)
+    parser.add_argument('--tickets', type=int, default=50000)
+    parser.add_argument('--passes', type=int, default=5000)
+    parser.add_argument('--complaints', type=int, default=2000)
+    parser.add_argument('--start', default='2024-01-01', help="first journey date")
+    parser.add_argument('--days', type=int, default=180,
+                        help="days of journeys after --start (extended when seats would run out)")
+    parser.add_argument('--skew', type=float, default=2.0, help="demand skew; 1 is uniform")
+    parser.add_argument('--scale', type=int, help="size every table from this many tickets")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="rows per insert transaction")
+    parser.add_argument('--reset', action='store_true', help="remove the seeded dataset first")
+    args = parser.parse_args()
+    
+    if args.reset:
+        print("Removing previous benchmark dataset")
+        reset()
+    seed(args)
+    print("✅ Benchmark dataset ready")
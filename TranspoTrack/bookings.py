@@ -0,0 +1,173 @@
+import threading
+import time
+from database import run_in_transaction
+from seats import seat_inventory
+from codes import next_code
+from config import BOOKING_CONFIG
+
+# Passenger, schedule and both stations validated in one round trip
+VALIDATION_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM PASSENGER WHERE PassengerID = %s AND Status = 'Active') as PassengerOK,
+        (SELECT COUNT(*) FROM SCHEDULE WHERE ScheduleID = %s) as ScheduleOK,
+        (SELECT COUNT(*) FROM STATION WHERE StationID IN (%s, %s)) as StationCount
+"""
+
+TICKET_INSERT = """
+    INSERT INTO TICKET (TicketCode, SeatNumber, JourneyDate, Fare, PassengerID,
+                        ScheduleID, SourceStationID, DestStationID, TicketStatus)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'Booked')
+"""
+
+PAYMENT_INSERT = """
+    INSERT INTO PAYMENT (TransactionCode, Amount, PaymentMethod, Status, PassengerID,
+                         TicketNumber, PaymentGateway)
+    VALUES (%s, %s, %s, 'Completed', %s, %s, %s)
+"""
+
+# Single-booking path timings, for comparing throughput
+_single_lock = threading.Lock()
+_single_bookings = {'count': 0, 'seconds': 0.0}
+
+def record_single_booking(seconds):
+    """Record how long one /api/book-ticket booking took"""
+    with _single_lock:
+        _single_bookings['count'] += 1
+        _single_bookings['seconds'] += seconds
+
+def single_booking_rate():
+    """Bookings per second seen on the single-booking path, or None"""
+    with _single_lock:
+        if not _single_bookings['count'] or not _single_bookings['seconds']:
+            return None
+        return _single_bookings['count'] / _single_bookings['seconds']
+
+def reserve_seats(data):
+    """Claim the requested seats (or the first N free ones) in the seat inventory
+
+    Returns the reserved seats and the results for seats that were refused.
+    """
+    schedule_id, journey_date = data['scheduleId'], data['journeyDate']
+    reserved = []
+    refused = []
+    if data.get('seats'):
+        for seat in dict.fromkeys(data['seats']):
+            if seat_inventory.reserve(schedule_id, journey_date, seat) is None:
+                refused.append({'seatNumber': seat, 'success': False, 'error': 'Seat not available'})
+            else:
+                reserved.append(seat)
+    else:
+        for _ in range(int(data['count'])):
+            seat = seat_inventory.reserve(schedule_id, journey_date)
+            if seat is None:
+                break
+            reserved.append(seat)
+    return reserved, refused
+
+def book_seats(cursor, data, seats):
+    """Validate once, then insert every ticket and payment with executemany"""
+    cursor.execute(VALIDATION_QUERY, (
+        data['passengerId'], data['scheduleId'],
+        data['sourceStationId'], data['destStationId']
+    ))
+    check = cursor.fetchone()
+    if not check['PassengerOK']:
+        return {'success': False, 'error': 'Invalid or inactive passenger'}
+    if not check['ScheduleOK']:
+        return {'success': False, 'error': 'Invalid schedule'}
+    if str(data['sourceStationId']) == str(data['destStationId']):
+        return {'success': False, 'error': 'Source and destination stations cannot be the same'}
+    if check['StationCount'] != 2:
+        return {'success': False, 'error': 'Invalid source or destination station'}
+    if float(data['fare']) <= 0:
+        return {'success': False, 'error': 'Fare must be greater than 0'}
+    
+    # All requested seats checked in one query
+    placeholders = ', '.join(['%s'] * len(seats))
+    cursor.execute(f"""
+        SELECT SeatNumber FROM TICKET
+        WHERE ScheduleID = %s AND JourneyDate = %s
+          AND SeatNumber IN ({placeholders})
+          AND TicketStatus IN ('Booked', 'Used')
+    """, (data['scheduleId'], data['journeyDate'], *seats))
+    taken = {row['SeatNumber'] for row in cursor.fetchall()}
+    free = [seat for seat in seats if seat not in taken]
+    if not free:
+        return {'success': True, 'booked': [], 'taken': taken}
+    
+    tickets = []
+    for seat in free:
+        ticket_code = next_code('TICKET')
+        transaction_code = next_code('TRANSACTION')
+        if ticket_code is None or transaction_code is None:
+            return {'success': False, 'error': 'Could not allocate booking codes'}
+        tickets.append((seat, ticket_code, transaction_code))
+    
+    cursor.executemany(TICKET_INSERT, [
+        (ticket_code, seat, data['journeyDate'], data['fare'], data['passengerId'],
+         data['scheduleId'], data['sourceStationId'], data['destStationId'])
+        for seat, ticket_code, _ in tickets
+    ])
+    
+    placeholders = ', '.join(['%s'] * len(tickets))
+    cursor.execute(f"SELECT TicketNumber, TicketCode FROM TICKET WHERE TicketCode IN ({placeholders})",
+                   tuple(ticket_code for _, ticket_code, _ in tickets))
+    numbers = {row['TicketCode']: row['TicketNumber'] for row in cursor.fetchall()}
+    
+    cursor.executemany(PAYMENT_INSERT, [
+        (transaction_code, data['fare'], data['paymentMethod'], data['passengerId'],
+         numbers[ticket_code], data['paymentMethod'])
+        for _, ticket_code, transaction_code in tickets
+    ])
+    
+    booked = [{
+        'seatNumber': seat,
+        'success': True,
+        'ticketNumber': numbers[ticket_code],
+        'ticketCode': ticket_code,
+        'transactionCode': transaction_code
+    } for seat, ticket_code, transaction_code in tickets]
+    return {'success': True, 'booked': booked, 'taken': taken}
+
+def book_batch(data):
+    """Book several seats on one schedule in a single transaction
+
+    Returns per-seat results plus the throughput of this batch next to the
+    rate observed on the single-booking path.
+    """
+    requested = len(data.get('seats') or []) or int(data.get('count') or 0)
+    if not requested:
+        return {'success': False, 'error': 'Provide a list of seats or a seat count'}
+    if requested > BOOKING_CONFIG['MAX_BATCH_SEATS']:
+        return {'success': False, 'error': f"At most {BOOKING_CONFIG['MAX_BATCH_SEATS']} seats per batch"}
+    
+    started = time.perf_counter()
+    reserved, refused = reserve_seats(data)
+    if not reserved:
+        return {'success': False, 'error': 'No seats available', 'data': refused}
+    
+    result = run_in_transaction(lambda cursor: book_seats(cursor, data, reserved))
+    if not result['success']:
+        for seat in reserved:
+            seat_inventory.release(data['scheduleId'], data['journeyDate'], seat)
+        return result
+    
+    elapsed = time.perf_counter() - started
+    booked = {row['seatNumber']: row for row in result['booked']}
+    results = [booked.get(seat) or {'seatNumber': seat, 'success': False, 'error': 'Seat not available'}
+               for seat in reserved] + refused
+    
+    rate = len(booked) / elapsed if elapsed else None
+    single_rate = single_booking_rate()
+    return {
+        'success': True,
+        'data': results,
+        'booked': len(booked),
+        'failed': requested - len(booked),
+        'throughput': {
+            'seconds': round(elapsed, 4),
+            'bookings_per_sec': round(rate, 1) if rate else None,
+            'single_booking_per_sec': round(single_rate, 1) if single_rate else None,
+            'speedup': round(rate / single_rate, 1) if rate and single_rate else None
+        }
+    }
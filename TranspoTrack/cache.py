@@ -0,0 +1,72 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from config import CACHE_CONFIG
+from database import use_primary
+
+class CacheEntry:
+    """A cached query result with its validators"""
+    def __init__(self, tables, result):
+        self.tables = tables
+        self.result = result
+        self.expires_at = time.monotonic() + CACHE_CONFIG['TTL_SECONDS']
+        body = json.dumps(result, sort_keys=True, default=str).encode()
+        self.etag = hashlib.md5(body).hexdigest()
+
+class QueryCache:
+    """Size-bounded LRU read-through cache for rarely changing tables
+
+    Entries are tagged with the tables they were read from, so a write to
+    one table only evicts the results that depend on it.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._modified = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, tables, key, loader):
+        """Return the entry for `key`, calling `loader` on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry.expires_at:
+                self._entries.move_to_end(key)
+                return entry
+            generation = self._generation
+        
+        # Cached results outlive replica lag, so load them from the primary
+        with use_primary():
+            result = loader()
+        entry = CacheEntry(tables, result)
+        if result.get('success'):
+            with self._lock:
+                # Don't keep a result that raced with a write
+                if generation != self._generation:
+                    return entry
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def last_modified(self, tables):
+        """Time of the most recent invalidation of any of `tables`"""
+        with self._lock:
+            return max(self._modified.setdefault(table, _started_at) for table in tables)
+
+    def invalidate(self, table):
+        """Evict every cached result read from `table`"""
+        with self._lock:
+            self._generation += 1
+            self._modified[table] = datetime.now(timezone.utc).replace(microsecond=0)
+            stale = [key for key, entry in self._entries.items() if table in entry.tables]
+            for key in stale:
+                del self._entries[key]
+
+_started_at = datetime.now(timezone.utc).replace(microsecond=0)
+
+reference_cache = QueryCache(CACHE_CONFIG['MAX_ENTRIES'])
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import deque
+from database import execute_query, use_primary
+from config import CHANGES_CONFIG
+
+# Feeds that show columns joined from another table, or lose rows to its
+# cascading deletes: an edit there can't be patched into them row by row
+JOINED = {
+    'PASSENGER': ('TICKET', 'PASS', 'COMPLAINT'),
+    'STATION': ('TICKET', 'COMPLAINT')
+}
+
+class TableLog:
+    """Recent changes to one table as (version, key, deleted), oldest first
+
+    `floor` is the oldest version the log can still answer from: a client
+    that last synced before it has missed dropped entries and must reload.
+    """
+    def __init__(self, version, max_entries):
+        self.version = version
+        self.floor = version
+        self.entries = deque()
+        self.max_entries = max_entries
+
+    def add(self, keys, deleted):
+        for key in keys:
+            self.version += 1
+            self.entries.append((self.version, key, deleted))
+        while len(self.entries) > self.max_entries:
+            self.floor = self.entries.popleft()[0]
+
+    def reset(self):
+        self.version += 1
+        self.floor = self.version
+        self.entries.clear()
+
+class ChangeLog:
+    """Per-table change versions for writes made through the API
+
+    Versions start from the process start time in microseconds, so they keep
+    increasing across restarts and a version from before a restart falls
+    below the new floor instead of silently matching the wrong entries.
+    The log is in-process: with several app processes each keeps its own.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._base = time.time_ns() // 1000
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def _table(self, table):
+        log = self._tables.get(table)
+        if log is None:
+            log = self._tables[table] = TableLog(self._base, self.max_entries)
+        return log
+
+    def record(self, table, keys, deleted=False):
+        """Record rows of `table` inserted or updated (or deleted) by key"""
+        with self._lock:
+            log = self._table(table)
+            log.add(keys, deleted)
+            return log.version
+
+    def reset(self, table):
+        """Record a change to rows that can't be listed; clients reload"""
+        with self._lock:
+            log = self._table(table)
+            log.reset()
+            return log.version
+
+    def reset_joined(self, table):
+        """Reset the feeds that depend on rows of `table` that were edited"""
+        for dependent in JOINED.get(table, ()):
+            self.reset(dependent)
+
+    def since(self, table, version):
+        """Current version and {key: deleted} changed after `version`
+
+        The changes are None when `version` can't be answered from the log.
+        """
+        with self._lock:
+            log = self._table(table)
+            if version is None or not log.floor <= version <= log.version:
+                return log.version, None
+            changed = {}
+            for entry_version, key, deleted in reversed(log.entries):
+                if entry_version <= version:
+                    break
+                changed.setdefault(key, deleted)
+            return log.version, changed
+
+class Feed:
+    """How to read the current rows of one changed table for a list page"""
+    def __init__(self, table, select, key_column, key, group_by=''):
+        self.table = table
+        self.select = select
+        self.key_column = key_column
+        self.key = key
+        self.group_by = group_by
+
+    def rows(self, keys):
+        placeholders = ', '.join(['%s'] * len(keys))
+        query = f"{self.select} WHERE {self.key_column} IN ({placeholders}) {self.group_by}"
+        # The change was just committed on the primary; a replica may lag
+        with use_primary():
+            return execute_query(query, tuple(keys))
+
+def changes(feed, since):
+    """Rows of `feed` inserted or updated and keys deleted after `since`
+
+    `reset` tells the client its copy can't be patched: it should reload the
+    list and sync from the returned version. Asking without `since` is how a
+    client gets the version to start from, before it loads the list.
+    """
+    version, changed = change_log.since(feed.table, since)
+    if changed is None or len(changed) > CHANGES_CONFIG['MAX_ROWS']:
+        return {'success': True, 'version': version, 'reset': True, 'data': [], 'deleted': []}
+
+    upserted = [key for key, deleted in changed.items() if not deleted]
+    rows = []
+    if upserted:
+        result = feed.rows(upserted)
+        if not result['success']:
+            return result
+        rows = result['data']
+    found = {row[feed.key] for row in rows}
+    # Rows recorded as written but gone now were deleted behind the API's back
+    deleted = [key for key, gone in changed.items() if gone or key not in found]
+    return {'success': True, 'version': version, 'reset': False, 'data': rows, 'deleted': deleted}
+
+change_log = ChangeLog(CHANGES_CONFIG['MAX_ENTRIES'])
@@ -0,0 +1,67 @@
+import threading
+import logging
+from datetime import date
+from database import execute_query
+from config import CODE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# CODE_SEQUENCE name -> code prefix
+SEQUENCES = {
+    'TICKET': 'TKT',
+    'TRANSACTION': 'TXN',
+    'PASS': 'PASS',
+    'COMPLAINT': 'COMP'
+}
+
+class CodeAllocator:
+    """Hands out unique codes from blocks reserved in CODE_SEQUENCE
+
+    Each worker reserves BLOCK_SIZE values with a single UPDATE and serves
+    them from memory, so concurrent bookings never wait on code generation
+    and codes from different workers cannot collide.
+    """
+    def __init__(self, block_size):
+        self.block_size = block_size
+        self._blocks = {name: [0, 0] for name in SEQUENCES}
+        self._locks = {name: threading.Lock() for name in SEQUENCES}
+
+    def _reserve(self, name):
+        """Reserve the next block of a sequence, returning [start, end)"""
+        query = """
+            UPDATE CODE_SEQUENCE
+            SET NextValue = LAST_INSERT_ID(NextValue + %s)
+            WHERE SequenceName = %s
+        """
+        result = execute_query(query, (self.block_size, name), fetch=False)
+        if not result['success'] or not result['affected_rows']:
+            logger.error(f"Could not reserve {name} codes: {result.get('error', 'missing sequence')}")
+            return None
+        end = result['lastrowid']
+        return [end - self.block_size, end]
+
+    def next_value(self, name):
+        """Next value of a sequence, or None if no block could be reserved"""
+        with self._locks[name]:
+            block = self._blocks[name]
+            if block[0] >= block[1]:
+                block = self._reserve(name)
+                if block is None:
+                    return None
+                self._blocks[name] = block
+            value = block[0]
+            block[0] += 1
+            return value
+
+    def next_code(self, name):
+        """Next business code, e.g. TKT20250101000042"""
+        value = self.next_value(name)
+        if value is None:
+            return None
+        return f"{SEQUENCES[name]}{date.today():%Y%m%d}{value:06d}"
+
+code_allocator = CodeAllocator(CODE_CONFIG['BLOCK_SIZE'])
+
+def next_code(name):
+    """Next code from the shared allocator"""
+    return code_allocator.next_code(name)
@@ -16,3 +16,160 @@ APP_CONFIG = {
     'HOST': '0.0.0.0',
     'PORT': 5000
 }
+
+# Pagination for list APIs
+PAGINATION_CONFIG = {
+    'DEFAULT_LIMIT': 100,
+    'MAX_LIMIT': 1000
+}
+
+# Streaming exports
+EXPORT_CONFIG = {
+    'BATCH_SIZE': 1000
+}
+
+# Dashboard statistics cache
+STATS_CONFIG = {
+    'TTL_SECONDS': 30
+}
+
+# Reference data cache (stations, vehicles, routes, schedules)
+CACHE_CONFIG = {
+    'MAX_ENTRIES': 256,
+    'TTL_SECONDS': 300
+}
+
+# Seat inventory index
+SEAT_CONFIG = {
+    'DEFAULT_CAPACITY': 50,
+    'SEATS_PER_ROW': 99,
+    'MAX_ENTRIES': 4096,
+    'BOOKING_ATTEMPTS': 3
+}
+
+# Code allocation (CODE_SEQUENCE block size per worker)
+CODE_CONFIG = {
+    'BLOCK_SIZE': 100
+}
+
+# Group bookings
+BOOKING_CONFIG = {
+    'MAX_BATCH_SEATS': 200
+}
+
+# Login fast path
+AUTH_CONFIG = {
+    'CREDENTIAL_TTL_SECONDS': 300,
+    'GRANTS_TTL_SECONDS': 300,
+    'POOL_SIZE': 3,
+    'CHECKOUT_TIMEOUT': 5
+}
+
+# Connection pool
+POOL_CONFIG = {
+    'SIZE': 5,
+    'MAX_OVERFLOW': 5,
+    'CHECKOUT_TIMEOUT': 5,
+    'PRE_PING_AFTER': 30,
+    'WARM_UP': True
+}
+
+# Transit graph (fares and journey planning)
+TRANSIT_CONFIG = {
+    'REFRESH_SECONDS': 300,
+    'CLASS_MULTIPLIERS': {
+        'Economy': 1.0,
+        'Business': 1.5,
+        'First Class': 2.0
+    }
+}
+
+# Station departures board
+TIMETABLE_CONFIG = {
+    'REFRESH_SECONDS': 300,
+    'DELAY_REFRESH_SECONDS': 15,
+    'RETRY_SECONDS': 5,
+    'DEFAULT_LIMIT': 10,
+    'MAX_LIMIT': 50
+}
+
+# Pass validation index (gate checks)
+PASS_CONFIG = {
+    'REFRESH_SECONDS': 300,
+    'MAX_BATCH_TAPS': 1000
+}
+
+# Passenger search index (autocomplete on the passenger pages)
+SEARCH_CONFIG = {
+    'REFRESH_SECONDS': 600,
+    'DEFAULT_LIMIT': 10,
+    'MAX_LIMIT': 25
+}
+
+# Change feed for client-side list caches (/api/<table>/changes)
+CHANGES_CONFIG = {
+    'MAX_ENTRIES': 10000,
+    'MAX_ROWS': 500
+}
+
+# Live dashboard/schedule updates pushed over Server-Sent Events
+LIVE_CONFIG = {
+    'TICK_SECONDS': 2,
+    'HEARTBEAT_SECONDS': 15,
+    'BACKLOG': 64,
+    'MAX_CLIENTS': 200,
+    'RETRY_MS': 3000
+}
+
+# Audit events buffered in memory and bulk-inserted into AUDIT_LOG
+AUDIT_CONFIG = {
+    'BUFFER_SIZE': 20000,
+    'BATCH_SIZE': 500,
+    'FLUSH_SECONDS': 1.0,
+    'RETRY_SECONDS': 2,
+    'RETENTION_MONTHS': 12,
+    'PARTITIONS_AHEAD': 2
+}
+
+# Background expiry of passes and tickets
+MAINTENANCE_CONFIG = {
+    'ENABLED': True,
+    'INTERVAL_SECONDS': 3600,
+    'CHUNK_SIZE': 500,
+    'PAUSE_SECONDS': 0.05,
+    'DRY_RUN': False
+}
+
+# Request and SQL timing metrics (/metrics)
+METRICS_CONFIG = {
+    'ENABLED': True,
+    'SLOW_QUERY_SECONDS': 0.5,
+    'MAX_STATEMENTS': 500
+}
+
+# Read replicas. Each entry overrides DB_CONFIG for one replica, e.g.
+# {'host': '127.0.0.1', 'port': 3307} for a second local MySQL instance.
+# With no replicas every query goes to the primary.
+REPLICA_CONFIG = {
+    'REPLICAS': [],
+    'STICKY_SECONDS': 5,
+    'MAX_LAG_SECONDS': 2,
+    'LAG_CHECK_SECONDS': 1,
+    'READ_ONLY_PROCEDURES': ['sp_generate_revenue_report']
+}
+
+# Server-side prepared statements for hot queries
+PREPARED_CONFIG = {
+    'ENABLED': True,
+    'MAX_PER_CONNECTION': 64
+}
+
+# Complaint intake queue (group-committed inserts)
+INTAKE_CONFIG = {
+    'BATCH_SIZE': 200,
+    'FLUSH_SECONDS': 0.5,
+    'MAX_QUEUE': 50000,
+    'RETRY_SECONDS': 2,
+    'SPILL_FILE': 'data/complaint_intake.jsonl',
+    'FSYNC': False
+}
@@ -1,60 +1,521 @@
 import mysql.connector
-from mysql.connector import Error, pooling
-from config import DB_CONFIG
+from mysql.connector import Error
+from mysql.connector.constants import FieldFlag
+from config import DB_CONFIG, EXPORT_CONFIG, POOL_CONFIG, METRICS_CONFIG, REPLICA_CONFIG, PREPARED_CONFIG
+from contextlib import contextmanager
+import metrics
+from collections import deque, OrderedDict
+import bisect
 import logging
+import threading
+import time
+import weakref
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Handed to a waiter instead of a connection: open a new one in its slot
+NEW_CONNECTION = object()
+
+# Checkout wait-time histogram bucket upper bounds, in milliseconds
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# MySQL error code for a prepared statement handle the server no longer has
+ER_UNKNOWN_STMT_HANDLER = 1243
+
+class PoolTimeout(Error):
+    """No connection became free within the checkout timeout"""
+
+class StatementCache:
+    """Server-side prepared statements of one connection, least recently
+    used evicted first
+
+    Kept per connection object: a reconnect opens a new connection and so
+    starts with an empty cache, and statements are prepared again on first
+    use. The cache holds no reference to its connection, so it never keeps
+    the connection (the key of _statement_caches) alive; the pool also
+    closes it explicitly whenever it closes a connection.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._cursors = OrderedDict()
+
+    def cursor(self, cnx, query):
+        cursor = self._cursors.get(query)
+        if cursor is not None:
+            self._cursors.move_to_end(query)
+            return cursor
+        cursor = cnx.cursor(prepared=True, dictionary=True)
+        self._cursors[query] = cursor
+        if len(self._cursors) > self.max_size:
+            _, evicted = self._cursors.popitem(last=False)
+            self._close(evicted)
+        return cursor
+
+    def discard(self, query):
+        cursor = self._cursors.pop(query, None)
+        if cursor is not None:
+            self._close(cursor)
+
+    def close(self):
+        while self._cursors:
+            self._close(self._cursors.popitem()[1])
+
+    @staticmethod
+    def _close(cursor):
+        try:
+            # Deallocates the statement on the server
+            cursor.close()
+        except Error:
+            pass
+
+# Raw connection -> its StatementCache
+_statement_caches = weakref.WeakKeyDictionary()
+
+def close_connection(cnx):
+    """Close a raw connection and the prepared statements cached for it"""
+    cache = _statement_caches.pop(cnx, None)
+    if cache is not None:
+        cache.close()
+    try:
+        cnx.close()
+    except Error:
+        pass
+
+class PooledConnection:
+    """A checked-out connection; close() hands it back to its pool"""
+    def __init__(self, pool, cnx):
+        self._pool = pool
+        self._cnx = cnx
+        self._discard = False
+
+    def __getattr__(self, name):
+        return getattr(self._cnx, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._cnx.cursor(*args, **kwargs)
+        if METRICS_CONFIG['ENABLED']:
+            return metrics.TimedCursor(cursor)
+        return cursor
+
+    def prepared_cursor(self, query):
+        """A cached prepared cursor for `query`; callers must not close it"""
+        cache = _statement_caches.get(self._cnx)
+        if cache is None:
+            cache = _statement_caches[self._cnx] = StatementCache(PREPARED_CONFIG['MAX_PER_CONNECTION'])
+        cursor = cache.cursor(self._cnx, query)
+        if METRICS_CONFIG['ENABLED']:
+            return metrics.TimedCursor(cursor)
+        return cursor
+
+    def discard_prepared(self, query):
+        cache = _statement_caches.get(self._cnx)
+        if cache is not None:
+            cache.discard(query)
+
+    def disconnect(self):
+        """Drop the socket; the pool replaces this connection on return"""
+        self._discard = True
+        self._cnx.disconnect()
+
+    def close(self):
+        if self._cnx is not None:
+            self._pool.release(self._cnx, self._discard)
+            self._cnx = None
+
+class ConnectionPool:
+    """Blocking connection pool with overflow, a fair wait queue and stats
+
+    Checkouts wait up to CHECKOUT_TIMEOUT seconds for a free connection,
+    served first come first served, instead of failing as soon as the pool
+    is exhausted. Connections idle for longer than PRE_PING_AFTER seconds
+    are pinged before being handed out.
+    """
+    def __init__(self, size, max_overflow, timeout, pre_ping_after, db_config):
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.pre_ping_after = pre_ping_after
+        self.db_config = db_config
+        self._lock = threading.Lock()
+        self._idle = deque()        # (connection, returned_at)
+        self._waiters = deque()     # [Event, connection or None]
+        self._total = 0
+        self._in_use = 0
+        self._stats = {'checkouts': 0, 'timeouts': 0, 'connects': 0, 'ping_failures': 0}
+        self._wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_total_ms = 0.0
+
+    def _connect(self):
+        cnx = mysql.connector.connect(**self.db_config)
+        with self._lock:
+            self._stats['connects'] += 1
+        return cnx
+
+    def warm_up(self):
+        """Open the core connections up front"""
+        while True:
+            with self._lock:
+                if self._total >= self.size:
+                    return
+                self._total += 1
+            try:
+                cnx = self._connect()
+            except Error:
+                with self._lock:
+                    self._total -= 1
+                raise
+            self.release(cnx, checked_out=False)
+
+    def get(self, timeout=None):
+        """Check out a connection, waiting in line if none is free"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        waiter = None
+        cnx = None
+        returned_at = None
+        create = False
+        with self._lock:
+            if self._idle and not self._waiters:
+                cnx, returned_at = self._idle.pop()
+            elif self._total < self.size + self.max_overflow:
+                self._total += 1
+                create = True
+            else:
+                waiter = [threading.Event(), None]
+                self._waiters.append(waiter)
+        
+        if waiter is not None:
+            waiter[0].wait(timeout)
+            with self._lock:
+                if waiter[1] is None:
+                    self._waiters.remove(waiter)
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(msg=f"No database connection free after {timeout}s")
+                if waiter[1] is NEW_CONNECTION:
+                    create = True
+                else:
+                    cnx, returned_at = waiter[1]
+        
+        if create:
+            try:
+                cnx = self._connect()
+            except Error:
+                self._forget()
+                raise
+        elif returned_at is not None and time.monotonic() - returned_at > self.pre_ping_after:
+            cnx = self._pre_ping(cnx)
+        
+        waited = time.monotonic() - started
+        self._record_checkout(waited * 1000)
+        if METRICS_CONFIG['ENABLED']:
+            metrics.observe_pool_wait(waited)
+        return PooledConnection(self, cnx)
+
+    def _pre_ping(self, cnx):
+        """Make sure a connection that sat idle is still alive"""
+        try:
+            cnx.ping(reconnect=False)
+            return cnx
+        except Error:
+            with self._lock:
+                self._stats['ping_failures'] += 1
+            close_connection(cnx)
+            try:
+                return self._connect()
+            except Error:
+                self._forget()
+                raise
+
+    def _forget(self):
+        """Give up a connection slot, letting the next waiter open a new one"""
+        with self._lock:
+            self._total -= 1
+            if self._waiters:
+                self._total += 1
+                waiter = self._waiters.popleft()
+                waiter[1] = NEW_CONNECTION
+                waiter[0].set()
+
+    def _record_checkout(self, waited_ms):
+        with self._lock:
+            self._in_use += 1
+            self._stats['checkouts'] += 1
+            self._wait_total_ms += waited_ms
+            self._wait_counts[bisect.bisect_left(WAIT_BUCKETS_MS, waited_ms)] += 1
+
+    def release(self, cnx, discard=False, checked_out=True):
+        """Return a connection, handing it straight to the longest waiter"""
+        if not discard and cnx.in_transaction:
+            try:
+                # Leave no open transaction behind for the next borrower
+                cnx.rollback()
+            except Error:
+                discard = True
+        if discard:
+            close_connection(cnx)
+            with self._lock:
+                if checked_out:
+                    self._in_use -= 1
+            self._forget()
+            return
+        
+        now = time.monotonic()
+        close = False
+        with self._lock:
+            if checked_out:
+                self._in_use -= 1
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter[1] = (cnx, now)
+                waiter[0].set()
+            elif self._total > self.size:
+                self._total -= 1
+                close = True
+            else:
+                self._idle.append((cnx, now))
+        if close:
+            close_connection(cnx)
+
+    def stats(self):
+        """Live pool counters and the checkout wait-time histogram"""
+        with self._lock:
+            checkouts = self._stats['checkouts']
+            # Cumulative, like Prometheus "le" buckets
+            histogram = {}
+            running = 0
+            for bound, count in zip(WAIT_BUCKETS_MS + ['inf'], self._wait_counts):
+                running += count
+                histogram[f"le_{bound}ms" if bound != 'inf' else 'le_inf'] = running
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'open': self._total,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiters': len(self._waiters),
+                'avg_wait_ms': round(self._wait_total_ms / checkouts, 3) if checkouts else 0,
+                'wait_histogram': histogram,
+                **self._stats
+            }
+
+class Replica:
+    """A read replica's pool and its last known replication lag
+
+    Lag is checked at most every LAG_CHECK_SECONDS, by whichever reader
+    gets there first; a replica that is too far behind, has replication
+    stopped or cannot be reached is skipped until a later check passes.
+    """
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.lag = None
+        self.healthy = False
+        self._checked_at = 0.0
+        self._checking = False
+        self._lock = threading.Lock()
+
+    def is_usable(self):
+        with self._lock:
+            due = not self._checking and time.monotonic() - self._checked_at >= REPLICA_CONFIG['LAG_CHECK_SECONDS']
+            if due:
+                self._checking = True
+        if due:
+            lag = self._read_lag()
+            with self._lock:
+                self.lag = lag
+                self.healthy = lag is not None and lag <= REPLICA_CONFIG['MAX_LAG_SECONDS']
+                self._checked_at = time.monotonic()
+                self._checking = False
+            if not self.healthy:
+                logger.warning(f"Replica {self.name} not used for reads (lag: {lag})")
+        return self.healthy
+
+    def _read_lag(self):
+        """Seconds behind the primary, or None if replication is not running"""
+        connection = None
+        try:
+            connection = self.pool.get()
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+                lag_column = 'Seconds_Behind_Source'
+            except Error:
+                # MySQL before 8.0.22
+                cursor.execute("SHOW SLAVE STATUS")
+                lag_column = 'Seconds_Behind_Master'
+            row = cursor.fetchone()
+            cursor.close()
+            return row[lag_column] if row else None
+        except Error as e:
+            logger.warning(f"Lag check on replica {self.name} failed: {e}")
+            return None
+        finally:
+            if connection:
+                connection.close()
+
+    def stats(self):
+        return {'name': self.name, 'healthy': self.healthy, 'lag_seconds': self.lag, **self.pool.stats()}
+
 # Connection Pool
 connection_pool = None
+replicas = []
+_next_replica = 0
+
+# Per-thread routing state: primary-only depth, request pin and write flag
+_routing = threading.local()
+
+def make_pool(db_config):
+    pool = ConnectionPool(
+        size=POOL_CONFIG['SIZE'],
+        max_overflow=POOL_CONFIG['MAX_OVERFLOW'],
+        timeout=POOL_CONFIG['CHECKOUT_TIMEOUT'],
+        pre_ping_after=POOL_CONFIG['PRE_PING_AFTER'],
+        db_config=db_config
+    )
+    if POOL_CONFIG['WARM_UP']:
+        pool.warm_up()
+    return pool
 
 def initialize_pool():
     """Initialize database connection pool"""
-    global connection_pool
+    global connection_pool, replicas
     try:
-        connection_pool = pooling.MySQLConnectionPool(
-            pool_name="transpotrack_pool",
-            pool_size=5,
-            pool_reset_session=True,
-            **DB_CONFIG
-        )
+        connection_pool = make_pool(DB_CONFIG)
         logger.info("Database connection pool initialized successfully")
-        return True
     except Error as e:
         logger.error(f"Error creating connection pool: {e}")
         return False
+    
+    replicas = []
+    for overrides in REPLICA_CONFIG['REPLICAS']:
+        config = {**DB_CONFIG, **overrides}
+        name = f"{config['host']}:{config['port']}"
+        try:
+            replicas.append(Replica(name, make_pool(config)))
+            logger.info(f"Replica pool {name} initialized")
+        except Error as e:
+            # Reads fall back to the primary; the app still starts
+            logger.error(f"Error creating replica pool {name}: {e}")
+    return True
+
+def begin_request(pinned_until=0.0):
+    """Start routing for a request; reads stay on the primary until
+    `pinned_until` (a time.time() value) if the session wrote recently"""
+    _routing.pinned = time.time() < pinned_until
+    _routing.wrote = False
+
+def request_wrote():
+    """Whether the current request sent anything to the primary as a write"""
+    return getattr(_routing, 'wrote', False)
+
+@contextmanager
+def use_primary():
+    """Send every read on this thread to the primary while active
 
-def get_connection():
-    """Get connection from pool"""
+    For loaders that fill in-memory caches and indexes right after a write,
+    where a lagging replica would get cached for the whole TTL.
+    """
+    _routing.primary = getattr(_routing, 'primary', 0) + 1
+    try:
+        yield
+    finally:
+        _routing.primary -= 1
+
+def read_pool():
+    """A healthy replica's pool for a read, or None to use the primary"""
+    global _next_replica
+    if not replicas or getattr(_routing, 'primary', 0) or getattr(_routing, 'pinned', False):
+        return None
+    start = _next_replica
+    _next_replica = (start + 1) % len(replicas)
+    for offset in range(len(replicas)):
+        replica = replicas[(start + offset) % len(replicas)]
+        if replica.is_usable():
+            return replica.pool
+    return None
+
+def is_read(query):
+    """Whether a statement only reads (and so may run on a replica)"""
+    statement = query.lstrip().upper()
+    return statement.startswith(('SELECT', 'WITH', 'SHOW')) and 'FOR UPDATE' not in statement \
+        and 'FOR SHARE' not in statement
+
+def get_connection(read_only=False):
+    """Get connection from pool, waiting up to the checkout timeout
+
+    Reads go to a healthy replica when there is one; everything else, and
+    reads pinned to the primary, go to the primary.
+    """
     try:
         if connection_pool is None:
             initialize_pool()
-        return connection_pool.get_connection()
+        if read_only:
+            pool = read_pool()
+            if pool is not None:
+                try:
+                    return pool.get()
+                except Error as e:
+                    logger.warning(f"Replica checkout failed, reading from primary: {e}")
+        else:
+            _routing.wrote = True
+        return connection_pool.get()
     except Error as e:
         logger.error(f"Error getting connection from pool: {e}")
         return None
 
-def execute_query(query, params=None, fetch=True):
-    """Execute a query and return results"""
+def pool_stats():
+    """Statistics of the connection pool"""
+    if connection_pool is None:
+        return {}
+    stats = connection_pool.stats()
+    if replicas:
+        stats['replicas'] = [replica.stats() for replica in replicas]
+    return stats
+
+def set_columns(cursor):
+    """Return the names of result columns that come back as Python sets"""
+    return [column[0] for column in cursor.description if column[7] & FieldFlag.SET]
+
+def execute_query(query, params=None, fetch=True, prepared=False):
+    """Execute a query and return results
+
+    With `prepared`, the statement runs as a server-side prepared statement
+    cached on the connection, so MySQL parses it once per connection.
+    """
     connection = None
     cursor = None
+    prepared = prepared and PREPARED_CONFIG['ENABLED']
     try:
-        connection = get_connection()
+        connection = get_connection(read_only=fetch and is_read(query))
         if connection is None:
             return {'success': False, 'error': 'Could not establish database connection'}
         
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute(query, params or ())
+        if prepared:
+            cursor = connection.prepared_cursor(query)
+            try:
+                cursor.execute(query, params or ())
+            except Error as e:
+                if e.errno != ER_UNKNOWN_STMT_HANDLER:
+                    raise
+                # The server lost the statement (restart, session reset): prepare it again
+                connection.discard_prepared(query)
+                cursor = connection.prepared_cursor(query)
+                cursor.execute(query, params or ())
+        else:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(query, params or ())
         
         if fetch:
             if cursor.description:
                 results = cursor.fetchall()
-                # Convert any set objects to lists for JSON serialization
-                for row in results:
-                    for key, value in row.items():
-                        if isinstance(value, set):
-                            row[key] = list(value)
+                # Convert SET columns to lists for JSON serialization
+                columns = set_columns(cursor)
+                if columns:
+                    for row in results:
+                        for key in columns:
+                            if row[key] is not None:
+                                row[key] = list(row[key])
                 return {'success': True, 'data': results}
             else:
                 connection.commit()
@@ -66,20 +527,189 @@ def execute_query(query, params=None, fetch=True):
     except Error as e:
         if connection:
             connection.rollback()
+            if prepared and (e.errno is None or 2000 <= e.errno < 3000):
+                # A client-side failure may leave an unread result behind;
+                # prepare afresh next time. Server errors (e.g. a duplicate
+                # key) leave the statement reusable.
+                connection.discard_prepared(query)
+                cursor = None
         logger.error(f"Database error: {e}")
-        return {'success': False, 'error': str(e)}
+        return {'success': False, 'error': str(e), 'errno': e.errno}
     finally:
         if cursor:
-            cursor.close()
+            if prepared:
+                # Cached for reuse: record its timing but keep it open
+                getattr(cursor, 'finish', lambda: None)()
+            else:
+                cursor.close()
         if connection:
             connection.close()
 
+def execute_page(query, params, key, limit):
+    """Execute a keyset-paginated query and return one page with the next cursor
+
+    The query must be ordered by `key` descending and end with `LIMIT %s`.
+    One extra row is fetched to find out whether another page exists.
+    """
+    result = execute_query(query, tuple(params) + (limit + 1,))
+    if not result['success']:
+        return result
+    
+    rows = result['data']
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1][key]
+    return {'success': True, 'data': rows, 'next_cursor': next_cursor}
+
+class Transaction:
+    """One pooled connection held across several statements
+
+    Statements run on a single dictionary cursor; the transaction()
+    context manager commits once at the end, or rolls back.
+    """
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.cursor(dictionary=True)
+        self.rollback_only = False
+        self._savepoints = 0
+
+    def execute(self, query, params=None):
+        """Run one statement; returns the cursor for lastrowid/rowcount"""
+        self.cursor.execute(query, params or ())
+        return self.cursor
+
+    def fetch(self, query, params=None):
+        """Run a query and return all of its rows"""
+        self.cursor.execute(query, params or ())
+        return self.cursor.fetchall()
+
+    def fetch_one(self, query, params=None):
+        """Run a query and return its first row, or None"""
+        rows = self.fetch(query, params)
+        return rows[0] if rows else None
+
+    def executemany(self, query, rows):
+        """Run one statement for many parameter rows; returns the row count"""
+        self.cursor.executemany(query, rows)
+        return self.cursor.rowcount
+
+    @contextmanager
+    def savepoint(self):
+        """Undo only this block's statements if it raises"""
+        self._savepoints += 1
+        name = f"sp_{self._savepoints}"
+        self.cursor.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except BaseException:
+            self.cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        self.cursor.execute(f"RELEASE SAVEPOINT {name}")
+
+@contextmanager
+def transaction():
+    """Hold one pooled connection for a unit of work, committing once
+
+    Commits when the block finishes (unless `rollback_only` was set) and
+    rolls back if it raises. Raises Error if no connection is available.
+    """
+    connection = get_connection()
+    if connection is None:
+        raise Error(msg='Could not establish database connection')
+    tx = None
+    try:
+        tx = Transaction(connection)
+        yield tx
+        if tx.rollback_only:
+            connection.rollback()
+        else:
+            connection.commit()
+    except BaseException:
+        try:
+            connection.rollback()
+        except Error as e:
+            logger.warning(f"Rollback failed: {e}")
+        raise
+    finally:
+        if tx is not None:
+            tx.cursor.close()
+        connection.close()
+
+def error_result(e):
+    """Result dict for a database error"""
+    return {'success': False, 'error': str(e), 'errno': e.errno}
+
+def run_in_transaction(work):
+    """Run work(cursor) on one pooled connection inside a single transaction
+
+    `work` returns a result dict; the transaction is committed only when
+    that result is successful and rolled back otherwise.
+    """
+    try:
+        with transaction() as tx:
+            result = work(tx.cursor)
+            tx.rollback_only = not result['success']
+        return result
+    except Error as e:
+        logger.error(f"Transaction error: {e}")
+        return error_result(e)
+
+def stream_query(query, params=None, batch_size=None):
+    """Yield the rows of a query in fetchmany batches
+
+    Uses an unbuffered cursor so memory stays flat whatever the row count.
+    The pooled connection is held until the generator is exhausted or
+    closed; when a consumer stops early (e.g. the client disconnects) the
+    socket is dropped instead of draining the remaining rows, and the pool
+    reconnects that slot on its next checkout.
+    """
+    batch_size = batch_size or EXPORT_CONFIG['BATCH_SIZE']
+    connection = None
+    cursor = None
+    finished = False
+    try:
+        connection = get_connection(read_only=is_read(query))
+        if connection is None:
+            raise Error(msg='Could not establish database connection')
+        
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(query, params or ())
+        columns = set_columns(cursor)
+        
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                for key in columns:
+                    if row[key] is not None:
+                        row[key] = list(row[key])
+                yield row
+        finished = True
+    finally:
+        if isinstance(cursor, metrics.TimedCursor):
+            # Abandoned cursors are never closed; record the partial read
+            cursor.finish()
+        if connection:
+            if not finished:
+                try:
+                    connection.disconnect()
+                except Error:
+                    pass
+            elif cursor:
+                cursor.close()
+            try:
+                connection.close()
+            except Error as e:
+                logger.warning(f"Error returning streamed connection to pool: {e}")
+
 def execute_procedure(proc_name, params=None):
     """Execute a stored procedure"""
     connection = None
     cursor = None
     try:
-        connection = get_connection()
+        connection = get_connection(read_only=proc_name in REPLICA_CONFIG['READ_ONLY_PROCEDURES'])
         if connection is None:
             return {'success': False, 'error': 'Could not establish database connection'}
         
@@ -97,7 +727,7 @@ def execute_procedure(proc_name, params=None):
         if connection:
             connection.rollback()
         logger.error(f"Procedure error: {e}")
-        return {'success': False, 'error': str(e)}
+        return {'success': False, 'error': str(e), 'errno': e.errno}
     finally:
         if cursor:
             cursor.close()
@@ -120,57 +750,3 @@ def test_connection():
     except Error as e:
         logger.error(f"Connection test failed: {e}")
         return False
-
-def authenticate_user(username, password, role):
-    """Authenticate user with database credentials"""
-    connection = None
-    try:
-        # Create connection with user credentials
-        db_config = {
-            'host': DB_CONFIG['host'],
-            'database': DB_CONFIG['database'],
-            'user': username,
-            'password': password
-        }
-        
-        connection = mysql.connector.connect(**db_config)
-        
-        if connection.is_connected():
-            # Verify role-based access
-            cursor = connection.cursor()
-            
-            if role == 'admin':
-                # Admin should have all privileges
-                cursor.execute("SHOW GRANTS FOR CURRENT_USER()")
-                grants = cursor.fetchall()
-                has_all_privileges = any('ALL PRIVILEGES' in str(grant) for grant in grants)
-                
-                if has_all_privileges:
-                    cursor.close()
-                    connection.close()
-                    return {'success': True, 'role': 'admin'}
-                else:
-                    cursor.close()
-                    connection.close()
-                    return {'success': False, 'error': 'User does not have admin privileges'}
-            
-            elif role == 'user':
-                # Passenger should have limited access
-                cursor.execute("SHOW GRANTS FOR CURRENT_USER()")
-                grants = cursor.fetchall()
-                
-                cursor.close()
-                connection.close()
-                return {'success': True, 'role': 'user'}
-            
-            else:
-                connection.close()
-                return {'success': False, 'error': 'Invalid role'}
-        
-        return {'success': False, 'error': 'Authentication failed'}
-        
-    except Error as e:
-        logger.error(f"Authentication error: {e}")
-        if connection:
-            connection.close()
-        return {'success': False, 'error': 'Invalid username or password'}
@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+import time
+import logging
+from database import Error, transaction, execute_query
+from config import INTAKE_CONFIG
+import metrics
+from batches import BatchWriter
+import stats as dashboard_stats
+from changes import change_log
+from audit import audit_log
+
+logger = logging.getLogger(__name__)
+
+COMPLAINT_INSERT = """
+    INSERT INTO COMPLAINT (ComplaintCode, Title, Description, PassengerID,
+                           Category, Priority, Status)
+    VALUES (%s, %s, %s, %s, %s, 'Medium', 'Pending')
+"""
+
+CATEGORIES = ['Service', 'Cleanliness', 'Safety', 'Ticketing', 'Staff Behavior', 'Delay', 'Facility', 'Other']
+
+# Errors caused by a row's data rather than the database being unavailable:
+# bad foreign key, data too long, wrong value, duplicate code
+ROW_ERRORS = {1062, 1265, 1366, 1406, 1452}
+
+flush_seconds = metrics.register(metrics.Histogram('transpotrack_complaint_flush_seconds',
+                                  'Time to insert and commit one complaint batch', (), metrics.SECONDS_BUCKETS))
+flush_rows = metrics.register(metrics.Histogram('transpotrack_complaint_flush_rows',
+                               'Complaints per committed batch', (), metrics.ROWS_BUCKETS))
+
+def validate(data):
+    """Complaint row for a request body, or an error message"""
+    try:
+        passenger_id = int(data['passengerId'])
+    except (KeyError, TypeError, ValueError):
+        return None, 'passengerId is required'
+    description = (data.get('description') or '').strip()
+    if not description:
+        return None, 'description is required'
+    title = data.get('subject') or data.get('title') or 'General Complaint'
+    if len(title) > 200:
+        return None, 'title must be at most 200 characters'
+    category = data.get('category', 'Other')
+    if category not in CATEGORIES:
+        return None, f"category must be one of {', '.join(CATEGORIES)}"
+    return {'title': title, 'description': description, 'passengerId': passenger_id, 'category': category}, None
+
+class ComplaintIntake(BatchWriter):
+    """Accepts complaints into a queue that a background writer inserts
+    in batches, one commit per batch
+
+    Every accepted complaint is first appended to a local spill file, and
+    committed codes are appended after each batch, so complaints still
+    queued when the process stops are inserted after a restart. The file
+    is truncated whenever the queue drains. One app process owns the file.
+    """
+    def __init__(self, spill_path, batch_size, flush_interval, max_queue):
+        super().__init__('complaint-writer', batch_size, flush_interval, INTAKE_CONFIG['RETRY_SECONDS'])
+        self.spill_path = spill_path
+        self.max_queue = max_queue
+        self._spill_lock = threading.Lock()
+        self._spill = None
+        self._stats.update({'accepted': 0, 'written': 0, 'rejected': 0, 'batches': 0})
+        self._last_flush_seconds = None
+
+    def _starting(self):
+        """Queue the spill file's complaints before the writer starts"""
+        self._queue.extend(self._replay())
+
+    def _replay(self):
+        """Complaints in the spill file that were never committed"""
+        if not os.path.exists(self.spill_path):
+            return []
+        pending = {}
+        with open(self.spill_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write
+                    continue
+                if entry['op'] == 'add':
+                    pending[entry['row']['code']] = entry['row']
+                else:
+                    for code in entry['codes']:
+                        pending.pop(code, None)
+        if pending:
+            # A batch may have committed just before its 'done' line was written
+            placeholders = ', '.join(['%s'] * len(pending))
+            result = execute_query(f"SELECT ComplaintCode FROM COMPLAINT WHERE ComplaintCode IN ({placeholders})",
+                                   tuple(pending))
+            if result['success']:
+                for row in result['data']:
+                    pending.pop(row['ComplaintCode'], None)
+            logger.info(f"Replaying {len(pending)} queued complaint(s) from {self.spill_path}")
+        return list(pending.values())
+
+    def _append(self, entry):
+        with self._spill_lock:
+            if self._spill is None:
+                os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+                self._spill = open(self.spill_path, 'a')
+            self._spill.write(json.dumps(entry) + '\n')
+            self._spill.flush()
+            if INTAKE_CONFIG['FSYNC']:
+                os.fsync(self._spill.fileno())
+
+    def submit(self, row):
+        """Queue a validated complaint; False if the queue is full"""
+        self.start()
+        with self._condition:
+            if self._pending() >= self.max_queue:
+                return False
+            # Spill before acknowledging, under the queue lock so truncation
+            # can never drop a line for a complaint that is still queued
+            self._append({'op': 'add', 'row': row})
+            self._put(row)
+            self._stats['accepted'] += 1
+        return True
+
+    def _insert(self, rows):
+        """Insert rows in one transaction; returns their ComplaintIDs by code"""
+        codes = [row['code'] for row in rows]
+        with transaction() as tx:
+            tx.executemany(COMPLAINT_INSERT, [
+                (row['code'], row['title'], row['description'], row['passengerId'], row['category'])
+                for row in rows
+            ])
+            placeholders = ', '.join(['%s'] * len(codes))
+            return {row['ComplaintCode']: row['ComplaintID'] for row in tx.fetch(
+                f"SELECT ComplaintID, ComplaintCode FROM COMPLAINT WHERE ComplaintCode IN ({placeholders})", codes)}
+
+    def _write(self, batch):
+        """Insert a batch; returns the rows that should be retried later"""
+        started = time.monotonic()
+        try:
+            ids = self._insert(batch)
+            written, rejected = batch, []
+        except Error as e:
+            if e.errno not in ROW_ERRORS:
+                logger.warning(f"Complaint batch of {len(batch)} failed, will retry: {e}")
+                return batch
+            # One bad row fails the whole batch; find it row by row
+            written, rejected, ids = [], [], {}
+            for row in batch:
+                try:
+                    ids.update(self._insert([row]))
+                    written.append(row)
+                except Error as row_error:
+                    if row_error.errno not in ROW_ERRORS:
+                        # The database went away mid-way: retry what is left
+                        return batch[len(written) + len(rejected):]
+                    logger.error(f"Dropping complaint {row['code']}: {row_error}")
+                    rejected.append(row)
+        
+        elapsed = time.monotonic() - started
+        flush_seconds.observe((), elapsed)
+        flush_rows.observe((), len(written))
+        self._append({'op': 'done', 'codes': [row['code'] for row in written + rejected]})
+        if written:
+            dashboard_stats.adjust(pending_complaints=len(written))
+            change_log.record('COMPLAINT', list(ids.values()))
+            for row in written:
+                new = {key: value for key, value in row.items() if key != 'changedBy'}
+                audit_log.record('COMPLAINT', ids.get(row['code']), 'INSERT', new=new,
+                                 changed_by=row.get('changedBy', 'SYSTEM'))
+        with self._condition:
+            self._stats['written'] += len(written)
+            self._stats['rejected'] += len(rejected)
+            self._stats['batches'] += 1
+            self._last_flush_seconds = elapsed
+        return []
+
+    def _written(self):
+        """Start a fresh spill file once nothing is queued or in flight"""
+        with self._condition:
+            if self._pending():
+                return
+            with self._spill_lock:
+                if self._spill is not None:
+                    self._spill.close()
+                    self._spill = None
+                open(self.spill_path, 'w').close()
+
+    def stats(self):
+        stats = super().stats()
+        with self._condition:
+            stats['last_flush_seconds'] = self._last_flush_seconds
+        return stats
+
+complaint_intake = ComplaintIntake(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), INTAKE_CONFIG['SPILL_FILE']),
+    INTAKE_CONFIG['BATCH_SIZE'], INTAKE_CONFIG['FLUSH_SECONDS'], INTAKE_CONFIG['MAX_QUEUE'])
+
+metrics.register(metrics.Gauge('transpotrack_complaint_queue_depth', 'Complaints waiting to be written',
+                               lambda: complaint_intake.stats()['queue_depth']))
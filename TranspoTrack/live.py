@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+import logging
+import weakref
+from collections import deque
+from database import execute_query
+from config import LIVE_CONFIG
+import metrics
+import stats as dashboard_stats
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_STATUS_QUERY = "SELECT ScheduleID, Status, DelayMinutes FROM SCHEDULE"
+
+def encode(event_id, event, data):
+    """One Server-Sent Events message"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+class Broadcaster:
+    """Polls dashboard counters and schedule status once per tick for all clients
+
+    A single producer thread computes what changed and appends each event,
+    already encoded, to a shared backlog. Every client streams from its own
+    position in that backlog, so a tick costs the same database work however
+    many screens are open, and sending is the only per-client work. A client
+    that falls further behind than the backlog (a slow or stalled
+    connection) is not waited for: when it catches up it is sent a fresh
+    snapshot instead of the events it missed. The producer only runs while
+    someone is subscribed.
+    """
+    def __init__(self, tick_seconds, backlog, heartbeat_seconds, max_clients):
+        self.tick_seconds = tick_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_clients = max_clients
+        self._events = deque(maxlen=backlog)    # (id, encoded message)
+        self._last_id = 0
+        self._stats = None
+        self._schedules = None                  # ScheduleID -> (Status, DelayMinutes)
+        self._clients = 0
+        self._resyncs = 0
+        self._thread = None
+        self._condition = threading.Condition()
+
+    def _publish(self, event, data):
+        self._last_id += 1
+        self._events.append((self._last_id, encode(self._last_id, event, data)))
+
+    def _snapshot(self):
+        """Full state as of the latest event, for new and lagging clients"""
+        messages = []
+        if self._stats is not None:
+            messages.append(encode(self._last_id, 'stats', self._stats))
+        if self._schedules is not None:
+            messages.append(encode(self._last_id, 'schedules', {'full': True, 'schedules': [
+                {'ScheduleID': schedule_id, 'Status': status, 'DelayMinutes': delay}
+                for schedule_id, (status, delay) in self._schedules.items()
+            ]}))
+        return b''.join(messages)
+
+    def _load_schedules(self):
+        result = execute_query(SCHEDULE_STATUS_QUERY)
+        if not result['success']:
+            return None
+        return {row['ScheduleID']: (row['Status'], row['DelayMinutes'] or 0) for row in result['data']}
+
+    def tick(self):
+        """Read the current state once and publish whatever changed"""
+        stats = dashboard_stats.get_stats()
+        schedules = self._load_schedules()
+
+        with self._condition:
+            if stats != self._stats:
+                self._stats = stats
+                self._publish('stats', stats)
+            if schedules is not None and schedules != self._schedules:
+                # After a restart of the producer the first read is a full list
+                full = self._schedules is None
+                previous = self._schedules or {}
+                changed = [
+                    {'ScheduleID': schedule_id, 'Status': status, 'DelayMinutes': delay}
+                    for schedule_id, (status, delay) in schedules.items()
+                    if previous.get(schedule_id) != (status, delay)
+                ]
+                removed = [schedule_id for schedule_id in previous if schedule_id not in schedules]
+                self._schedules = schedules
+                self._publish('schedules', {'full': full, 'schedules': changed, 'removed': removed})
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._clients:
+                    # Nobody is watching: stop polling, and start from a
+                    # fresh read when the next client arrives
+                    self._stats = None
+                    self._schedules = None
+                    self._condition.wait()
+            started = time.monotonic()
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Live update tick failed: {e}")
+            time.sleep(max(0.0, self.tick_seconds - (time.monotonic() - started)))
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='live-updates', daemon=True)
+            self._thread.start()
+
+    def subscribe(self, last_event_id=None):
+        """A client's message generator, or None when there are too many
+
+        The slot is taken in the same step as the check, so a burst of
+        connects can't overshoot the limit. It is given back when the
+        stream ends, or when a response that never started streaming is
+        garbage collected.
+        """
+        with self._condition:
+            if self._clients >= self.max_clients:
+                return None
+            self._clients += 1
+            self._start()
+            self._condition.notify_all()
+        
+        held = [True]
+        def release():
+            with self._condition:
+                if held[0]:
+                    held[0] = False
+                    self._clients -= 1
+        stream = self._stream(last_event_id, release)
+        weakref.finalize(stream, release)
+        return stream
+
+    def _pending(self, position):
+        """Messages after `position`, or a snapshot when they were dropped"""
+        if self._events and position < self._events[0][0] - 1:
+            self._resyncs += 1
+            return self._last_id, self._snapshot()
+        messages = [message for event_id, message in self._events if event_id > position]
+        return self._last_id, b''.join(messages)
+
+    def _stream(self, last_event_id, release):
+        try:
+            yield f"retry: {LIVE_CONFIG['RETRY_MS']}\n\n".encode()
+            with self._condition:
+                if last_event_id is not None and 0 < last_event_id <= self._last_id:
+                    # A reconnecting EventSource resumes where it left off
+                    position, body = self._pending(last_event_id)
+                else:
+                    # Wait for the first read after the producer (re)starts
+                    if self._stats is None and self._schedules is None:
+                        self._condition.wait(self.tick_seconds * 2)
+                    position, body = self._last_id, self._snapshot()
+            if body:
+                yield body
+
+            while True:
+                with self._condition:
+                    if self._last_id == position:
+                        self._condition.wait(self.heartbeat_seconds)
+                    position, body = self._pending(position)
+                # Sending happens outside the lock; a slow socket only holds
+                # up its own client
+                yield body or b": keepalive\n\n"
+        finally:
+            release()
+
+    def stats(self):
+        with self._condition:
+            return {'clients': self._clients, 'last_event_id': self._last_id,
+                    'backlog': len(self._events), 'resyncs': self._resyncs}
+
+broadcaster = Broadcaster(LIVE_CONFIG['TICK_SECONDS'], LIVE_CONFIG['BACKLOG'],
+                          LIVE_CONFIG['HEARTBEAT_SECONDS'], LIVE_CONFIG['MAX_CLIENTS'])
+
+metrics.register(metrics.Gauge('transpotrack_live_clients', 'Connected live update streams',
+                               lambda: broadcaster.stats()['clients']))
@@ -0,0 +1,155 @@
+import argparse
+import threading
+import time
+import logging
+from collections import deque
+from datetime import datetime
+from database import run_in_transaction
+from config import MAINTENANCE_CONFIG
+import stats as dashboard_stats
+from passes import pass_index
+from changes import change_log
+import audit
+
+logger = logging.getLogger(__name__)
+
+class Sweep:
+    """Moves rows of one table from an old status to 'Expired' once a date has passed"""
+    def __init__(self, name, table, key, status_column, from_status, date_column):
+        self.name = name
+        self.table = table
+        self.key = key
+        self.status_column = status_column
+        self.from_status = from_status
+        self.date_column = date_column
+
+    def due(self):
+        return f"{self.status_column} = %s AND {self.date_column} < CURDATE()"
+
+    def next_chunk(self, cursor, after, chunk_size):
+        """Primary keys of the next chunk of rows due to expire"""
+        cursor.execute(f"""
+            SELECT {self.key} FROM {self.table}
+            WHERE {self.key} > %s AND {self.due()}
+            ORDER BY {self.key}
+            LIMIT %s
+        """, (after, self.from_status, chunk_size))
+        return [row[self.key] for row in cursor.fetchall()]
+
+    def expire(self, cursor, first, last):
+        # Re-check the condition: rows may have changed since the SELECT
+        cursor.execute(f"""
+            UPDATE {self.table} SET {self.status_column} = 'Expired'
+            WHERE {self.key} BETWEEN %s AND %s AND {self.due()}
+        """, (first, last, self.from_status))
+        return cursor.rowcount
+
+SWEEPS = [
+    Sweep('passes', 'PASS', 'PassID', 'PassStatus', 'Active', 'EndDate'),
+    Sweep('tickets', 'TICKET', 'TicketNumber', 'TicketStatus', 'Booked', 'JourneyDate')
+]
+
+# Stats of the most recent runs, newest last
+run_log = deque(maxlen=20)
+
+def run_sweep(sweep, chunk_size, pause_seconds, dry_run):
+    """Expire one table chunk by chunk, each chunk in its own short transaction"""
+    stats = {'sweep': sweep.name, 'chunks': 0, 'rows': 0}
+    after = 0
+    while True:
+        def work(cursor):
+            keys = sweep.next_chunk(cursor, after, chunk_size)
+            if not keys or dry_run:
+                return {'success': True, 'keys': keys, 'rows': len(keys)}
+            return {'success': True, 'keys': keys, 'rows': sweep.expire(cursor, keys[0], keys[-1])}
+        
+        result = run_in_transaction(work)
+        if not result['success']:
+            stats['error'] = result['error']
+            break
+        if not result['keys']:
+            break
+        stats['chunks'] += 1
+        stats['rows'] += result['rows']
+        if result['rows'] and not dry_run:
+            change_log.record(sweep.table, result['keys'])
+        after = result['keys'][-1]
+        if len(result['keys']) < chunk_size:
+            break
+        time.sleep(pause_seconds)
+    return stats
+
+def run_once(dry_run=None):
+    """Run every sweep once and record the run's stats"""
+    if dry_run is None:
+        dry_run = MAINTENANCE_CONFIG['DRY_RUN']
+    started = time.monotonic()
+    run = {'started_at': datetime.now(), 'dry_run': dry_run, 'sweeps': []}
+    for sweep in SWEEPS:
+        stats = run_sweep(sweep, MAINTENANCE_CONFIG['CHUNK_SIZE'], MAINTENANCE_CONFIG['PAUSE_SECONDS'], dry_run)
+        run['sweeps'].append(stats)
+        verb = 'would expire' if dry_run else 'expired'
+        logger.info(f"Expiry sweep {sweep.name}: {verb} {stats['rows']} row(s) in {stats['chunks']} chunk(s)"
+                    + (f", stopped on error: {stats['error']}" if 'error' in stats else ''))
+    
+    # Audit retention drops whole monthly partitions instead of deleting rows
+    run['audit_partitions'] = audit.maintain_partitions(dry_run)
+    partitions = run['audit_partitions']
+    logger.info(f"Audit partitions: added {partitions['added'] or 'none'}, dropped {partitions['dropped'] or 'none'}"
+                + (f", stopped on error: {partitions['error']}" if 'error' in partitions else ''))
+    run['seconds'] = round(time.monotonic() - started, 3)
+    run_log.append(run)
+    
+    if not dry_run and any(stats['rows'] for stats in run['sweeps']):
+        dashboard_stats.invalidate()
+        pass_index.invalidate()
+    return run
+
+class Scheduler:
+    """Runs the expiry sweeps on a background thread every interval"""
+    def __init__(self, interval_seconds):
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='expiry-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                run_once()
+            except Exception:
+                logger.exception("Expiry sweep failed")
+            self._stop.wait(self.interval_seconds)
+
+scheduler = Scheduler(MAINTENANCE_CONFIG['INTERVAL_SECONDS'])
+
+def start_scheduler():
+    """Start the background sweeper if it is enabled in MAINTENANCE_CONFIG"""
+    if MAINTENANCE_CONFIG['ENABLED']:
+        scheduler.start()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Expire passes and tickets whose dates have passed and roll audit partitions")
+    parser.add_argument('--dry-run', action='store_true', help="count rows without updating them")
+    args = parser.parse_args()
+    
+    run = run_once(args.dry_run)
+    for stats in run['sweeps']:
+        if 'error' in stats:
+            print(f"❌ {stats['sweep']}: {stats['error']}")
+        else:
+            print(f"✅ {stats['sweep']}: {stats['rows']} row(s) {'due' if args.dry_run else 'expired'}")
+    partitions = run['audit_partitions']
+    if 'error' in partitions:
+        print(f"❌ audit partitions: {partitions['error']}")
+    else:
+        verb = 'would be' if args.dry_run else 'were'
+        print(f"✅ audit partitions: {len(partitions['added'])} {verb} added, {len(partitions['dropped'])} {verb} dropped")
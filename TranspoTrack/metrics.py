@@ -0,0 +1,276 @@
+import re
+import threading
+import time
+import logging
+from collections import defaultdict
+from config import METRICS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds
+SECONDS_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+ROWS_BUCKETS = [0, 1, 10, 100, 1000, 10000, 100000]
+
+class Histogram:
+    """A Prometheus-style histogram keyed by a tuple of label values"""
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = defaultdict(lambda: [[0] * (len(buckets) + 1), 0.0])
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        with self._lock:
+            series = self._series[labels]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(series):
+            label_text = ','.join(f'{name}="{escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + ',' if label_text else ''
+            running = 0
+            for bound, count in zip(self.buckets + ['+Inf'], counts):
+                running += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {running}')
+            suffix = f"{{{label_text}}}" if label_text else ''
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {running}")
+        return '\n'.join(lines)
+
+class Counter:
+    """A Prometheus-style counter keyed by a tuple of label values"""
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            label_text = ','.join(f'{name}="{escape(value)}"' for name, value in zip(self.label_names, labels))
+            lines.append(f"{self.name}{{{label_text}}} {value}")
+        return '\n'.join(lines)
+
+class Gauge:
+    """A Prometheus-style gauge read from a callback at scrape time"""
+    def __init__(self, name, help_text, read):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def render(self):
+        return '\n'.join([f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge",
+                          f"{self.name} {self.read()}"])
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+http_requests = Counter('transpotrack_http_requests_total',
+                        'HTTP requests by endpoint, method and status', ('endpoint', 'method', 'status'))
+http_seconds = Histogram('transpotrack_http_request_seconds',
+                         'Time spent handling a request', ('endpoint', 'method'), SECONDS_BUCKETS)
+http_pool_wait = Histogram('transpotrack_http_pool_wait_seconds',
+                           'Time a request waited for pooled connections', ('endpoint',), SECONDS_BUCKETS)
+http_sql_seconds = Histogram('transpotrack_http_sql_seconds',
+                             'Time a request spent in SQL', ('endpoint',), SECONDS_BUCKETS)
+http_sql_rows = Histogram('transpotrack_http_sql_rows',
+                          'Rows returned or affected by a request\'s SQL', ('endpoint',), ROWS_BUCKETS)
+http_serialize = Histogram('transpotrack_http_serialize_seconds',
+                           'Time spent serializing JSON responses', ('endpoint',), SECONDS_BUCKETS)
+pool_wait = Histogram('transpotrack_db_pool_wait_seconds',
+                      'Connection checkout wait time', (), SECONDS_BUCKETS)
+sql_seconds = Histogram('transpotrack_sql_seconds',
+                        'SQL execution and fetch time by normalized statement', ('statement',), SECONDS_BUCKETS)
+sql_rows = Histogram('transpotrack_sql_rows',
+                     'Rows returned or affected by normalized statement', ('statement',), ROWS_BUCKETS)
+slow_queries = Counter('transpotrack_sql_slow_total',
+                       'Statements slower than SLOW_QUERY_SECONDS', ('statement',))
+
+ALL_METRICS = [http_requests, http_seconds, http_pool_wait, http_sql_seconds, http_sql_rows,
+               http_serialize, pool_wait, sql_seconds, sql_rows, slow_queries]
+
+def register(metric):
+    """Add a metric defined elsewhere to the /metrics output"""
+    ALL_METRICS.append(metric)
+    return metric
+
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+_statements = {}
+_labels = set()
+_statements_lock = threading.Lock()
+
+def normalize(statement):
+    """Statement label for a query: literals replaced, whitespace collapsed
+
+    Queries are mostly module constants, so the result is memoised by text.
+    Texts with a variable-length IN-list are not: every length is a new text
+    but the same label. Past MAX_STATEMENTS distinct labels everything new
+    is reported as "other"; the memo itself is capped at as many texts.
+    """
+    label = _statements.get(statement)
+    if label is not None:
+        return label
+    text = statement.decode('utf-8', 'replace') if isinstance(statement, bytes) else statement
+    label = _SPACE.sub(' ', text).strip()
+    label = _STRING.sub('?', label)
+    label = _NUMBER.sub('?', label)
+    label, lists = _IN_LIST.subn('(...)', label)
+    label = label[:200]
+    with _statements_lock:
+        if label not in _labels:
+            if len(_labels) >= METRICS_CONFIG['MAX_STATEMENTS']:
+                return 'other'
+            _labels.add(label)
+        if not lists and len(_statements) < METRICS_CONFIG['MAX_STATEMENTS']:
+            _statements[statement] = label
+    return label
+
+# Totals for the request being handled on this thread
+_local = threading.local()
+
+def begin_request():
+    _local.totals = {'pool_wait': 0.0, 'sql': 0.0, 'rows': 0, 'serialize': 0.0}
+    _local.started = time.perf_counter()
+
+def end_request(endpoint, method, status):
+    """Record the request that begin_request() started on this thread"""
+    totals = getattr(_local, 'totals', None)
+    if totals is None:
+        return
+    _local.totals = None
+    http_requests.inc((endpoint, method, str(status)))
+    http_seconds.observe((endpoint, method), time.perf_counter() - _local.started)
+    http_pool_wait.observe((endpoint,), totals['pool_wait'])
+    http_sql_seconds.observe((endpoint,), totals['sql'])
+    http_sql_rows.observe((endpoint,), totals['rows'])
+    if totals['serialize']:
+        http_serialize.observe((endpoint,), totals['serialize'])
+
+def _add(key, value):
+    totals = getattr(_local, 'totals', None)
+    if totals is not None:
+        totals[key] += value
+
+def observe_pool_wait(seconds):
+    pool_wait.observe((), seconds)
+    _add('pool_wait', seconds)
+
+def observe_serialization(seconds):
+    _add('serialize', seconds)
+
+def observe_sql(statement, seconds, rows):
+    label = normalize(statement)
+    sql_seconds.observe((label,), seconds)
+    sql_rows.observe((label,), rows)
+    _add('sql', seconds)
+    _add('rows', rows)
+    if seconds >= METRICS_CONFIG['SLOW_QUERY_SECONDS']:
+        slow_queries.inc((label,))
+        logger.warning(f"Slow query ({seconds * 1000:.1f} ms, {rows} rows): {label}")
+
+class TimedCursor:
+    """Cursor wrapper timing each statement from execute through its fetches
+
+    A statement is recorded when the next one starts or the cursor closes,
+    so rows fetched later are counted against the statement that made them.
+    """
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._statement = None
+        self._seconds = 0.0
+        self._rows = 0
+        self._fetched = False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _flush(self):
+        if self._statement is None:
+            return
+        rows = self._rows if self._fetched else max(self._cursor.rowcount or 0, 0)
+        observe_sql(self._statement, self._seconds, rows)
+        self._statement = None
+
+    def _run(self, statement, method, *args, **kwargs):
+        self._flush()
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self._statement = statement
+            self._seconds = time.perf_counter() - started
+            self._rows = 0
+            self._fetched = False
+
+    def execute(self, operation, *args, **kwargs):
+        return self._run(operation, self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._run(operation, self._cursor.executemany, operation, *args, **kwargs)
+
+    def callproc(self, procname, *args, **kwargs):
+        return self._run(f"CALL {procname}", self._cursor.callproc, procname, *args, **kwargs)
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        rows = method(*args)
+        self._seconds += time.perf_counter() - started
+        self._fetched = True
+        if isinstance(rows, list):
+            self._rows += len(rows)
+        elif rows is not None:
+            self._rows += 1
+        return rows
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._fetch(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def finish(self):
+        """Record the last statement without closing the cursor"""
+        self._flush()
+
+    def close(self):
+        self._flush()
+        return self._cursor.close()
+
+def render():
+    """Every metric in the Prometheus text exposition format"""
+    return '\n'.join(metric.render() for metric in ALL_METRICS) + '\n'
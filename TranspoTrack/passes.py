@@ -0,0 +1,224 @@
+import bisect
+import threading
+import time
+import logging
+from datetime import date
+from database import execute_query, use_primary
+from config import PASS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+class PassIntervals:
+    """Active passes of one passenger, sorted by start date
+
+    Dates are held as ordinals; `reach[i]` is the latest end date among the
+    first i + 1 passes, so a lookup can stop as soon as nothing earlier
+    could still cover the day.
+    """
+    def __init__(self):
+        self.starts = []
+        self.passes = []
+        self.reach = []
+
+    def add(self, row):
+        index = bisect.bisect_right(self.starts, row['StartOrdinal'])
+        self.starts.insert(index, row['StartOrdinal'])
+        self.passes.insert(index, row)
+        self._rebuild_reach(index)
+
+    def remove(self, pass_id):
+        for index, row in enumerate(self.passes):
+            if row['PassID'] == pass_id:
+                del self.starts[index]
+                del self.passes[index]
+                self._rebuild_reach(index)
+                return row
+        return None
+
+    def _rebuild_reach(self, index):
+        del self.reach[index:]
+        latest = self.reach[-1] if self.reach else 0
+        for row in self.passes[index:]:
+            latest = max(latest, row['EndOrdinal'])
+            self.reach.append(latest)
+
+    def covering(self, day):
+        """The pass valid on `day` (an ordinal) that runs longest, or None"""
+        best = None
+        index = bisect.bisect_right(self.starts, day) - 1
+        while index >= 0 and self.reach[index] >= day:
+            row = self.passes[index]
+            if row['EndOrdinal'] >= day and (best is None or row['EndOrdinal'] > best['EndOrdinal']):
+                best = row
+            index -= 1
+        return best
+
+class PassIndex:
+    """In-memory index of Active passes by PassengerID and PassCode
+
+    Writes made through the app are applied directly; a full reload on a
+    timer picks up anything changed behind its back (expiry, manual SQL).
+    """
+    def __init__(self, refresh_seconds):
+        self.refresh_seconds = refresh_seconds
+        self._by_passenger = {}
+        self._by_code = {}
+        self._by_id = {}
+        self._expires_at = 0.0
+        self._loading = False
+        self._loaded = False
+        # Changes applied while a reload is reading, replayed on top of it
+        self._pending = []
+        self._lock = threading.Condition()
+
+    @staticmethod
+    def _entry(row):
+        start = row['StartDate']
+        end = row['EndDate']
+        if isinstance(start, str):
+            start = date.fromisoformat(start)
+        if isinstance(end, str):
+            end = date.fromisoformat(end)
+        return {
+            'PassID': row['PassID'],
+            'PassCode': row['PassCode'],
+            'PassType': row['PassType'],
+            'PassengerID': int(row['PassengerID']),
+            'StartDate': start,
+            'EndDate': end,
+            'StartOrdinal': start.toordinal(),
+            'EndOrdinal': end.toordinal()
+        }
+
+    def _add(self, entry):
+        self._remove(entry['PassID'])
+        self._by_id[entry['PassID']] = entry
+        self._by_code[entry['PassCode']] = entry
+        self._by_passenger.setdefault(entry['PassengerID'], PassIntervals()).add(entry)
+
+    def _remove(self, pass_id):
+        entry = self._by_id.pop(pass_id, None)
+        if entry is None:
+            return
+        self._by_code.pop(entry['PassCode'], None)
+        intervals = self._by_passenger.get(entry['PassengerID'])
+        if intervals is not None:
+            intervals.remove(pass_id)
+            if not intervals.passes:
+                del self._by_passenger[entry['PassengerID']]
+
+    @use_primary()
+    def _refresh(self):
+        """Reload the index from PASS once it has expired
+
+        Until the first load has finished callers wait for it: an empty
+        index would turn every valid pass away.
+        """
+        with self._lock:
+            while self._loading and not self._loaded:
+                self._lock.wait()
+            if self._loading or time.monotonic() < self._expires_at:
+                return
+            self._loading = True
+            self._pending = []
+        
+        result = execute_query("""
+            SELECT PassID, PassCode, PassType, PassengerID, StartDate, EndDate
+            FROM PASS
+            WHERE PassStatus = 'Active'
+        """)
+        
+        with self._lock:
+            self._loading = False
+            self._lock.notify_all()
+            if not result['success']:
+                # Keep serving the old index and retry on the next check
+                return
+            self._loaded = True
+            self._by_passenger = {}
+            self._by_code = {}
+            self._by_id = {}
+            for row in result['data']:
+                self._add(self._entry(row))
+            for change in self._pending:
+                change()
+            self._pending = []
+            self._expires_at = time.monotonic() + self.refresh_seconds
+        logger.info(f"Pass index loaded: {len(self._by_id)} active passes")
+
+    def warm(self):
+        """Load the index in the background so the first gate check is fast"""
+        threading.Thread(target=self._refresh, name='pass-index', daemon=True).start()
+
+    def _apply(self, change):
+        with self._lock:
+            change()
+            if self._loading:
+                self._pending.append(change)
+
+    def add(self, row):
+        """Record a pass that was just inserted as Active"""
+        entry = self._entry(row)
+        self._apply(lambda: self._add(entry))
+
+    def set_status(self, pass_id, status, row=None):
+        """Record a status change; only Active passes are indexed"""
+        if status == 'Active' and row is not None:
+            self.add(row)
+        elif status != 'Active':
+            self._apply(lambda: self._remove(pass_id))
+        else:
+            self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._expires_at = 0.0
+
+    def validate(self, taps, today=None):
+        """Check a list of taps, each {'passCode'|'passengerId', 'date'?}
+
+        Returns one result per tap, in order, or None while the index has
+        never loaded (the database is unavailable) and no tap can be judged.
+        """
+        self._refresh()
+        today = today or date.today()
+        results = []
+        with self._lock:
+            if not self._loaded:
+                return None
+            for tap in taps:
+                try:
+                    day = date.fromisoformat(tap['date']) if tap.get('date') else today
+                except (TypeError, ValueError):
+                    results.append({'valid': False, 'reason': 'Invalid date'})
+                    continue
+                day = day.toordinal()
+                
+                if tap.get('passCode'):
+                    entry = self._by_code.get(tap['passCode'])
+                    if entry is not None and not entry['StartOrdinal'] <= day <= entry['EndOrdinal']:
+                        entry = None
+                elif tap.get('passengerId') is not None:
+                    try:
+                        intervals = self._by_passenger.get(int(tap['passengerId']))
+                    except (TypeError, ValueError):
+                        intervals = None
+                    entry = intervals.covering(day) if intervals is not None else None
+                else:
+                    results.append({'valid': False, 'reason': 'passCode or passengerId is required'})
+                    continue
+                
+                if entry is None:
+                    results.append({'valid': False, 'reason': 'No active pass for this date'})
+                else:
+                    results.append({
+                        'valid': True,
+                        'PassID': entry['PassID'],
+                        'PassCode': entry['PassCode'],
+                        'PassType': entry['PassType'],
+                        'PassengerID': entry['PassengerID'],
+                        'EndDate': entry['EndDate']
+                    })
+        return results
+
+pass_index = PassIndex(PASS_CONFIG['REFRESH_SECONDS'])
@@ -0,0 +1,56 @@
+import argparse
+import logging
+from datetime import date, timedelta
+from database import execute_query, execute_procedure
+
+logger = logging.getLogger(__name__)
+
+def payment_date_range():
+    """First and last day that have payments"""
+    result = execute_query("SELECT DATE(MIN(Timestamp)) as first_day, DATE(MAX(Timestamp)) as last_day FROM PAYMENT")
+    if not result['success'] or not result['data'] or result['data'][0]['first_day'] is None:
+        return None, None
+    row = result['data'][0]
+    return row['first_day'], row['last_day']
+
+def month_chunks(start, end):
+    """Split [start, end] into calendar-month ranges"""
+    while start <= end:
+        next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        yield start, min(end, next_month - timedelta(days=1))
+        start = next_month
+
+def rebuild(start=None, end=None):
+    """Recompute REVENUE_DAILY from PAYMENT, one month per transaction
+
+    Short per-month transactions keep the rollup rows locked only briefly
+    while bookings keep updating them.
+    """
+    if start is None or end is None:
+        first_day, last_day = payment_date_range()
+        start = start or first_day
+        end = end or last_day
+    if start is None or end is None:
+        logger.info("No payments to roll up")
+        return {'success': True, 'months': 0}
+    
+    months = 0
+    for chunk_start, chunk_end in month_chunks(start, end):
+        result = execute_procedure('sp_rebuild_revenue_daily', [chunk_start, chunk_end])
+        if not result['success']:
+            return result
+        months += 1
+        logger.info(f"Rebuilt revenue rollup for {chunk_start} to {chunk_end}")
+    return {'success': True, 'months': months}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Backfill or rebuild the REVENUE_DAILY rollup")
+    parser.add_argument('--start', type=date.fromisoformat, help="first day (default: first payment)")
+    parser.add_argument('--end', type=date.fromisoformat, help="last day (default: last payment)")
+    args = parser.parse_args()
+    
+    result = rebuild(args.start, args.end)
+    if result['success']:
+        print(f"✅ Revenue rollup rebuilt ({result['months']} month(s))")
+    else:
+        print(f"❌ Rebuild failed: {result['error']}")
@@ -0,0 +1,210 @@
+import bisect
+import re
+import threading
+import time
+import logging
+from database import execute_query, use_primary
+from config import SEARCH_CONFIG
+
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r'[a-z0-9]+')
+GRAM = 3
+
+def terms(text):
+    """Lower-cased alphanumeric words of `text`"""
+    return WORD.findall((text or '').lower())
+
+def grams(term):
+    return {term[i:i + GRAM] for i in range(len(term) - GRAM + 1)}
+
+class PassengerSearch:
+    """Prefix and trigram index over passenger names, emails and phones
+
+    Every passenger contributes the words of its name and email and the
+    digits of each phone number. A query word matches a passenger when it
+    is a prefix of one of those terms (looked up in a sorted term list) or,
+    from three characters on, appears inside one (trigram candidates, then
+    checked). All query words must match. Like the pass index, writes made
+    through the app are applied directly and a timed reload catches the rest.
+    """
+    def __init__(self, refresh_seconds):
+        self.refresh_seconds = refresh_seconds
+        self._entries = {}
+        self._terms = []        # sorted (term, PassengerID)
+        self._grams = {}        # trigram -> set of PassengerID
+        self._expires_at = 0.0
+        self._loading = False
+        # Changes applied while a reload is reading, replayed on top of it
+        self._pending = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry(passenger_id, first_name, last_name, email, status, phones):
+        words = set(terms(first_name)) | set(terms(last_name)) | set(terms(email))
+        words.update(''.join(WORD.findall(phone)) for phone in phones)
+        words.discard('')
+        return {
+            'PassengerID': passenger_id,
+            'FirstName': first_name,
+            'LastName': last_name,
+            'Email': email,
+            'Status': status,
+            'PhoneNumbers': ', '.join(phones) or None,
+            'terms': sorted(words),
+            'sort': f"{first_name} {last_name}".lower()
+        }
+
+    @staticmethod
+    def _phones(value):
+        return [phone for phone in (value or '').split(', ') if phone]
+
+    def _add(self, entry):
+        self._remove(entry['PassengerID'])
+        passenger_id = entry['PassengerID']
+        self._entries[passenger_id] = entry
+        for term in entry['terms']:
+            bisect.insort(self._terms, (term, passenger_id))
+            for gram in grams(term):
+                self._grams.setdefault(gram, set()).add(passenger_id)
+
+    def _remove(self, passenger_id):
+        entry = self._entries.pop(passenger_id, None)
+        if entry is None:
+            return
+        for term in entry['terms']:
+            index = bisect.bisect_left(self._terms, (term, passenger_id))
+            if index < len(self._terms) and self._terms[index] == (term, passenger_id):
+                del self._terms[index]
+            for gram in grams(term):
+                ids = self._grams.get(gram)
+                if ids is not None:
+                    ids.discard(passenger_id)
+                    if not ids:
+                        del self._grams[gram]
+
+    @use_primary()
+    def _refresh(self):
+        """Rebuild the index from PASSENGER once it has expired"""
+        with self._lock:
+            if self._loading or time.monotonic() < self._expires_at:
+                return
+            self._loading = True
+            self._pending = []
+
+        result = execute_query("""
+            SELECT p.PassengerID, p.FirstName, p.LastName, p.Email, p.Status,
+                   GROUP_CONCAT(pp.PhoneNumber SEPARATOR ', ') as PhoneNumbers
+            FROM PASSENGER p
+            LEFT JOIN PASSENGER_PHONE pp ON p.PassengerID = pp.PassengerID
+            GROUP BY p.PassengerID
+        """)
+
+        if result['success']:
+            # Build outside the lock; searches keep using the old index
+            entries = {}
+            term_list = []
+            gram_map = {}
+            for row in result['data']:
+                entry = self._entry(row['PassengerID'], row['FirstName'], row['LastName'],
+                                    row['Email'], row['Status'], self._phones(row['PhoneNumbers']))
+                entries[entry['PassengerID']] = entry
+                for term in entry['terms']:
+                    term_list.append((term, entry['PassengerID']))
+                    for gram in grams(term):
+                        gram_map.setdefault(gram, set()).add(entry['PassengerID'])
+            term_list.sort()
+
+        with self._lock:
+            self._loading = False
+            if not result['success']:
+                # Keep serving the old index and retry on the next check
+                return
+            self._entries = entries
+            self._terms = term_list
+            self._grams = gram_map
+            for change in self._pending:
+                change()
+            self._pending = []
+            self._expires_at = time.monotonic() + self.refresh_seconds
+        logger.info(f"Passenger search index loaded: {len(entries)} passengers")
+
+    def warm(self):
+        """Build the index in the background so the first search is fast"""
+        threading.Thread(target=self._refresh, name='passenger-search', daemon=True).start()
+
+    def _apply(self, change):
+        with self._lock:
+            change()
+            if self._loading:
+                self._pending.append(change)
+
+    def put(self, passenger_id, data, phones=None):
+        """Record a created or updated passenger from its request body
+
+        `phones` of None keeps the numbers already indexed, since updates
+        do not touch PASSENGER_PHONE.
+        """
+        def change():
+            numbers = phones
+            if numbers is None:
+                current = self._entries.get(passenger_id)
+                numbers = self._phones(current['PhoneNumbers']) if current else []
+            self._add(self._entry(passenger_id, data['firstName'], data['lastName'], data['email'],
+                                  data.get('status', 'Active'), numbers))
+        self._apply(change)
+
+    def remove(self, passenger_id):
+        self._apply(lambda: self._remove(passenger_id))
+
+    def invalidate(self):
+        with self._lock:
+            self._expires_at = 0.0
+
+    def _matches(self, word):
+        """PassengerID -> score for one query word: 3 exact, 2 prefix, 1 substring"""
+        scores = {}
+        index = bisect.bisect_left(self._terms, (word,))
+        while index < len(self._terms) and self._terms[index][0].startswith(word):
+            term, passenger_id = self._terms[index]
+            scores[passenger_id] = max(scores.get(passenger_id, 0), 3 if term == word else 2)
+            index += 1
+
+        if len(word) >= GRAM:
+            candidates = None
+            for gram in grams(word):
+                ids = self._grams.get(gram, set())
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    break
+            for passenger_id in candidates or ():
+                if passenger_id not in scores and any(word in term for term in self._entries[passenger_id]['terms']):
+                    scores[passenger_id] = 1
+        return scores
+
+    def search(self, query, limit):
+        """The best `limit` passengers matching every word of `query`"""
+        self._refresh()
+        words = terms(query)
+        if not words:
+            return []
+
+        with self._lock:
+            # Longest (most selective) words first so the intersection shrinks quickly
+            totals = None
+            for word in sorted(set(words), key=len, reverse=True):
+                scores = self._matches(word)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {pid: score + scores[pid] for pid, score in totals.items() if pid in scores}
+                if not totals:
+                    return []
+
+            ranked = sorted(totals, key=lambda pid: (-totals[pid], self._entries[pid]['sort'], pid))
+            return [
+                {key: value for key, value in self._entries[pid].items() if key not in ('terms', 'sort')}
+                for pid in ranked[:limit]
+            ]
+
+passenger_search = PassengerSearch(SEARCH_CONFIG['REFRESH_SECONDS'])
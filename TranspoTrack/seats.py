@@ -0,0 +1,191 @@
+import threading
+from collections import OrderedDict
+from database import execute_query, use_primary
+from config import SEAT_CONFIG
+
+# MySQL error code for a duplicate key (unique_seat_schedule)
+ER_DUP_ENTRY = 1062
+
+def is_seat_conflict(result):
+    """Whether a failed booking result means the seat was already taken"""
+    error = result.get('error', '')
+    return 'Seat not available' in error or (
+        result.get('errno') == ER_DUP_ENTRY and 'unique_seat_schedule' in error)
+
+def seat_label(index):
+    """Seat number for a zero-based seat index: A01..A99, B01.."""
+    per_row = SEAT_CONFIG['SEATS_PER_ROW']
+    return f"{chr(ord('A') + index // per_row)}{index % per_row + 1:02d}"
+
+def seat_index(label):
+    """Zero-based index of a seat number, or None if it is outside the scheme"""
+    per_row = SEAT_CONFIG['SEATS_PER_ROW']
+    try:
+        row = ord(label[0].upper()) - ord('A')
+        number = int(label[1:])
+    except (IndexError, ValueError):
+        return None
+    if row < 0 or row > 25 or not 1 <= number <= per_row:
+        return None
+    return row * per_row + number - 1
+
+class SeatMap:
+    """Booked seats of one schedule on one journey date, as a bitmap"""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.bits = 0
+        # Seats booked under numbers outside the A01.. scheme
+        self.other = set()
+
+    def is_taken(self, label):
+        index = seat_index(label)
+        if index is None or index >= self.capacity:
+            return label in self.other
+        return bool(self.bits >> index & 1)
+
+    def take(self, label):
+        index = seat_index(label)
+        if index is None or index >= self.capacity:
+            self.other.add(label)
+        else:
+            self.bits |= 1 << index
+
+    def release(self, label):
+        index = seat_index(label)
+        if index is None or index >= self.capacity:
+            self.other.discard(label)
+        else:
+            self.bits &= ~(1 << index)
+
+    def first_free(self):
+        free = ~self.bits & ((1 << self.capacity) - 1)
+        if not free:
+            return None
+        return seat_label((free & -free).bit_length() - 1)
+
+    def booked(self):
+        seats = [seat_label(i) for i in range(self.capacity) if self.bits >> i & 1]
+        return seats + sorted(self.other)
+
+    def available_count(self):
+        return self.capacity - bin(self.bits).count('1')
+
+class SeatInventory:
+    """Per-(ScheduleID, JourneyDate) seat bitmaps, loaded lazily from TICKET
+
+    The TICKET unique key stays the source of truth: callers reserve a seat
+    here before inserting, release it if the insert fails, and mark it taken
+    when the database reports a duplicate booked by another worker. A seat
+    with any TICKET row is taken, cancelled tickets included, since the row
+    still holds the key.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._maps = OrderedDict()
+        self._lock = threading.Lock()
+
+    @use_primary()
+    def _load(self, schedule_id, journey_date):
+        result = execute_query("""
+            SELECT v.Capacity
+            FROM ASSIGNED_TO a
+            JOIN VEHICLE v ON a.VehicleID = v.VehicleID
+            WHERE a.ScheduleID = %s AND a.AssignmentDate = %s
+              AND a.AssignmentStatus <> 'Cancelled'
+            ORDER BY v.Capacity DESC
+            LIMIT 1
+        """, (schedule_id, journey_date), prepared=True)
+        if not result['success']:
+            return None
+        capacity = result['data'][0]['Capacity'] if result['data'] else SEAT_CONFIG['DEFAULT_CAPACITY']
+        
+        # Every ticket row holds its seat in unique_seat_schedule, whatever
+        # its status: a Cancelled or Expired ticket's seat can't be inserted
+        result = execute_query("""
+            SELECT SeatNumber FROM TICKET
+            WHERE ScheduleID = %s AND JourneyDate = %s
+        """, (schedule_id, journey_date), prepared=True)
+        if not result['success']:
+            return None
+        
+        seat_map = SeatMap(capacity)
+        for row in result['data']:
+            seat_map.take(row['SeatNumber'])
+        return seat_map
+
+    def _get(self, schedule_id, journey_date):
+        """Return the seat map for a schedule/date, loading it on first use"""
+        key = (int(schedule_id), str(journey_date))
+        with self._lock:
+            seat_map = self._maps.get(key)
+            if seat_map is not None:
+                self._maps.move_to_end(key)
+                return seat_map
+        
+        # Load outside the lock so one cold schedule doesn't stall the rest
+        seat_map = self._load(*key)
+        if seat_map is None:
+            return None
+        with self._lock:
+            seat_map = self._maps.setdefault(key, seat_map)
+            self._maps.move_to_end(key)
+            while len(self._maps) > self.max_entries:
+                self._maps.popitem(last=False)
+        return seat_map
+
+    def seat_map(self, schedule_id, journey_date):
+        """Capacity, booked and available seats for a schedule/date"""
+        seat_map = self._get(schedule_id, journey_date)
+        if seat_map is None:
+            return None
+        with self._lock:
+            return {
+                'ScheduleID': int(schedule_id),
+                'JourneyDate': str(journey_date),
+                'Capacity': seat_map.capacity,
+                'AvailableCount': seat_map.available_count(),
+                'BookedSeats': seat_map.booked(),
+                'AvailableSeats': [seat_label(i) for i in range(seat_map.capacity)
+                                   if not seat_map.bits >> i & 1]
+            }
+
+    def is_available(self, schedule_id, journey_date, seat_number):
+        seat_map = self._get(schedule_id, journey_date)
+        if seat_map is None:
+            return None
+        with self._lock:
+            return not seat_map.is_taken(seat_number)
+
+    def reserve(self, schedule_id, journey_date, seat_number=None):
+        """Claim a seat (the first free one if none is given)
+
+        Returns the seat number, or None if it is taken or the schedule is full.
+        """
+        seat_map = self._get(schedule_id, journey_date)
+        if seat_map is None:
+            return None
+        with self._lock:
+            if seat_number is None:
+                seat_number = seat_map.first_free()
+                if seat_number is None:
+                    return None
+            elif seat_map.is_taken(seat_number):
+                return None
+            seat_map.take(seat_number)
+            return seat_number
+
+    def mark_taken(self, schedule_id, journey_date, seat_number):
+        """Record a seat the database reports as already booked"""
+        seat_map = self._get(schedule_id, journey_date)
+        if seat_map is not None:
+            with self._lock:
+                seat_map.take(seat_number)
+
+    def release(self, schedule_id, journey_date, seat_number):
+        """Free a seat reserved for an insert that failed"""
+        with self._lock:
+            seat_map = self._maps.get((int(schedule_id), str(journey_date)))
+            if seat_map is not None:
+                seat_map.release(seat_number)
+
+seat_inventory = SeatInventory(SEAT_CONFIG['MAX_ENTRIES'])
@@ -2,38 +2,42 @@ document.addEventListener('DOMContentLoaded', () => {
     loadComplaints();
 });
 
+const complaintsTable = new LocalTable('complaints', 'ComplaintID', displayComplaints);
+
 async function loadComplaints() {
     showLoading('complaintsBody');
-    const result = await apiCall('/api/complaints');
+    const result = await complaintsTable.load();
     
-    if (result.success && result.data) {
-        const tbody = document.getElementById('complaintsBody');
-        if (result.data.length === 0) {
-            showNoData('complaintsBody', 'No complaints found');
-            return;
-        }
-        tbody.innerHTML = result.data.map(c => `
-            <tr>
-                <td>${c.ComplaintID}</td>
-                <td>${c.ComplaintCode}</td>
-                <td>${c.PassengerName}</td>
-                <td>${c.Title}</td>
-                <td><span class="badge badge-info">${c.Category}</span></td>
-                <td><span class="badge badge-${getPriorityClass(c.Priority)}">${c.Priority}</span></td>
-                <td>${getStatusBadge(c.Status)}</td>
-                <td>${formatDate(c.Timestamp)}</td>
-                <td>
-                    <button class="btn btn-sm btn-success" onclick="openResolveModal(${c.ComplaintID})" title="Resolve">
-                        <i class="fas fa-check"></i>
-                    </button>
-                </td>
-            </tr>
-        `).join('');
-    } else {
+    if (!result.success || !result.data) {
         showError('complaintsBody', result.error || 'Failed to load complaints');
     }
 }
 
+function displayComplaints(rows) {
+    const tbody = document.getElementById('complaintsBody');
+    if (rows.length === 0) {
+        showNoData('complaintsBody', 'No complaints found');
+        return;
+    }
+    tbody.innerHTML = rows.map(c => `
+        <tr>
+            <td>${c.ComplaintID}</td>
+            <td>${c.ComplaintCode}</td>
+            <td>${c.PassengerName}</td>
+            <td>${c.Title}</td>
+            <td><span class="badge badge-info">${c.Category}</span></td>
+            <td><span class="badge badge-${getPriorityClass(c.Priority)}">${c.Priority}</span></td>
+            <td>${getStatusBadge(c.Status)}</td>
+            <td>${formatDate(c.Timestamp)}</td>
+            <td>
+                <button class="btn btn-sm btn-success" onclick="openResolveModal(${c.ComplaintID})" title="Resolve">
+                    <i class="fas fa-check"></i>
+                </button>
+            </td>
+        </tr>
+    `).join('');
+}
+
 function getPriorityClass(priority) {
     const classes = {
         'Low': 'info',
@@ -85,7 +89,7 @@ async function resolveComplaint(event) {
     if (result.success) {
         showToast('Complaint updated successfully', 'success');
         closeResolveModal();
-        loadComplaints();
+        complaintsTable.sync();
     } else {
         showToast('Error: ' + (result.error || 'Update failed'), 'danger');
     }
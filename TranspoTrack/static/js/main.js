@@ -51,6 +51,73 @@ async function apiCall(url, method = 'GET', data = null) {
     }
 }
 
+// List endpoints return one page and a next_cursor; follow it to the end
+// so pages that show the whole table are never cut off at the first page
+async function apiCallAll(url) {
+    const separator = url.includes('?') ? '&' : '?';
+    const rows = [];
+    let after = null;
+    do {
+        const page = await apiCall(`${url}${separator}limit=1000${after === null ? '' : `&after=${after}`}`);
+        if (!page.success || !page.data) {
+            return page;
+        }
+        rows.push(...page.data);
+        after = page.next_cursor;
+    } while (after !== null && after !== undefined);
+    return { success: true, data: rows };
+}
+
+// ==================== CHANGE FEED ====================
+
+// Local copy of a list page kept current through /api/<name>/changes,
+// so an edit patches the changed rows instead of reloading the table
+class LocalTable {
+    constructor(name, key, render) {
+        this.name = name;
+        this.key = key;
+        this.render = render;
+        this.rows = new Map();
+        this.version = null;
+    }
+    
+    async load() {
+        // Take the version first so writes during the load are synced again
+        const feed = await apiCall(`/api/${this.name}/changes`);
+        const result = await apiCallAll(`/api/${this.name}`);
+        if (!result.success || !result.data) {
+            return result;
+        }
+        this.version = feed.success ? feed.version : null;
+        this.rows = new Map(result.data.map(row => [row[this.key], row]));
+        this.show();
+        return result;
+    }
+    
+    async sync() {
+        if (this.version === null) {
+            return this.load();
+        }
+        const result = await apiCall(`/api/${this.name}/changes?since=${this.version}`);
+        if (!result.success) {
+            return result;
+        }
+        if (result.reset) {
+            return this.load();
+        }
+        result.data.forEach(row => this.rows.set(row[this.key], row));
+        result.deleted.forEach(key => this.rows.delete(key));
+        this.version = result.version;
+        this.show();
+        return result;
+    }
+    
+    show() {
+        // Newest first, like the list endpoints
+        this.render([...this.rows.values()].sort((a, b) => b[this.key] - a[this.key]));
+    }
+}
+
 // ==================== NAVIGATION ====================
 
 document.addEventListener('DOMContentLoaded', function() {
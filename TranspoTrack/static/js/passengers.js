@@ -3,14 +3,14 @@ document.addEventListener('DOMContentLoaded', () => {
     loadPassengers();
 });
 
+const passengersTable = new LocalTable('passengers', 'PassengerID', displayPassengers);
+
 // Load all passengers
 async function loadPassengers() {
     showLoading('passengersBody');
-    const result = await apiCall('/api/passengers');
+    const result = await passengersTable.load();
     
-    if (result.success && result.data) {
-        displayPassengers(result.data);
-    } else {
+    if (!result.success || !result.data) {
         showError('passengersBody', result.error || 'Failed to load passengers');
     }
 }
@@ -101,7 +101,7 @@ async function savePassenger(event) {
     if (result.success) {
         showToast(id ? 'Passenger updated successfully' : 'Passenger added successfully', 'success');
         closeModal();
-        loadPassengers();
+        passengersTable.sync();
     } else {
         showToast('Error: ' + (result.error || 'Operation failed'), 'danger');
     }
@@ -117,7 +117,7 @@ async function deletePassenger(id) {
     
     if (result.success) {
         showToast('Passenger deleted successfully', 'success');
-        loadPassengers();
+        passengersTable.sync();
     } else {
         showToast('Error: ' + (result.error || 'Delete failed'), 'danger');
     }
@@ -4,7 +4,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
 async function loadPasses() {
     showLoading('passesBody');
-    const result = await apiCall('/api/passes');
+    const result = await apiCallAll('/api/passes');
     
     if (result.success && result.data) {
         const tbody = document.getElementById('passesBody');
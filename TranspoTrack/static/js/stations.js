@@ -3,33 +3,37 @@ document.addEventListener('DOMContentLoaded', () => {
     loadStations();
 });
 
+const stationsTable = new LocalTable('stations', 'StationID', displayStations);
+
 async function loadStations() {
     showLoading('stationsBody');
-    const result = await apiCall('/api/stations');
+    const result = await stationsTable.load();
     
-    if (result.success && result.data) {
-        const tbody = document.getElementById('stationsBody');
-        if (result.data.length === 0) {
-            showNoData('stationsBody', 'No stations found');
-            return;
-        }
-        tbody.innerHTML = result.data.map(s => `
-            <tr>
-                <td>${s.StationID}</td>
-                <td>${s.StationCode}</td>
-                <td>${s.Name}</td>
-                <td>${s.Location}</td>
-                <td><span class="badge badge-info">${s.Type}</span></td>
-                <td>${s.Zone || 'N/A'}</td>
-                <td>${getStatusBadge(s.Status)}</td>
-                <td>${createActionButtons(s.StationID, 'editStation', 'deleteStation')}</td>
-            </tr>
-        `).join('');
-    } else {
+    if (!result.success || !result.data) {
         showError('stationsBody', result.error || 'Failed to load stations');
     }
 }
 
+function displayStations(rows) {
+    const tbody = document.getElementById('stationsBody');
+    if (rows.length === 0) {
+        showNoData('stationsBody', 'No stations found');
+        return;
+    }
+    tbody.innerHTML = rows.map(s => `
+        <tr>
+            <td>${s.StationID}</td>
+            <td>${s.StationCode}</td>
+            <td>${s.Name}</td>
+            <td>${s.Location}</td>
+            <td><span class="badge badge-info">${s.Type}</span></td>
+            <td>${s.Zone || 'N/A'}</td>
+            <td>${getStatusBadge(s.Status)}</td>
+            <td>${createActionButtons(s.StationID, 'editStation', 'deleteStation')}</td>
+        </tr>
+    `).join('');
+}
+
 function filterStations() {
     const searchTerm = document.getElementById('searchInput').value.toLowerCase();
     const rows = document.querySelectorAll('#stationsBody tr');
@@ -85,7 +89,7 @@ async function saveStation(event) {
     if (result.success) {
         showToast(id ? 'Station updated successfully' : 'Station added successfully', 'success');
         closeModal();
-        loadStations();
+        stationsTable.sync();
     } else {
         showToast('Error: ' + (result.error || 'Operation failed'), 'danger');
     }
@@ -96,7 +100,7 @@ async function deleteStation(id) {
     const result = await apiCall(`/api/stations/${id}`, 'DELETE');
     if (result.success) {
         showToast('Station deleted successfully', 'success');
-        loadStations();
+        stationsTable.sync();
     } else {
         showToast('Error: ' + (result.error || 'Delete failed'), 'danger');
     }
@@ -4,7 +4,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
 async function loadTickets() {
     showLoading('ticketsBody');
-    const result = await apiCall('/api/tickets');
+    const result = await apiCallAll('/api/tickets');
     
     if (result.success && result.data) {
         const tbody = document.getElementById('ticketsBody');
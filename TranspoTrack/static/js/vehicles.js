@@ -2,34 +2,38 @@ document.addEventListener('DOMContentLoaded', () => {
     loadVehicles();
 });
 
+const vehiclesTable = new LocalTable('vehicles', 'VehicleID', displayVehicles);
+
 async function loadVehicles() {
     showLoading('vehiclesBody');
-    const result = await apiCall('/api/vehicles');
+    const result = await vehiclesTable.load();
     
-    if (result.success && result.data) {
-        const tbody = document.getElementById('vehiclesBody');
-        if (result.data.length === 0) {
-            showNoData('vehiclesBody', 'No vehicles found');
-            return;
-        }
-        tbody.innerHTML = result.data.map(v => `
-            <tr>
-                <td>${v.VehicleID}</td>
-                <td>${v.VehicleNumber}</td>
-                <td><span class="badge badge-primary">${v.Type}</span></td>
-                <td>${v.Model || 'N/A'}</td>
-                <td>${v.Capacity}</td>
-                <td>${v.RegistrationNumber}</td>
-                <td><span class="badge badge-info">${v.FuelType}</span></td>
-                <td>${getStatusBadge(v.Status)}</td>
-                <td>${createActionButtons(v.VehicleID, 'editVehicle', 'deleteVehicle')}</td>
-            </tr>
-        `).join('');
-    } else {
+    if (!result.success || !result.data) {
         showError('vehiclesBody', result.error || 'Failed to load vehicles');
     }
 }
 
+function displayVehicles(rows) {
+    const tbody = document.getElementById('vehiclesBody');
+    if (rows.length === 0) {
+        showNoData('vehiclesBody', 'No vehicles found');
+        return;
+    }
+    tbody.innerHTML = rows.map(v => `
+        <tr>
+            <td>${v.VehicleID}</td>
+            <td>${v.VehicleNumber}</td>
+            <td><span class="badge badge-primary">${v.Type}</span></td>
+            <td>${v.Model || 'N/A'}</td>
+            <td>${v.Capacity}</td>
+            <td>${v.RegistrationNumber}</td>
+            <td><span class="badge badge-info">${v.FuelType}</span></td>
+            <td>${getStatusBadge(v.Status)}</td>
+            <td>${createActionButtons(v.VehicleID, 'editVehicle', 'deleteVehicle')}</td>
+        </tr>
+    `).join('');
+}
+
 function filterVehicles() {
     const searchTerm = document.getElementById('searchInput').value.toLowerCase();
     const rows = document.querySelectorAll('#vehiclesBody tr');
@@ -85,7 +89,7 @@ async function saveVehicle(event) {
     if (result.success) {
         showToast(id ? 'Vehicle updated successfully' : 'Vehicle added successfully', 'success');
         closeModal();
-        loadVehicles();
+        vehiclesTable.sync();
     } else {
         showToast('Error: ' + (result.error || 'Operation failed'), 'danger');
     }
@@ -96,7 +100,7 @@ async function deleteVehicle(id) {
     const result = await apiCall(`/api/vehicles/${id}`, 'DELETE');
     if (result.success) {
         showToast('Vehicle deleted successfully', 'success');
-        loadVehicles();
+        vehiclesTable.sync();
     } else {
         showToast('Error: ' + (result.error || 'Delete failed'), 'danger');
     }
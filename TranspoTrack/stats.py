@@ -0,0 +1,82 @@
+import threading
+import time
+import logging
+from database import execute_query, use_primary
+from config import STATS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# All dashboard counters in a single round trip
+STATS_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM PASSENGER WHERE Status='Active') as total_passengers,
+        (SELECT COUNT(*) FROM TICKET WHERE TicketStatus='Booked') as total_tickets,
+        (SELECT COUNT(*) FROM PASS WHERE PassStatus='Active') as active_passes,
+        (SELECT COALESCE(SUM(Amount), 0) FROM PAYMENT WHERE Status='Completed') as total_revenue,
+        (SELECT COUNT(*) FROM COMPLAINT WHERE Status='Pending') as pending_complaints,
+        (SELECT COUNT(*) FROM VEHICLE WHERE Status='Active') as active_vehicles
+"""
+
+EMPTY_STATS = {
+    'total_passengers': 0,
+    'total_tickets': 0,
+    'active_passes': 0,
+    'total_revenue': 0,
+    'pending_complaints': 0,
+    'active_vehicles': 0
+}
+
+_lock = threading.Lock()
+_stats = None
+_expires_at = 0.0
+_generation = 0
+
+@use_primary()
+def load_stats():
+    """Read every dashboard counter from the database"""
+    result = execute_query(STATS_QUERY)
+    if not result['success'] or not result['data']:
+        return None
+    stats = dict(result['data'][0])
+    stats['total_revenue'] = float(stats['total_revenue'])
+    return stats
+
+def get_stats():
+    """Return dashboard counters, served from the cache while it is fresh"""
+    global _stats, _expires_at
+    with _lock:
+        if _stats is not None and time.monotonic() < _expires_at:
+            return dict(_stats)
+        generation = _generation
+    
+    stats = load_stats()
+    if stats is None:
+        with _lock:
+            return dict(_stats) if _stats is not None else dict(EMPTY_STATS)
+    
+    with _lock:
+        _stats = stats
+        # A write that landed while we were reading may be missing from this
+        # snapshot, so keep it but let the next request reload
+        if generation == _generation:
+            _expires_at = time.monotonic() + STATS_CONFIG['TTL_SECONDS']
+        else:
+            _expires_at = 0.0
+        return dict(_stats)
+
+def adjust(**deltas):
+    """Apply the effect of a committed write to the cached counters"""
+    global _generation
+    with _lock:
+        _generation += 1
+        if _stats is None:
+            return
+        for key, delta in deltas.items():
+            _stats[key] += delta
+
+def invalidate():
+    """Drop the cached counters after a write whose effect is not known"""
+    global _stats, _generation
+    with _lock:
+        _generation += 1
+        _stats = None
@@ -0,0 +1,78 @@
+import time
+from datetime import date
+import pytest
+import audit
+from audit import AuditLog, add_months
+from database import Error
+
+def wait_for(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+@pytest.fixture
+def log(monkeypatch):
+    """Audit log whose inserts go to a list instead of AUDIT_LOG"""
+    log = AuditLog(capacity=5, batch_size=500, flush_interval=0.2)
+    log.retry_seconds = 0.05
+    log.inserted = []
+    monkeypatch.setattr(log, '_insert', log.inserted.extend)
+    return log
+
+def test_single_event_is_written_within_the_flush_interval(log):
+    log.start()
+    time.sleep(0.05)
+    log.record('PASSENGER', 1, 'UPDATE', old={'Status': 'Active'}, new={'Status': 'Inactive'})
+    assert wait_for(lambda: log.stats()['written'] == 1, 0.2 + 0.5)
+    assert log.inserted[0][:3] == ('PASSENGER', 1, 'UPDATE')
+    assert log.stats()['buffered'] == 0
+
+def test_events_without_a_record_are_ignored(log):
+    log.record('PASSENGER', None, 'INSERT')
+    assert log.stats()['recorded'] == 0
+
+def test_oldest_events_are_dropped_when_full(log, monkeypatch):
+    monkeypatch.setattr(log, 'start', lambda: None)
+    for record_id in range(7):
+        log.record('STATION', record_id, 'INSERT')
+    stats = log.stats()
+    assert stats['buffered'] == 5 and stats['dropped'] == 2
+    assert [event[1] for event in log._queue] == [2, 3, 4, 5, 6]
+
+def test_bad_event_does_not_lose_the_batch(log, monkeypatch):
+    def insert(events):
+        if any(event[1] == 2 for event in events):
+            raise Error(msg='Data too long', errno=1406)
+        log.inserted.extend(events)
+    monkeypatch.setattr(log, '_insert', insert)
+    for record_id in range(1, 4):
+        log.record('COMPLAINT', record_id, 'INSERT')
+    assert wait_for(lambda: log.stats()['written'] == 2, 2.0)
+    assert [event[1] for event in log.inserted] == [1, 3]
+    assert log.stats()['failed'] == 1
+
+def test_unavailable_database_is_retried(log, monkeypatch):
+    calls = []
+    def insert(events):
+        calls.append(len(events))
+        if len(calls) == 1:
+            raise Error(msg='Lost connection', errno=2013)
+        log.inserted.extend(events)
+    monkeypatch.setattr(log, '_insert', insert)
+    log.record('TICKET', 1, 'INSERT')
+    assert wait_for(lambda: log.stats()['written'] == 1, 2.0)
+    assert log.stats()['retries'] == 1
+
+def test_add_months():
+    assert add_months(date(2025, 12, 15), 1) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 31), -1) == date(2024, 12, 1)
+    assert add_months(date(2025, 3, 2), 0) == date(2025, 3, 1)
+
+def test_partitions_continue_from_the_highest_bound(monkeypatch):
+    monkeypatch.setattr(audit, 'partitions', lambda: [('p_history', date(2024, 1, 1)), ('p_future', None)])
+    stats = audit.maintain_partitions(dry_run=True, today=date(2024, 4, 10))
+    assert stats['added'] == ['p202401', 'p202402', 'p202403', 'p202404', 'p202405', 'p202406']
+    assert stats['dropped'] == []
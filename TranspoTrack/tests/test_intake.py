@@ -0,0 +1,70 @@
+import time
+from types import SimpleNamespace
+import pytest
+import intake
+from intake import ComplaintIntake
+
+def complaint(code):
+    return {'code': code, 'title': 'Late bus', 'description': 'Twenty minutes late',
+            'passengerId': 1, 'category': 'Delay'}
+
+def wait_for(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    """Intake whose inserts go to a list instead of COMPLAINT"""
+    monkeypatch.setattr(intake, 'audit_log', SimpleNamespace(record=lambda *args, **kwargs: None))
+    writer = ComplaintIntake(str(tmp_path / 'data' / 'spill.jsonl'), batch_size=200,
+                             flush_interval=0.2, max_queue=1000)
+    writer.inserted = []
+    
+    def insert(rows):
+        writer.inserted.extend(rows)
+        return {row['code']: index for index, row in enumerate(rows, len(writer.inserted))}
+    monkeypatch.setattr(writer, '_insert', insert)
+    return writer
+
+def test_single_complaint_is_written_within_the_flush_interval(writer):
+    # As in the app: the writer is already idle when the complaint arrives
+    writer.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    assert writer.submit(complaint('C1'))
+    assert wait_for(lambda: writer.stats()['written'] == 1, 1.0)
+    assert time.monotonic() - started < 0.2 + 0.5
+    assert [row['code'] for row in writer.inserted] == ['C1']
+    assert writer.stats()['queue_depth'] == 0
+
+def test_full_batch_is_written_without_waiting(writer):
+    writer.flush_interval = 30
+    for number in range(200):
+        writer.submit(complaint(f"C{number}"))
+    assert wait_for(lambda: writer.stats()['written'] == 200, 1.0)
+    assert writer.stats()['batches'] == 1
+
+def test_failed_batch_is_retried(writer, monkeypatch):
+    writer.retry_seconds = 0.05
+    insert = writer._insert
+    calls = []
+    
+    def flaky(rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise OSError('disk full')
+        return insert(rows)
+    monkeypatch.setattr(writer, '_insert', flaky)
+    
+    writer.submit(complaint('C1'))
+    assert wait_for(lambda: writer.stats()['written'] == 1, 2.0)
+    stats = writer.stats()
+    assert stats['errors'] == 1 and stats['retries'] == 1 and stats['writer_alive']
+
+def test_full_queue_is_refused(writer):
+    writer.max_queue = 0
+    assert not writer.submit(complaint('C1'))
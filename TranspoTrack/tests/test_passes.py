@@ -0,0 +1,149 @@
+import threading
+import time
+from datetime import date
+import pytest
+import passes
+from passes import PassIndex, PassIntervals
+
+def row(pass_id, start, end, passenger_id=7, code=None):
+    return {
+        'PassID': pass_id,
+        'PassCode': code or f"P{pass_id:03d}",
+        'PassType': 'Monthly',
+        'PassengerID': passenger_id,
+        'StartDate': start,
+        'EndDate': end
+    }
+
+def intervals(*spans):
+    """PassIntervals with passes numbered from 1, spans as (start, end) ordinals"""
+    result = PassIntervals()
+    for pass_id, (start, end) in enumerate(spans, 1):
+        result.add({'PassID': pass_id, 'StartOrdinal': start, 'EndOrdinal': end})
+    return result
+
+def covering_id(result, day):
+    entry = result.covering(day)
+    return entry['PassID'] if entry else None
+
+def test_empty():
+    assert intervals().covering(10) is None
+
+def test_single_pass_bounds_are_inclusive():
+    result = intervals((10, 20))
+    assert covering_id(result, 9) is None
+    assert covering_id(result, 10) == 1
+    assert covering_id(result, 20) == 1
+    assert covering_id(result, 21) is None
+
+def test_adjacent_passes():
+    result = intervals((10, 19), (20, 29))
+    assert covering_id(result, 19) == 1
+    assert covering_id(result, 20) == 2
+    assert covering_id(result, 30) is None
+
+def test_gap_between_passes():
+    result = intervals((10, 12), (20, 22))
+    assert covering_id(result, 15) is None
+
+def test_overlap_prefers_the_pass_that_runs_longest():
+    result = intervals((10, 30), (15, 20))
+    assert covering_id(result, 17) == 1
+    result = intervals((10, 20), (15, 30))
+    assert covering_id(result, 17) == 2
+
+def test_long_early_pass_found_behind_short_later_ones():
+    # Only the reach array lets the scan go past passes 2 and 3
+    result = intervals((1, 100), (10, 11), (20, 21))
+    assert covering_id(result, 50) == 1
+    assert result.reach == [100, 100, 100]
+
+def test_insertion_order_does_not_matter():
+    result = PassIntervals()
+    for pass_id, start, end in [(3, 20, 21), (1, 1, 100), (2, 10, 11)]:
+        result.add({'PassID': pass_id, 'StartOrdinal': start, 'EndOrdinal': end})
+    assert result.starts == [1, 10, 20]
+    assert covering_id(result, 50) == 1
+
+def test_remove_rebuilds_reach():
+    result = intervals((1, 100), (10, 11), (20, 21))
+    assert result.remove(1)['PassID'] == 1
+    assert result.reach == [11, 21]
+    assert covering_id(result, 50) is None
+    assert covering_id(result, 20) == 3
+    assert result.remove(99) is None
+
+def test_same_start_date():
+    result = intervals((10, 15), (10, 25))
+    assert covering_id(result, 12) == 2
+    assert covering_id(result, 20) == 2
+
+@pytest.fixture
+def index(monkeypatch):
+    """PassIndex loaded from an in-memory list of PASS rows"""
+    index = PassIndex(refresh_seconds=300)
+    index.rows = [row(1, date(2025, 1, 1), date(2025, 1, 31)),
+                  row(2, date(2025, 2, 1), date(2025, 2, 28), passenger_id=8)]
+    monkeypatch.setattr(passes, 'execute_query', lambda query: {'success': True, 'data': index.rows})
+    return index
+
+def test_validate_by_code_and_passenger(index):
+    results = index.validate([
+        {'passCode': 'P001', 'date': '2025-01-15'},
+        {'passCode': 'P001', 'date': '2025-02-01'},
+        {'passengerId': '8', 'date': '2025-02-28'},
+        {'passengerId': 7, 'date': '2025-02-01'},
+        {'passengerId': 'x'},
+        {'passCode': 'P001', 'date': 'not a date'},
+        {}
+    ])
+    assert [result['valid'] for result in results] == [True, False, True, False, False, False, False]
+    assert results[2]['PassID'] == 2
+    assert results[5]['reason'] == 'Invalid date'
+
+def test_add_and_deactivate(index):
+    index.validate([])
+    index.add(row(3, '2025-03-01', '2025-03-31'))
+    assert index.validate([{'passengerId': 7, 'date': '2025-03-10'}])[0]['PassID'] == 3
+    index.set_status(3, 'Expired')
+    assert not index.validate([{'passCode': 'P003', 'date': '2025-03-10'}])[0]['valid']
+
+def test_write_during_reload_is_replayed(index, monkeypatch):
+    def load(query):
+        # A pass created and one cancelled while the reload is reading PASS
+        index.add(row(3, '2025-03-01', '2025-03-31'))
+        index.set_status(1, 'Cancelled')
+        return {'success': True, 'data': index.rows}
+    monkeypatch.setattr(passes, 'execute_query', load)
+    
+    results = index.validate([{'passCode': 'P003', 'date': '2025-03-10'},
+                              {'passCode': 'P001', 'date': '2025-01-10'}])
+    assert [result['valid'] for result in results] == [True, False]
+
+def test_failed_reload_keeps_serving(index, monkeypatch):
+    assert index.validate([{'passCode': 'P001', 'date': '2025-01-10'}])[0]['valid']
+    index.invalidate()
+    monkeypatch.setattr(passes, 'execute_query', lambda query: {'success': False, 'error': 'down'})
+    assert index.validate([{'passCode': 'P001', 'date': '2025-01-10'}])[0]['valid']
+
+def test_cold_start_waits_for_the_first_load(index, monkeypatch):
+    loaded = list(index.rows)
+    
+    def slow(query):
+        time.sleep(0.2)
+        return {'success': True, 'data': loaded}
+    monkeypatch.setattr(passes, 'execute_query', slow)
+    
+    results = []
+    def check():
+        results.append(index.validate([{'passCode': 'P001', 'date': '2025-01-10'}])[0]['valid'])
+    threads = [threading.Thread(target=check) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [True] * 5
+
+def test_never_loaded_is_unavailable_not_invalid(index, monkeypatch):
+    monkeypatch.setattr(passes, 'execute_query', lambda query: {'success': False, 'error': 'down'})
+    assert index.validate([{'passCode': 'P001', 'date': '2025-01-10'}]) is None
@@ -0,0 +1,117 @@
+import pytest
+import search
+from search import PassengerSearch, grams, terms
+
+def passenger(passenger_id, first_name, last_name, email=None, phones=None, status='Active'):
+    return {
+        'PassengerID': passenger_id,
+        'FirstName': first_name,
+        'LastName': last_name,
+        'Email': email or f"{first_name}.{last_name}@mail.com".lower(),
+        'Status': status,
+        'PhoneNumbers': phones
+    }
+
+def body(first_name, last_name, email):
+    return {'firstName': first_name, 'lastName': last_name, 'email': email}
+
+def ids(results):
+    return [result['PassengerID'] for result in results]
+
+@pytest.fixture
+def index(monkeypatch):
+    """PassengerSearch loaded from an in-memory PASSENGER table"""
+    index = PassengerSearch(refresh_seconds=600)
+    index.rows = [
+        passenger(1, 'Anita', 'Sharma', phones='+91 98765-43210'),
+        passenger(2, 'Anil', 'Kumar', phones='9123456789, 080-2222'),
+        passenger(3, 'Sunita', 'Anand'),
+        passenger(4, 'Ravi', 'Kumaran')
+    ]
+    monkeypatch.setattr(search, 'execute_query', lambda query: {'success': True, 'data': index.rows})
+    return index
+
+def test_terms_and_grams():
+    assert terms("O'Brien-Smith  x@y.com") == ['o', 'brien', 'smith', 'x', 'y', 'com']
+    assert terms(None) == []
+    assert grams('anita') == {'ani', 'nit', 'ita'}
+    assert grams('an') == set()
+
+def test_exact_beats_prefix_beats_substring(index):
+    index.rows.append(passenger(5, 'Nita', 'Roy'))
+    # exact "nita" (5), substring of "anita"/"sunita" (1, 3)
+    assert ids(index.search('nita', 10)) == [5, 1, 3]
+    # exact "kumar" (2), prefix of "kumaran" (4)
+    assert ids(index.search('kumar', 10)) == [2, 4]
+
+def test_every_word_must_match(index):
+    assert ids(index.search('ani sharma', 10)) == [1]
+    assert index.search('anita kumar', 10) == []
+
+def test_ties_are_ordered_by_name(index):
+    # All three are prefix matches; "first last" orders them
+    assert ids(index.search('an', 10)) == [2, 1, 3]
+
+def test_query_shorter_than_a_trigram(index):
+    # Prefixes only: "an" must not match "sunita" or "kumaran" by substring
+    assert ids(index.search('an', 10)) == [2, 1, 3]
+    assert ids(index.search('r', 10)) == [4]
+    assert ids(index.search('ni', 10)) == []
+
+def test_empty_query(index):
+    assert index.search('', 10) == []
+    assert index.search(' -- ', 10) == []
+
+def test_limit(index):
+    assert len(index.search('a', 2)) == 2
+
+def test_phone_digits_and_email(index):
+    assert ids(index.search('987654', 10)) == [1]
+    assert ids(index.search('43210', 10)) == [1]
+    assert ids(index.search('0802222', 10)) == [2]
+    assert ids(index.search('sunita.anand', 10)) == [3]
+
+def test_results_omit_index_fields(index):
+    result = index.search('ravi', 10)[0]
+    assert result == {'PassengerID': 4, 'FirstName': 'Ravi', 'LastName': 'Kumaran',
+                      'Email': 'ravi.kumaran@mail.com', 'Status': 'Active', 'PhoneNumbers': None}
+
+def test_put_update_keeps_phones(index):
+    index.search('x', 1)
+    index.put(2, body('Anil', 'Verma', 'anil@v.in'))
+    assert index.search('kumar', 10)[0]['PassengerID'] == 4
+    assert ids(index.search('verma', 10)) == [2]
+    assert ids(index.search('9123', 10)) == [2]
+
+def test_put_new_and_remove(index):
+    index.search('x', 1)
+    index.put(9, body('Meera', 'Iyer', 'meera@i.in'), phones=['555-0101'])
+    assert ids(index.search('eer', 10)) == [9]
+    assert ids(index.search('5550101', 10)) == [9]
+    index.remove(9)
+    assert index.search('meera', 10) == []
+    assert index.search('eer', 10) == []
+    assert 'eer' not in index._grams
+
+def test_write_during_reload_is_replayed(index, monkeypatch):
+    def load(query):
+        # Rows read before these writes: a new passenger, a rename, a delete
+        rows = list(index.rows)
+        index.put(9, body('Meera', 'Iyer', 'meera@i.in'), phones=[])
+        index.put(1, body('Anita', 'Desai', 'anita@d.in'))
+        index.remove(4)
+        return {'success': True, 'data': rows}
+    monkeypatch.setattr(search, 'execute_query', load)
+    
+    assert ids(index.search('meera', 10)) == [9]
+    assert ids(index.search('desai', 10)) == [1]
+    assert index.search('sharma', 10) == []
+    assert index.search('ravi', 10) == []
+    # The rename kept the phone number loaded by the reload
+    assert ids(index.search('98765', 10)) == [1]
+
+def test_failed_reload_keeps_serving(index, monkeypatch):
+    assert ids(index.search('ravi', 10)) == [4]
+    index.invalidate()
+    monkeypatch.setattr(search, 'execute_query', lambda query: {'success': False, 'error': 'down'})
+    assert ids(index.search('ravi', 10)) == [4]
@@ -0,0 +1,126 @@
+import pytest
+import seats
+from seats import SeatInventory, SeatMap, seat_index, seat_label
+
+@pytest.fixture
+def inventory(monkeypatch):
+    """Inventory whose schedules have 3 seats and no tickets yet"""
+    inventory = SeatInventory(max_entries=2)
+    monkeypatch.setattr(inventory, '_load', lambda schedule_id, journey_date: SeatMap(3))
+    return inventory
+
+def test_seat_labels_round_trip():
+    assert seat_label(0) == 'A01'
+    assert seat_label(98) == 'A99'
+    assert seat_label(99) == 'B01'
+    for index in (0, 1, 98, 99, 150):
+        assert seat_index(seat_label(index)) == index
+
+@pytest.mark.parametrize('label', ['', 'A', 'A00', 'A100', '1A', '[01', 'window'])
+def test_seat_index_outside_scheme(label):
+    assert seat_index(label) is None
+
+def test_seat_index_is_case_insensitive():
+    assert seat_index('b02') == 100
+
+def test_take_and_release():
+    seat_map = SeatMap(5)
+    seat_map.take('A02')
+    seat_map.take('A04')
+    assert seat_map.is_taken('A02')
+    assert not seat_map.is_taken('A03')
+    assert seat_map.booked() == ['A02', 'A04']
+    assert seat_map.available_count() == 3
+    
+    seat_map.release('A02')
+    assert not seat_map.is_taken('A02')
+    assert seat_map.available_count() == 4
+
+def test_first_free_skips_taken_seats():
+    seat_map = SeatMap(4)
+    assert seat_map.first_free() == 'A01'
+    seat_map.take('A01')
+    seat_map.take('A02')
+    assert seat_map.first_free() == 'A03'
+    seat_map.release('A01')
+    assert seat_map.first_free() == 'A01'
+
+def test_full_schedule_has_no_free_seat():
+    seat_map = SeatMap(3)
+    for label in ('A01', 'A02', 'A03'):
+        seat_map.take(label)
+    assert seat_map.first_free() is None
+    assert seat_map.available_count() == 0
+
+def test_zero_capacity():
+    assert SeatMap(0).first_free() is None
+
+def test_seats_outside_bitmap_are_kept_separately():
+    seat_map = SeatMap(2)
+    # Beyond capacity and outside the numbering scheme
+    seat_map.take('A05')
+    seat_map.take('VIP1')
+    assert seat_map.is_taken('A05')
+    assert seat_map.is_taken('VIP1')
+    assert seat_map.available_count() == 2
+    assert seat_map.first_free() == 'A01'
+    assert seat_map.booked() == ['A05', 'VIP1']
+    seat_map.release('VIP1')
+    assert not seat_map.is_taken('VIP1')
+
+def test_reserve_until_full(inventory):
+    assert [inventory.reserve(1, '2025-01-01') for _ in range(3)] == ['A01', 'A02', 'A03']
+    assert inventory.reserve(1, '2025-01-01') is None
+    assert inventory.seat_map(1, '2025-01-01')['AvailableCount'] == 0
+    
+    inventory.release(1, '2025-01-01', 'A02')
+    assert inventory.reserve(1, '2025-01-01') == 'A02'
+
+def test_reserve_specific_seat(inventory):
+    assert inventory.reserve(1, '2025-01-01', 'A02') == 'A02'
+    assert inventory.reserve(1, '2025-01-01', 'A02') is None
+    assert inventory.reserve(1, '2025-01-01') == 'A01'
+    assert not inventory.is_available(1, '2025-01-01', 'A02')
+
+def test_schedules_and_dates_are_separate(inventory):
+    assert inventory.reserve(1, '2025-01-01') == 'A01'
+    assert inventory.reserve(1, '2025-01-02') == 'A01'
+    assert inventory.reserve('2', '2025-01-01') == 'A01'
+
+def test_mark_taken(inventory):
+    inventory.mark_taken(1, '2025-01-01', 'A01')
+    assert inventory.reserve(1, '2025-01-01') == 'A02'
+
+def test_failed_load_reserves_nothing(monkeypatch):
+    inventory = SeatInventory(max_entries=2)
+    monkeypatch.setattr(inventory, '_load', lambda schedule_id, journey_date: None)
+    assert inventory.reserve(1, '2025-01-01') is None
+    assert inventory.seat_map(1, '2025-01-01') is None
+
+def test_least_recently_used_map_is_evicted(inventory):
+    inventory.reserve(1, '2025-01-01')
+    inventory.reserve(2, '2025-01-01')
+    inventory.reserve(1, '2025-01-01')
+    inventory.reserve(3, '2025-01-01')
+    # Schedule 1 was used more recently than 2, so it kept its seats
+    assert inventory.reserve(1, '2025-01-01') == 'A03'
+    # Schedule 2 was evicted and reloads empty
+    assert inventory.reserve(2, '2025-01-01') == 'A01'
+
+def test_release_of_unloaded_schedule_is_ignored(inventory):
+    inventory.release(9, '2025-01-01', 'A01')
+    assert inventory.reserve(9, '2025-01-01') == 'A01'
+
+def test_cancelled_seats_stay_taken(monkeypatch):
+    # The cancelled ticket's row still holds unique_seat_schedule, so its
+    # seat must not be offered again
+    def query(sql, params, prepared=False):
+        if 'Capacity' in sql:
+            return {'success': True, 'data': [{'Capacity': 3}]}
+        assert 'TicketStatus' not in sql
+        return {'success': True, 'data': [{'SeatNumber': 'A01'}, {'SeatNumber': 'A02'}]}
+    monkeypatch.setattr(seats, 'execute_query', query)
+    inventory = SeatInventory(max_entries=2)
+    assert inventory.reserve(1, '2025-01-01') == 'A03'
+    assert inventory.reserve(1, '2025-01-01') is None
+    assert inventory.seat_map(1, '2025-01-01')['BookedSeats'] == ['A01', 'A02', 'A03']
@@ -0,0 +1,201 @@
+import bisect
+import threading
+import time
+import logging
+from datetime import timedelta
+from database import execute_query, use_primary
+from config import TIMETABLE_CONFIG
+import transit
+
+logger = logging.getLogger(__name__)
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+SECONDS_PER_DAY = 24 * 60 * 60
+
+class StationTimetable:
+    """Departures from one station on one day of the week, sorted by time"""
+    def __init__(self):
+        self.times = []         # seconds after midnight, sorted
+        self.entries = []       # (ScheduleID, RouteID, days the service started before)
+
+    def add(self, seconds, schedule_id, route_id, day_offset):
+        index = bisect.bisect_right(self.times, seconds)
+        self.times.insert(index, seconds)
+        self.entries.insert(index, (schedule_id, route_id, day_offset))
+
+class Timetable:
+    """Per-(station, day of week) departure index
+
+    Departure time at a station is the schedule's DepartureTime plus the
+    station's ROUTE_STATION.CumulativeTime on that route.
+    """
+    def __init__(self, graph, schedules):
+        self.graph = graph
+        self.schedules = {}
+        self.boards = {}
+        for row in schedules:
+            route = graph.routes.get(row['RouteID'])
+            if route is None:
+                continue
+            self.schedules[row['ScheduleID']] = row
+            start = int(row['DepartureTime'].total_seconds())
+            day = DAYS.index(row['DayOfWeek'])
+            # No departures from the terminus
+            for station_id, minutes in zip(route.stations[:-1], route.times[:-1]):
+                seconds = start + minutes * 60
+                day_offset = seconds // SECONDS_PER_DAY
+                board = self.boards.setdefault((station_id, (day + day_offset) % 7), StationTimetable())
+                board.add(seconds % SECONDS_PER_DAY, row['ScheduleID'], route.route_id, day_offset)
+
+    def runs_on(self, schedule_id, service_date):
+        row = self.schedules[schedule_id]
+        return row['EffectiveFrom'] <= service_date and (
+            row['EffectiveTo'] is None or service_date <= row['EffectiveTo'])
+
+@use_primary()
+def load_timetable():
+    graph = transit.get_graph()
+    if graph is None:
+        return None
+    result = execute_query("""
+        SELECT ScheduleID, ScheduleCode, RouteID, DepartureTime, DayOfWeek,
+               EffectiveFrom, EffectiveTo
+        FROM SCHEDULE
+    """)
+    if not result['success']:
+        return None
+    timetable = Timetable(graph, result['data'])
+    logger.info(f"Timetable built: {len(timetable.boards)} station/day boards")
+    return timetable
+
+def load_delays():
+    """Live status of schedules that are not running to plan"""
+    result = execute_query("""
+        SELECT ScheduleID, Status, DelayMinutes FROM SCHEDULE
+        WHERE Status IN ('Delayed', 'Cancelled') OR DelayMinutes <> 0
+    """)
+    if not result['success']:
+        return None
+    return {row['ScheduleID']: (row['Status'], row['DelayMinutes'] or 0) for row in result['data']}
+
+_lock = threading.Condition()
+_state = {'timetable': None, 'delays': {}}
+_expires_at = {'timetable': 0.0, 'delays': 0.0}
+_loading = set()
+_invalidations = 0
+
+LOADERS = {
+    'timetable': (load_timetable, 'REFRESH_SECONDS'),
+    'delays': (load_delays, 'DELAY_REFRESH_SECONDS')
+}
+
+def _reload(kind, invalidations):
+    """Run one loader outside the lock and swap its result in"""
+    loader, refresh = LOADERS[kind]
+    value = None
+    try:
+        value = loader()
+    except Exception:
+        logger.exception(f"Loading the {kind} failed")
+    finally:
+        with _lock:
+            _loading.discard(kind)
+            now = time.monotonic()
+            if value is None:
+                # Keep the old state and back off instead of retrying per request
+                _expires_at[kind] = now + TIMETABLE_CONFIG['RETRY_SECONDS']
+            else:
+                _state[kind] = value
+                # Invalidated while loading: what was read may predate the write
+                fresh = invalidations == _invalidations
+                _expires_at[kind] = now + TIMETABLE_CONFIG[refresh] if fresh else 0.0
+            _lock.notify_all()
+
+def get_state():
+    """Current timetable and delays, each refreshed on its own cadence
+
+    One caller reloads whatever is stale outside the lock while the rest
+    keep using the current state; only the first timetable build is
+    waited for.
+    """
+    with _lock:
+        while _state['timetable'] is None and 'timetable' in _loading:
+            _lock.wait()
+        now = time.monotonic()
+        stale = [kind for kind in LOADERS
+                 if kind not in _loading and now >= _expires_at[kind]]
+        _loading.update(stale)
+        invalidations = _invalidations
+    
+    for kind in stale:
+        _reload(kind, invalidations)
+    with _lock:
+        return _state['timetable'], _state['delays']
+
+def invalidate():
+    """Rebuild the timetable on next use"""
+    global _invalidations
+    with _lock:
+        _expires_at['timetable'] = 0.0
+        _expires_at['delays'] = 0.0
+        _invalidations += 1
+
+def format_seconds(seconds):
+    return f"{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}"
+
+def next_departures(station_id, when, limit):
+    """Next `limit` departures from a station at or after `when` (a datetime)
+
+    Binary-searches the day's board, looking back by the largest current
+    delay so late services still show, and rolls over into the next day.
+    """
+    timetable, delays = get_state()
+    if timetable is None:
+        return None
+    
+    now_seconds = when.hour * 3600 + when.minute * 60 + when.second
+    max_delay = max((delay for _, delay in delays.values()), default=0) * 60
+    found = []      # (expected, scheduled, schedule_id, route_id), sorted
+    for day_shift in (0, 1):
+        day_date = when.date() + timedelta(days=day_shift)
+        board = timetable.boards.get((station_id, day_date.weekday()))
+        if board is None:
+            continue
+        base = day_shift * SECONDS_PER_DAY
+        start = bisect.bisect_left(board.times, now_seconds - base - max(max_delay, 0))
+        for index in range(start, len(board.times)):
+            scheduled = base + board.times[index]
+            # Delays never make a service earlier, so nothing later can overtake
+            if len(found) >= limit and scheduled > found[limit - 1][0]:
+                break
+            schedule_id, route_id, day_offset = board.entries[index]
+            if not timetable.runs_on(schedule_id, day_date - timedelta(days=day_offset)):
+                continue
+            status, delay = delays.get(schedule_id, ('Scheduled', 0))
+            if status == 'Cancelled':
+                continue
+            expected = scheduled + max(delay, 0) * 60
+            if expected >= now_seconds:
+                bisect.insort(found, (expected, scheduled, schedule_id, route_id))
+        if len(found) >= limit:
+            break
+    
+    graph = timetable.graph
+    departures = []
+    for expected, scheduled, schedule_id, route_id in found[:limit]:
+        route = graph.routes[route_id]
+        status, delay = delays.get(schedule_id, ('Scheduled', 0))
+        departures.append({
+            'ScheduleID': schedule_id,
+            'ScheduleCode': timetable.schedules[schedule_id]['ScheduleCode'],
+            'RouteID': route_id,
+            'RouteCode': route.code,
+            'RouteName': route.name,
+            'Destination': graph.station_names.get(route.stations[-1]),
+            'ScheduledTime': format_seconds(scheduled),
+            'ExpectedTime': format_seconds(expected),
+            'DelayMinutes': delay,
+            'Status': status,
+            'NextDay': scheduled >= SECONDS_PER_DAY
+        })
+    return departures
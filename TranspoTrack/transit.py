@@ -0,0 +1,256 @@
+import heapq
+import threading
+import time
+import logging
+from database import execute_query, use_primary
+from config import TRANSIT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+class Route:
+    """One route's stops with cumulative distance/time arrays"""
+    def __init__(self, route_id, code, name, fare_per_km):
+        self.route_id = route_id
+        self.code = code
+        self.name = name
+        self.fare_per_km = fare_per_km
+        self.stations = []
+        self.distances = []
+        self.times = []
+        self.position = {}
+
+    def add_stop(self, station_id, distance, minutes):
+        self.position[station_id] = len(self.stations)
+        self.stations.append(station_id)
+        self.distances.append(distance)
+        self.times.append(minutes)
+
+    def distance(self, from_station, to_station):
+        """Distance between two stops of this route, in O(1)"""
+        return abs(self.distances[self.position[to_station]] - self.distances[self.position[from_station]])
+
+    def travel_time(self, from_station, to_station):
+        return abs(self.times[self.position[to_station]] - self.times[self.position[from_station]])
+
+    def fare(self, from_station, to_station):
+        return round(self.distance(from_station, to_station) * self.fare_per_km, 2)
+
+class TransitGraph:
+    """In-memory transit network built from ROUTE, ROUTE_STATION and STATION"""
+    def __init__(self, routes, station_names, schedule_routes):
+        self.routes = routes
+        self.station_names = station_names
+        self.schedule_routes = schedule_routes
+        # station -> routes serving it
+        self.station_routes = {}
+        for route in routes.values():
+            for station_id in route.stations:
+                self.station_routes.setdefault(station_id, []).append(route)
+
+    def direct_route(self, from_station, to_station):
+        """Shortest single route serving both stations, or None"""
+        best = None
+        for route in self.station_routes.get(from_station, ()):
+            if to_station in route.position:
+                if best is None or route.distance(from_station, to_station) < best.distance(from_station, to_station):
+                    best = route
+        return best
+
+    def plan(self, from_station, to_station, fewest_transfers=False):
+        """Journey across routes, by shortest distance or fewest transfers
+
+        Dijkstra over (station, route) states: riding to the next stop adds
+        distance, changing route at a station adds a transfer. Costs are
+        compared as (distance, transfers) or (transfers, distance).
+        """
+        if from_station not in self.station_routes or to_station not in self.station_routes:
+            return None
+        
+        def cost(distance, transfers):
+            return (transfers, distance) if fewest_transfers else (distance, transfers)
+        
+        heap = []
+        best = {}
+        previous = {}
+        for route in self.station_routes[from_station]:
+            state = (from_station, route.route_id)
+            best[state] = cost(0.0, 0)
+            heapq.heappush(heap, (best[state], 0.0, 0, state))
+        
+        while heap:
+            state_cost, distance, transfers, state = heapq.heappop(heap)
+            if state_cost > best.get(state, state_cost):
+                continue
+            station_id, route_id = state
+            if station_id == to_station:
+                return self._legs(state, previous)
+            
+            route = self.routes[route_id]
+            index = route.position[station_id]
+            moves = []
+            for next_index in (index - 1, index + 1):
+                if 0 <= next_index < len(route.stations):
+                    next_station = route.stations[next_index]
+                    moves.append(((next_station, route_id),
+                                  distance + route.distance(station_id, next_station), transfers))
+            for other in self.station_routes[station_id]:
+                if other.route_id != route_id:
+                    moves.append(((station_id, other.route_id), distance, transfers + 1))
+            
+            for next_state, next_distance, next_transfers in moves:
+                next_cost = cost(next_distance, next_transfers)
+                if next_state not in best or next_cost < best[next_state]:
+                    best[next_state] = next_cost
+                    previous[next_state] = state
+                    heapq.heappush(heap, (next_cost, next_distance, next_transfers, next_state))
+        return None
+
+    def _legs(self, state, previous):
+        """Collapse a path of (station, route) states into per-route legs"""
+        path = [state]
+        while path[-1] in previous:
+            path.append(previous[path[-1]])
+        path.reverse()
+        
+        legs = []
+        for station_id, route_id in path:
+            route = self.routes[route_id]
+            if legs and legs[-1]['route'] is route:
+                legs[-1]['to'] = station_id
+            else:
+                legs.append({'route': route, 'from': station_id, 'to': station_id})
+        # A route boarded and left at the same station is just a transfer
+        legs = [leg for leg in legs if leg['from'] != leg['to']]
+        
+        result = []
+        for leg in legs:
+            route = leg['route']
+            result.append({
+                'RouteID': route.route_id,
+                'RouteCode': route.code,
+                'RouteName': route.name,
+                'FromStationID': leg['from'],
+                'FromStation': self.station_names.get(leg['from']),
+                'ToStationID': leg['to'],
+                'ToStation': self.station_names.get(leg['to']),
+                'Distance': round(route.distance(leg['from'], leg['to']), 2),
+                'TravelMinutes': route.travel_time(leg['from'], leg['to']),
+                'Fare': route.fare(leg['from'], leg['to'])
+            })
+        return result
+
+@use_primary()
+def load_graph():
+    """Build the transit graph from the database"""
+    result = execute_query("""
+        SELECT r.RouteID, r.RouteCode, r.Name, r.FarePerKM,
+               rs.StationID, rs.CumulativeDistance, rs.CumulativeTime
+        FROM ROUTE r
+        JOIN ROUTE_STATION rs ON r.RouteID = rs.RouteID
+        WHERE r.Status = 'Active'
+        ORDER BY r.RouteID, rs.SequenceNumber
+    """)
+    if not result['success']:
+        return None
+    routes = {}
+    for row in result['data']:
+        route = routes.get(row['RouteID'])
+        if route is None:
+            route = routes[row['RouteID']] = Route(row['RouteID'], row['RouteCode'], row['Name'],
+                                                   float(row['FarePerKM']))
+        route.add_stop(row['StationID'], float(row['CumulativeDistance']), row['CumulativeTime'])
+    
+    result = execute_query("SELECT StationID, Name FROM STATION")
+    if not result['success']:
+        return None
+    station_names = {row['StationID']: row['Name'] for row in result['data']}
+    
+    result = execute_query("SELECT ScheduleID, RouteID FROM SCHEDULE")
+    if not result['success']:
+        return None
+    schedule_routes = {row['ScheduleID']: row['RouteID'] for row in result['data']}
+    
+    logger.info(f"Transit graph built: {len(routes)} routes, {len(station_names)} stations")
+    return TransitGraph(routes, station_names, schedule_routes)
+
+_lock = threading.Condition()
+_graph = None
+_expires_at = 0.0
+_loading = False
+_invalidations = 0
+
+def get_graph():
+    """Current transit graph, rebuilt when stale or invalidated
+
+    One caller rebuilds it outside the lock while everyone else keeps
+    using the old graph; only the very first build is waited for.
+    """
+    global _graph, _expires_at, _loading
+    with _lock:
+        while _graph is None and _loading:
+            _lock.wait()
+        if _graph is not None and (_loading or time.monotonic() < _expires_at):
+            return _graph
+        _loading = True
+        invalidations = _invalidations
+    
+    graph = None
+    try:
+        graph = load_graph()
+    finally:
+        with _lock:
+            _loading = False
+            if graph is not None:
+                _graph = graph
+                # Invalidated while loading: what was read may predate the write
+                fresh = invalidations == _invalidations
+                _expires_at = time.monotonic() + TRANSIT_CONFIG['REFRESH_SECONDS'] if fresh else 0.0
+            _lock.notify_all()
+    return graph or _graph
+
+def invalidate():
+    """Rebuild the graph on next use (after ROUTE/ROUTE_STATION/STATION/SCHEDULE writes)"""
+    global _expires_at, _invalidations
+    with _lock:
+        _expires_at = 0.0
+        _invalidations += 1
+
+def quote_fare(from_station, to_station, schedule_id=None, class_type='Economy'):
+    """Server-side fare for a trip
+
+    Uses the schedule's route when it serves both stations, otherwise the
+    shortest direct route, otherwise the sum of the planned journey's legs.
+    Returns None when the stations are not connected.
+    """
+    graph = get_graph()
+    if graph is None or from_station == to_station:
+        return None
+    multiplier = TRANSIT_CONFIG['CLASS_MULTIPLIERS'].get(class_type, 1.0)
+    
+    route = graph.routes.get(graph.schedule_routes.get(schedule_id))
+    if route is None or from_station not in route.position or to_station not in route.position:
+        route = graph.direct_route(from_station, to_station)
+    if route is not None:
+        return {
+            'Fare': round(route.fare(from_station, to_station) * multiplier, 2),
+            'Distance': round(route.distance(from_station, to_station), 2),
+            'RouteID': route.route_id,
+            'ClassType': class_type
+        }
+    
+    legs = graph.plan(from_station, to_station)
+    if not legs:
+        return None
+    return {
+        'Fare': round(sum(leg['Fare'] for leg in legs) * multiplier, 2),
+        'Distance': round(sum(leg['Distance'] for leg in legs), 2),
+        'RouteID': None,
+        'ClassType': class_type
+    }
+
+def plan_journey(from_station, to_station, fewest_transfers=False):
+    """Journey legs between two stations, or None if unreachable"""
+    graph = get_graph()
+    if graph is None:
+        return None
+    return graph.plan(from_station, to_station, fewest_transfers)